@@ -0,0 +1,412 @@
+"""
+Benchmark suite with local stand-ins (no Ollama needed):
+
+    python -m benchmarks.bench --json benchmarks/results/latest.json
+    python -m benchmarks.bench --suites chunking,query --sizes 10000,100000
+
+Suites: chunking, ingest, query, rerank, chat. Results are printed and written as
+JSON so runs can be compared with `--compare previous.json`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import random
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from rag.ingest import IngestManifest, IngestPipeline, plan_ingest
+from rag.models import Document, RetrievalResult
+from rag.rag import (
+    BM25Reranker,
+    CrossEncoderReranker,
+    KeywordOverlapReranker,
+    RagPipeline,
+    Reranker,
+)
+from rag.settings import IngestConfig, Settings
+from rag.text.chunking import chunk_structured, chunk_text
+from rag.text.terms import TERMS_METADATA_KEY, chunk_terms
+from rag.vectorstore import NumpyVectorStore
+from rag.vectorstore.ivf import summarize_latencies
+
+from .fakes import FakeEmbeddings, FakeStreamingLLM, generate_corpus, synthetic_text
+
+SUITES = ("chunking", "ingest", "query", "rerank", "chat")
+_ADD_BLOCK_ROWS = 50_000
+
+
+def _timed(fn: Callable[[], object], repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def bench_chunking(args: argparse.Namespace) -> Dict[str, object]:
+    text = synthetic_text(random.Random(0), args.chunk_words)
+    size_mb = len(text.encode("utf-8")) / 1e6
+    chunks = chunk_text(text, args.chunk_size, args.chunk_overlap)
+    samples = _timed(lambda: chunk_text(text, args.chunk_size, args.chunk_overlap), args.repeat)
+    best = min(samples)
+    structured = chunk_structured(text, args.max_tokens, args.overlap_tokens)
+    structured_samples = _timed(
+        lambda: chunk_structured(text, args.max_tokens, args.overlap_tokens), args.repeat
+    )
+    structured_best = min(structured_samples)
+    return {
+        "words": args.chunk_words,
+        "chunk_size": args.chunk_size,
+        "chunk_overlap": args.chunk_overlap,
+        "chunks": len(chunks),
+        "latency": summarize_latencies(samples),
+        "mb_per_s": size_mb / best if best else 0.0,
+        "chunks_per_s": len(chunks) / best if best else 0.0,
+        "structured": {
+            "max_tokens": args.max_tokens,
+            "overlap_tokens": args.overlap_tokens,
+            "chunks": len(structured),
+            "latency": summarize_latencies(structured_samples),
+            "mb_per_s": size_mb / structured_best if structured_best else 0.0,
+        },
+    }
+
+
+def bench_ingest(args: argparse.Namespace) -> Dict[str, object]:
+    with tempfile.TemporaryDirectory(prefix="rag-bench-ingest-") as tmp:
+        root = Path(tmp)
+        files = generate_corpus(root / "raw", args.ingest_files, args.ingest_words)
+        store = NumpyVectorStore(index_dir=str(root / "indices"))
+        manifest = IngestManifest.load(root / "indices" / "ingest_manifest.json")
+        config = IngestConfig(load_workers=args.load_workers, embed_workers=args.embed_workers)
+        pipeline = IngestPipeline(
+            embedder=FakeEmbeddings(dim=args.dim, delay_ms=args.embed_delay_ms),
+            store=store,
+            manifest=manifest,
+            config=config,
+            chunk_size=args.chunk_size,
+            chunk_overlap=args.chunk_overlap,
+        )
+        report = pipeline.run(plan_ingest(files, manifest))
+    elapsed = report.elapsed_s or 1e-9
+    return {
+        "files": report.indexed_files,
+        "chunks": report.indexed_chunks,
+        "elapsed_s": report.elapsed_s,
+        "files_per_s": report.indexed_files / elapsed,
+        "chunks_per_s": report.indexed_chunks / elapsed,
+        "load_workers": args.load_workers,
+        "embed_workers": args.embed_workers,
+        "embed_delay_ms": args.embed_delay_ms,
+    }
+
+
+def _fill_store(store: NumpyVectorStore, rows: int, dim: int) -> None:
+    rng = np.random.default_rng(0)
+    for start in range(0, rows, _ADD_BLOCK_ROWS):
+        end = min(rows, start + _ADD_BLOCK_ROWS)
+        vectors = rng.standard_normal((end - start, dim), dtype=np.float32)
+        docs = [
+            Document(doc_id=f"bench#chunk={i}", text=f"chunk {i}", metadata={"source": "bench"})
+            for i in range(start, end)
+        ]
+        store.add(docs, vectors)
+
+
+def bench_query(args: argparse.Namespace) -> Dict[str, object]:
+    results: Dict[str, object] = {}
+    rng = np.random.default_rng(1)
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory(prefix="rag-bench-query-") as tmp:
+            store = NumpyVectorStore(index_dir=tmp, dtype=args.dtype)
+            started = time.perf_counter()
+            _fill_store(store, size, args.dim)
+            entry: Dict[str, object] = {"build_s": time.perf_counter() - started}
+            queries = rng.standard_normal((args.queries, args.dim)).astype(np.float32).tolist()
+            store.query(queries[0], args.top_k)  # map the matrix before timing
+            for mode in ("exact", "ivf") if args.ann else ("exact",):
+                if mode == "ivf":
+                    store.build_ann_index()
+                    store.ann_enabled = True
+                    store.query(queries[0], args.top_k)
+                # "<mode>_ids" is the ids-and-scores phase the pipeline runs before hydration.
+                for suffix, run in (("", store.query), ("_ids", store.query_ids)):
+                    samples = []
+                    for query in queries:
+                        t0 = time.perf_counter()
+                        run(query, args.top_k)
+                        samples.append(time.perf_counter() - t0)
+                    entry[mode + suffix] = summarize_latencies(samples)
+            results[str(size)] = entry
+        print(f"  query size={size}: {results[str(size)]}")
+    return {"dim": args.dim, "dtype": args.dtype, "top_k": args.top_k, "sizes": results}
+
+
+def _bench_pipeline(
+    llm: FakeStreamingLLM, embedder: FakeEmbeddings, store, rag: Optional[dict] = None
+) -> RagPipeline:
+    settings = Settings(
+        model={"provider": "ollama"},
+        rag={"hybrid": False, **(rag or {})},
+        answer_cache={"enabled": False},
+    )
+    return RagPipeline(
+        embeddings=embedder,
+        vectorstore=store,
+        llm_cloud=llm,
+        llm_ollama=llm,
+        settings=settings,
+    )
+
+
+def bench_rerank(args: argparse.Namespace) -> Dict[str, object]:
+    rng = random.Random(2)
+    rerankers: Dict[str, Reranker] = {
+        "keyword": KeywordOverlapReranker(),
+        "bm25": BM25Reranker(),
+    }
+    if args.cross_encoder:
+        rerankers["cross_encoder"] = CrossEncoderReranker(args.cross_encoder)
+    question = "how do I restore a database backup after a failed upgrade"
+    results: Dict[str, object] = {}
+    for candidates in (20, 100, 500):
+        pool = []
+        for i in range(candidates):
+            text = synthetic_text(rng, args.chunk_size)
+            source = f"doc_{i}.md"
+            metadata = {"source": source, TERMS_METADATA_KEY: chunk_terms(text, source)}
+            pool.append(RetrievalResult(f"doc#{i}", text, rng.random(), metadata))
+        bare = [RetrievalResult(r.doc_id, r.text, r.score, {"source": r.metadata["source"]})
+                for r in pool]
+        row: Dict[str, object] = {}
+        for name, reranker in rerankers.items():
+            samples = _timed(lambda: reranker.rerank(question, pool), args.repeat)
+            row[name] = summarize_latencies(samples)
+        # Chunks indexed without stored term sets pay for tokenization per query.
+        samples = _timed(lambda: rerankers["keyword"].rerank(question, bare), args.repeat)
+        row["keyword_no_stored_terms"] = summarize_latencies(samples)
+        results[str(candidates)] = row
+    return {"chunk_words": args.chunk_size, "candidates": results}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _chat_requests(base_url: str, concurrency: int, requests: int) -> Dict[str, object]:
+    ttft: List[float] = []
+    totals: List[float] = []
+    tokens: List[int] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(client: httpx.AsyncClient, i: int) -> None:
+        payload = {
+            "model": "bench",
+            "stream": True,
+            "messages": [{"role": "user", "content": f"question {i} about backup restore"}],
+        }
+        async with semaphore:
+            started = time.perf_counter()
+            first = None
+            count = 0
+            async with client.stream("POST", "/v1/chat/completions", json=payload) as resp:
+                resp.raise_for_status()
+                async for line in resp.aiter_lines():
+                    if not line.startswith("data: ") or line == "data: [DONE]":
+                        continue
+                    delta = json.loads(line[6:])["choices"][0]["delta"]
+                    if delta.get("content"):
+                        count += 1
+                        if first is None:
+                            first = time.perf_counter() - started
+            totals.append(time.perf_counter() - started)
+            ttft.append(first or 0.0)
+            tokens.append(count)
+
+    started = time.perf_counter()
+    async with httpx.AsyncClient(base_url=base_url, timeout=None) as client:
+        await asyncio.gather(*(one(client, i) for i in range(requests)))
+    wall = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "ttft": summarize_latencies(ttft),
+        "total": summarize_latencies(totals),
+        "tokens_per_s_per_stream": sum(tokens) / sum(totals) if totals else 0.0,
+        "tokens_per_s_aggregate": sum(tokens) / wall if wall else 0.0,
+        "requests_per_s": requests / wall if wall else 0.0,
+    }
+
+
+def bench_chat(args: argparse.Namespace) -> Dict[str, object]:
+    import uvicorn
+
+    from rag.api import app as app_module
+
+    # Per-request INFO lines would dominate the output and the timings.
+    for name in ("rag.api.app", "httpx"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory(prefix="rag-bench-chat-") as tmp:
+        embedder = FakeEmbeddings(dim=args.dim)
+        store = NumpyVectorStore(index_dir=tmp)
+        texts = [synthetic_text(random.Random(i), args.chunk_size) for i in range(2000)]
+        store.add(
+            [Document(f"doc#{i}", t, {"source": f"doc_{i}.md"}) for i, t in enumerate(texts)],
+            embedder.embed_texts(texts),
+        )
+        llm = FakeStreamingLLM(
+            tokens=args.llm_tokens, token_delay_ms=args.token_delay_ms, ttft_ms=args.ttft_ms
+        )
+        pipeline = _bench_pipeline(llm, embedder, store)
+        # Route every request to the benchmark pipeline instead of building real clients.
+        app_module._available_models = lambda: ["bench"]
+        app_module.get_pipeline_for_model = lambda _name: pipeline
+
+        port = _free_port()
+        server = uvicorn.Server(
+            uvicorn.Config(app_module.app, host="127.0.0.1", port=port, log_level="warning")
+        )
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.01)
+        try:
+            runs = {
+                str(level): asyncio.run(
+                    _chat_requests(f"http://127.0.0.1:{port}", level, args.chat_requests)
+                )
+                for level in args.concurrency
+            }
+        finally:
+            server.should_exit = True
+            thread.join()
+    for run in runs.values():
+        print(
+            f"  chat concurrency={run['concurrency']}: ttft p50={run['ttft']['p50_ms']:.1f}ms "
+            f"p95={run['ttft']['p95_ms']:.1f}ms, {run['tokens_per_s_aggregate']:.0f} tok/s"
+        )
+    return {
+        "llm_tokens": args.llm_tokens,
+        "token_delay_ms": args.token_delay_ms,
+        "ttft_ms": args.ttft_ms,
+        "runs": runs,
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def _compare(previous: Dict[str, object], current: Dict[str, object], prefix: str = "") -> None:
+    for key, value in current.items():
+        name = f"{prefix}{key}"
+        old = previous.get(key) if isinstance(previous, dict) else None
+        if isinstance(value, dict):
+            _compare(old or {}, value, f"{name}.")
+        elif isinstance(value, (int, float)) and isinstance(old, (int, float)) and old:
+            change = (value - old) / old * 100
+            print(f"{name}: {old:.4g} -> {value:.4g} ({change:+.1f}%)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the RAG benchmark suite")
+    parser.add_argument("--suites", default=",".join(SUITES), help="Comma-separated suites")
+    parser.add_argument("--json", default=None, help="Write results to this JSON file")
+    parser.add_argument("--compare", default=None, help="Previous results JSON to diff against")
+    parser.add_argument("--repeat", type=int, default=20, help="Repetitions for micro benchmarks")
+    parser.add_argument("--chunk-size", type=int, default=900)
+    parser.add_argument("--chunk-overlap", type=int, default=180)
+    parser.add_argument("--chunk-words", type=int, default=200_000)
+    parser.add_argument("--max-tokens", type=int, default=512)
+    parser.add_argument("--overlap-tokens", type=int, default=64)
+    parser.add_argument("--ingest-files", type=int, default=200)
+    parser.add_argument("--ingest-words", type=int, default=1500)
+    parser.add_argument("--load-workers", type=int, default=2)
+    parser.add_argument("--embed-workers", type=int, default=2)
+    parser.add_argument("--embed-delay-ms", type=float, default=0.0)
+    parser.add_argument("--sizes", type=_int_list, default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--dtype", default="float32", choices=["float32", "float16"])
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=25)
+    parser.add_argument("--ann", action="store_true", help="Also time IVF search")
+    parser.add_argument(
+        "--cross-encoder", default="", help="Also time this cross-encoder in the rerank suite"
+    )
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 8, 32])
+    parser.add_argument("--chat-requests", type=int, default=64)
+    parser.add_argument("--llm-tokens", type=int, default=64)
+    parser.add_argument("--token-delay-ms", type=float, default=5.0)
+    parser.add_argument("--ttft-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    runners = {
+        "chunking": bench_chunking,
+        "ingest": bench_ingest,
+        "query": bench_query,
+        "rerank": bench_rerank,
+        "chat": bench_chat,
+    }
+    selected = [s.strip() for s in args.suites.split(",") if s.strip()]
+    unknown = sorted(set(selected) - set(runners))
+    if unknown:
+        parser.error(f"Unknown suites: {', '.join(unknown)}")
+
+    report: Dict[str, object] = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("json", "compare")},
+        },
+        "results": {},
+    }
+    for name in selected:
+        print(f"[{name}]")
+        started = time.perf_counter()
+        result = runners[name](args)
+        report["results"][name] = result
+        print(f"  done in {time.perf_counter() - started:.1f}s")
+        if name not in ("query", "chat"):
+            print(f"  {json.dumps(result)}")
+
+    if args.compare:
+        previous = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        print("\nChange vs", args.compare)
+        _compare(previous.get("results", {}), report["results"])
+
+    if args.json:
+        path = Path(args.json)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
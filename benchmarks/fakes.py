@@ -0,0 +1,121 @@
+"""Deterministic local stand-ins for Ollama/cloud so benchmarks measure this code only."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import random
+import time
+from pathlib import Path
+from typing import AsyncIterator, Iterator, List, Optional
+
+import numpy as np
+
+from rag.embeddings.base import Embeddings
+from rag.llm.base import LLM
+
+_WORDS = (
+    "access account alert api archive backup billing branch build cache certificate "
+    "client cluster config container dashboard database deploy disk dns error export "
+    "firewall gateway incident index ingest invoice kernel latency license log metric "
+    "migration monitor network node onboarding password patch pipeline policy quota "
+    "release replica request restore role schema secret server service session storage "
+    "ticket token upgrade user vendor version volume vpn webhook workflow"
+).split()
+
+
+class FakeEmbeddings(Embeddings):
+    """Unit vectors seeded from the text hash: same text, same vector, no network."""
+
+    model = "fake-embed"
+
+    def __init__(self, dim: int = 384, delay_ms: float = 0.0) -> None:
+        self.dim = dim
+        self.delay_s = delay_ms / 1000.0
+        self.calls = 0
+
+    def _vector(self, text: str) -> List[float]:
+        seed = int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+        vector = np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+        vector /= np.linalg.norm(vector)
+        return vector.tolist()
+
+    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        if self.delay_s:
+            time.sleep(self.delay_s)
+        return [self._vector(t) for t in texts]
+
+    async def aembed_texts(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        if self.delay_s:
+            await asyncio.sleep(self.delay_s)
+        return [self._vector(t) for t in texts]
+
+
+class FakeStreamingLLM(LLM):
+    """Emits `tokens` words, waiting `token_delay_ms` before each (and `ttft_ms` before the first)."""
+
+    def __init__(
+        self, tokens: int = 64, token_delay_ms: float = 5.0, ttft_ms: float = 50.0
+    ) -> None:
+        self.model = "fake-llm"
+        self.tokens = tokens
+        self.token_delay_s = token_delay_ms / 1000.0
+        self.ttft_s = ttft_ms / 1000.0
+
+    def _token(self, index: int) -> str:
+        return f"{_WORDS[index % len(_WORDS)]} "
+
+    def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        return "".join(self.stream(prompt, system_prompt))
+
+    def stream(self, prompt: str, system_prompt: Optional[str] = None) -> Iterator[str]:
+        time.sleep(self.ttft_s)
+        for i in range(self.tokens):
+            if i:
+                time.sleep(self.token_delay_s)
+            yield self._token(i)
+
+    async def agenerate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        return "".join([chunk async for chunk in self.astream(prompt, system_prompt)])
+
+    async def astream(
+        self, prompt: str, system_prompt: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        await asyncio.sleep(self.ttft_s)
+        for i in range(self.tokens):
+            if i:
+                await asyncio.sleep(self.token_delay_s)
+            yield self._token(i)
+
+
+def synthetic_text(rng: random.Random, words: int) -> str:
+    out: List[str] = []
+    while len(out) < words:
+        sentence = [rng.choice(_WORDS) for _ in range(rng.randint(6, 18))]
+        sentence[0] = sentence[0].capitalize()
+        out.extend(sentence)
+        out[-1] += "."
+    return " ".join(out[:words])
+
+
+def generate_corpus(
+    root: Path, files: int, words_per_file: int = 1500, seed: int = 0
+) -> List[Path]:
+    """Write `files` markdown/text files of synthetic prose under `root`."""
+    rng = random.Random(seed)
+    root.mkdir(parents=True, exist_ok=True)
+    paths: List[Path] = []
+    for i in range(files):
+        if i % 2:
+            path = root / f"doc_{i:05d}.md"
+            body = "\n\n".join(
+                f"## Section {s}\n\n{synthetic_text(rng, words_per_file // 4)}" for s in range(4)
+            )
+            path.write_text(f"# Document {i}\n\n{body}\n", encoding="utf-8")
+        else:
+            path = root / f"doc_{i:05d}.txt"
+            path.write_text(synthetic_text(rng, words_per_file), encoding="utf-8")
+        paths.append(path)
+    return paths
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from rag.settings import load_settings
+from rag.vectorstore import NumpyVectorStore
+from rag.vectorstore.ivf import IvfIndex, recall_at_k, summarize_latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report IVF recall@k against exact search")
+    parser.add_argument("--queries", type=int, default=200, help="Number of sampled queries")
+    parser.add_argument("--k", type=int, default=10, help="Cut-off for recall@k")
+    parser.add_argument("--nprobe", default="1,4,8,16,32", help="Comma-separated nprobe values")
+    parser.add_argument("--noise", type=float, default=0.05, help="Gaussian noise added to queries")
+    parser.add_argument("--build", action="store_true", help="(Re)train the IVF index first")
+    parser.add_argument("--json", default=None, help="Write the report to this JSON file")
+    args = parser.parse_args()
+
+    settings = load_settings()
+    store = NumpyVectorStore(
+        index_dir=settings.paths.index_dir,
+        collection_name=settings.vectorstore.collection,
+        ann_enabled=True,
+    )
+    ivf = IvfIndex.load(store.root)
+    if args.build or ivf is None:
+        ivf = store.build_ann_index(nlist=settings.vectorstore.ann.nlist)
+
+    count = store.count()
+    queries = store.sample_vectors(args.queries)
+    if ivf is None or len(queries) == 0:
+        print("Index is empty; ingest with vectorstore.backend=numpy first")
+        return
+
+    rng = np.random.default_rng(0)
+    queries += rng.normal(scale=args.noise, size=queries.shape).astype(np.float32)
+
+    exact: List[List[int]] = []
+    exact_latency: List[float] = []
+    for query in queries:
+        started = time.perf_counter()
+        exact.append([row for row, _ in store.search(query.tolist(), args.k, exact=True)])
+        exact_latency.append(time.perf_counter() - started)
+
+    report: Dict[str, object] = {
+        "rows": int(count),
+        "nlist": ivf.nlist,
+        "k": args.k,
+        "queries": len(queries),
+        "exact": summarize_latencies(exact_latency),
+        "ivf": [],
+    }
+    print(f"rows={count} nlist={ivf.nlist} k={args.k} queries={len(queries)}")
+    print(f"exact: p50={report['exact']['p50_ms']:.2f}ms")
+    for nprobe in (int(v) for v in args.nprobe.split(",") if v.strip()):
+        store.ann_nprobe = nprobe
+        found: List[List[int]] = []
+        latency: List[float] = []
+        for query in queries:
+            started = time.perf_counter()
+            found.append([row for row, _ in store.search(query.tolist(), args.k)])
+            latency.append(time.perf_counter() - started)
+        recall = recall_at_k(exact, found, args.k)
+        stats = summarize_latencies(latency)
+        report["ivf"].append({"nprobe": nprobe, "recall": recall, **stats})  # type: ignore[union-attr]
+        print(f"nprobe={nprobe:<4} recall@{args.k}={recall:.3f} p50={stats['p50_ms']:.2f}ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,25 @@
 from __future__ import annotations
 
 import argparse
-import os
 from pathlib import Path
-from typing import List, Tuple
+from typing import List
 
 import requests
 from tqdm import tqdm
 
-from rag.embeddings import OllamaEmbeddings
-from rag.loaders import SUPPORTED_EXTENSIONS, load_document
-from rag.models import Document
+from rag.embeddings import CachedEmbeddings
+from rag.ingest import (
+    IngestManifest,
+    IngestPipeline,
+    bump_index_version,
+    ingest_fingerprint,
+    plan_ingest,
+)
+from rag.ingest.manifest import MANIFEST_FILENAME
+from rag.loaders import SUPPORTED_EXTENSIONS
+from rag.runtime import build_embeddings, build_lexical_index, build_vectorstore
 from rag.settings import load_settings
-from rag.text.chunking import chunk_text
-from rag.text.normalization import normalize_text
-from rag.vectorstore import ChromaVectorStore
-
-BATCH_SIZE = int(os.getenv("BATCH_SIZE", "8"))
+from rag.vectorstore import NumpyVectorStore
 
 
 def collect_files(root: Path) -> List[Path]:
@@ -25,92 +28,111 @@ def collect_files(root: Path) -> List[Path]:
     )
 
 
-def build_chunks(documents: List[Document], chunk_size: int, overlap: int) -> List[Document]:
-    chunks: List[Document] = []
-    for doc in documents:
-        normalized = normalize_text(doc.text)
-        for idx, chunk in enumerate(chunk_text(normalized, chunk_size, overlap)):
-            chunk_id = f"{doc.doc_id}#chunk={idx+1}"
-            chunks.append(
-                Document(
-                    doc_id=chunk_id,
-                    text=chunk,
-                    metadata=doc.metadata,
-                )
-            )
-    return chunks
-
-
 def main() -> None:
     parser = argparse.ArgumentParser(description="Ingest documents into the vector store")
     parser.add_argument("--data-dir", default=None, help="Override data dir")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Re-embed every file, ignoring the ingest manifest",
+    )
+    parser.add_argument("--load-workers", type=int, default=None, help="Loader processes")
+    parser.add_argument("--embed-workers", type=int, default=None, help="Embedding threads")
     args = parser.parse_args()
 
     settings = load_settings()
+    if args.load_workers is not None:
+        settings.ingest.load_workers = args.load_workers
+    if args.embed_workers is not None:
+        settings.ingest.embed_workers = args.embed_workers
     data_dir = Path(args.data_dir or settings.paths.data_dir) / "raw"
     data_dir.mkdir(parents=True, exist_ok=True)
 
-    embedder = OllamaEmbeddings(
-        base_url=settings.ollama.base_url,
-        model=settings.ollama.embed_model,
-        timeout_s=settings.ollama.timeout_s,
-    )
-    store = ChromaVectorStore(index_dir=settings.paths.index_dir)
+    # Ingest already embeds in batches; the query coalescer would only add latency.
+    embedder = build_embeddings(settings, batching=False)
+    store = build_vectorstore(settings)
 
+    manifest = IngestManifest.load(Path(settings.paths.index_dir) / MANIFEST_FILENAME)
     files = collect_files(data_dir)
+    fingerprint = ingest_fingerprint(settings)
+    lexical = build_lexical_index(settings)
+    full = args.full
+    if lexical is not None and lexical.count() == 0 and manifest.entries:
+        # The BM25 index is only written for re-indexed files; rebuild it if it was lost.
+        print("BM25 index is empty: re-indexing every file")
+        full = True
+    plan = plan_ingest(files, manifest, full=full, fingerprint=fingerprint)
+    if plan.config_changed and manifest.entries:
+        print("Ingest settings changed since the last run: re-indexing every file")
+
+    progress = tqdm(total=len(plan.to_index), desc="Indexing")
+    pipeline = IngestPipeline(
+        embedder=embedder,
+        store=store,
+        manifest=manifest,
+        config=settings.ingest,
+        chunk_size=settings.rag.chunk_size,
+        chunk_overlap=settings.rag.chunk_overlap,
+        chunking=settings.chunking,
+        loaders=settings.loaders,
+        on_file_done=lambda _: progress.update(1),
+        lexical=lexical,
+    )
+    try:
+        report = pipeline.run(plan)
+    except requests.HTTPError as exc:
+        if exc.response is not None and exc.response.status_code == 404:
+            model = settings.ollama.embed_model
+            raise RuntimeError(
+                f"Embedding model '{model}' not found on Ollama ({settings.ollama.base_url}). "
+                f"Install it first, e.g.: make ollama-pull MODEL={model}"
+            ) from exc
+        raise
+    finally:
+        progress.close()
+        manifest.save()
+        if plan.to_index or plan.removed:
+            # Tells running API processes to drop cached answers built on the old index.
+            bump_index_version(settings.paths.index_dir, fingerprint)
+
+    ann = settings.vectorstore.ann
+    if ann.enabled and isinstance(store, NumpyVectorStore):
+        if store.ensure_ann_index(nlist=ann.nlist, rebuild_growth=ann.rebuild_growth):
+            print("Trained IVF index")
+
     if not files:
         print(f"No supported files found in {data_dir}")
-        return
-
-    skipped_files: List[Tuple[Path, str]] = []
-    batch: List[Document] = []
-    total_chunks = 0
-    ingested_files = 0
-
-    def flush_batch() -> None:
-        nonlocal batch, total_chunks
-        if not batch:
-            return
-        try:
-            embeddings = embedder.embed_texts([d.text for d in batch])
-        except requests.HTTPError as exc:
-            if exc.response is not None and exc.response.status_code == 404:
-                model = settings.ollama.embed_model
-                raise RuntimeError(
-                    f"Embedding model '{model}' not found on Ollama ({settings.ollama.base_url}). "
-                    f"Install it first, e.g.: make ollama-pull MODEL={model}"
-                ) from exc
-            raise
-        store.add(batch, embeddings)
-        total_chunks += len(batch)
-        batch = []
-
-    for file in tqdm(files, desc="Indexing"):
-        try:
-            docs = load_document(file)
-        except Exception as exc:  # noqa: BLE001
-            skipped_files.append((file, str(exc)))
-            continue
-
-        file_chunks = build_chunks(docs, settings.rag.chunk_size, settings.rag.chunk_overlap)
-        if not file_chunks:
-            continue
-        ingested_files += 1
-        for doc in file_chunks:
-            batch.append(doc)
-            if len(batch) >= BATCH_SIZE:
-                flush_batch()
-
-    flush_batch()
-
-    if total_chunks == 0:
+    elif report.indexed_chunks == 0:
         print("No chunks were indexed")
     else:
-        print(f"Indexed {total_chunks} chunks from {ingested_files} files")
-
-    if skipped_files:
+        rate = report.indexed_chunks / report.elapsed_s if report.elapsed_s else 0.0
+        print(
+            f"Indexed {report.indexed_chunks} chunks from {report.indexed_files} files "
+            f"in {report.elapsed_s:.1f}s ({rate:.1f} chunks/s)"
+        )
+    if report.saved_bytes:
+        print(
+            f"Loader representations skipped {report.saved_bytes / 1e6:.2f} MB of duplicate text "
+            f"(~{report.saved_chunks} chunks)"
+        )
+    if report.unchanged_files:
+        print(f"Skipped {report.unchanged_files} unchanged files")
+    if report.removed_files or report.removed_chunks:
+        print(
+            f"Removed {report.removed_chunks} stale chunks "
+            f"({report.removed_files} deleted files)"
+        )
+
+    if isinstance(embedder, CachedEmbeddings):
+        stats = embedder.stats()
+        print(
+            f"Embedding cache: {stats['hits']} hits, {stats['misses']} misses "
+            f"({stats['hit_rate']:.0%} hit rate)"
+        )
+
+    if report.skipped:
         print("\nSkipped files:")
-        for file, reason in skipped_files:
+        for file, reason in report.skipped:
             print(f"- {file}: {reason}")
 
 
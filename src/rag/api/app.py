@@ -2,20 +2,29 @@ from __future__ import annotations
 
 import logging
 import time
+from contextlib import asynccontextmanager
 from uuid import uuid4
 
 from functools import lru_cache
-from typing import List, Optional
+from typing import Dict, List, Optional, Union
 
+import anyio
+import httpx
 import requests
 import json
 
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
+from ..http_pool import aclose_async_clients, get_session, pool_settings_from, pool_stats
 from ..logging import setup_logging
+from ..metrics import HTTP_REQUEST_SECONDS, HTTP_REQUESTS_TOTAL, REGISTRY
 from ..rag import RagPipeline
+from ..retrieval import RetrievalFilter
+from ..text.terms import TERMS_METADATA_KEY
+from .model_registry import ModelRegistry
 from ..runtime import build_pipeline
 from ..settings import Settings, load_settings
 
@@ -23,11 +32,56 @@ setup_logging()
 settings = load_settings()
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="LLM-RAG", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    model_registry.start()
+    yield
+    model_registry.stop()
+    await aclose_async_clients()
+
+
+app = FastAPI(title="LLM-RAG", version="0.1.0", lifespan=lifespan)
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template, not raw path, to keep label cardinality bounded.
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        HTTP_REQUESTS_TOTAL.inc(route=route, status=str(status))
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, route=route)
+
+
+class QueryFilters(BaseModel):
+    """Restrict retrieval to matching chunks (applied inside the vector store)."""
+
+    source_prefix: Optional[str] = None
+    formats: List[str] = Field(default_factory=list)
+    page_min: Optional[int] = None
+    page_max: Optional[int] = None
+    metadata: Dict[str, Union[str, int, float, bool]] = Field(default_factory=dict)
+
+    def to_filter(self) -> RetrievalFilter:
+        return RetrievalFilter(
+            source_prefix=self.source_prefix,
+            formats=tuple(self.formats),
+            page_min=self.page_min,
+            page_max=self.page_max,
+            metadata=dict(self.metadata),
+        )
 
 
 class QueryRequest(BaseModel):
     question: str
+    include_timings: bool = False
+    filters: Optional[QueryFilters] = None
 
 
 class SourceItem(BaseModel):
@@ -36,11 +90,20 @@ class SourceItem(BaseModel):
     metadata: dict
 
 
+def _public_metadata(metadata: dict) -> dict:
+    # Precomputed rerank features are internal and can be large.
+    return {k: v for k, v in metadata.items() if k != TERMS_METADATA_KEY}
+
+
 class QueryResponse(BaseModel):
     answer: str
     sources: List[SourceItem]
     model: str
     used_fallback: bool
+    cached: bool = False
+    timings: Optional[Dict[str, float]] = None
+    # Context packing stats (tokens sent/saved, merged, duplicates), with include_timings.
+    context: Optional[Dict[str, int]] = None
 
 
 class OpenAIMessage(BaseModel):
@@ -110,7 +173,9 @@ def _build_settings_for_model(model_name: str) -> Settings:
     return cfg
 
 
-@lru_cache(maxsize=8)
+# Pipelines share the embedder and vector store (runtime.components); an entry only
+# holds the model's LLM clients and answer cache.
+@lru_cache(maxsize=32)
 def get_pipeline_for_model(model_name: str) -> RagPipeline:
     return build_pipeline(_build_settings_for_model(model_name))
 
@@ -124,34 +189,41 @@ def _extract_user_prompt(messages: List[OpenAIMessage]) -> str:
     raise HTTPException(status_code=400, detail="At least one non-empty user message is required")
 
 
-def _run_pipeline_answer(pipeline: RagPipeline, question: str):
-    try:
-        return pipeline.answer(question)
-    except requests.exceptions.ReadTimeout as exc:
-        raise HTTPException(
+def _upstream_error(exc: Exception) -> HTTPException:
+    if isinstance(exc, (requests.exceptions.ReadTimeout, httpx.TimeoutException)):
+        return HTTPException(
             status_code=504,
             detail="LLM request timed out. Try a smaller model or retry.",
-        ) from exc
-    except requests.exceptions.ConnectionError as exc:
-        raise HTTPException(
+        )
+    if isinstance(exc, (requests.exceptions.ConnectionError, httpx.TransportError)):
+        return HTTPException(
             status_code=503,
             detail=f"Cannot reach Ollama at {settings.ollama.base_url}.",
-        ) from exc
-    except requests.exceptions.HTTPError as exc:
-        status = exc.response.status_code if exc.response is not None else "unknown"
-        raise HTTPException(
+        )
+    if isinstance(exc, (requests.exceptions.HTTPError, httpx.HTTPStatusError)):
+        response = getattr(exc, "response", None)
+        status = response.status_code if response is not None else "unknown"
+        return HTTPException(
             status_code=502,
             detail=f"Upstream LLM HTTP error ({status}).",
-        ) from exc
+        )
+    logger.exception("Unhandled pipeline error")
+    return HTTPException(status_code=500, detail=f"RAG internal error: {exc}")
+
+
+async def _run_pipeline_answer(
+    pipeline: RagPipeline, question: str, filters: Optional[RetrievalFilter] = None
+):
+    try:
+        return await pipeline.aanswer(question, filters)
     except HTTPException:
         raise
     except Exception as exc:  # noqa: BLE001
-        logger.exception("Unhandled pipeline error")
-        raise HTTPException(status_code=500, detail=f"RAG internal error: {exc}") from exc
+        raise _upstream_error(exc) from exc
 
 
 def _available_models() -> List[str]:
-    ollama_models = [m for m in _list_ollama_models() if _is_chat_model_name(m)]
+    ollama_models = [m for m in model_registry.models() if _is_chat_model_name(m)]
 
     # Always expose the configured runtime model even if model discovery fails.
     candidates: List[str] = [_configured_model_name()]
@@ -173,16 +245,14 @@ def _available_models() -> List[str]:
 
 
 def _list_ollama_models() -> List[str]:
-    try:
-        resp = requests.get(
-            f"{settings.ollama.base_url.rstrip('/')}/api/tags",
-            timeout=min(settings.ollama.timeout_s, 10),
-        )
-        resp.raise_for_status()
-        payload = resp.json()
-    except Exception as exc:  # noqa: BLE001
-        logger.warning("Unable to list Ollama models from %s: %s", settings.ollama.base_url, exc)
-        return []
+    """Fetch installed models from Ollama. Errors propagate so the registry keeps its last list."""
+    session = get_session("ollama", pool_settings_from(settings.ollama))
+    resp = session.get(
+        f"{settings.ollama.base_url.rstrip('/')}/api/tags",
+        timeout=min(settings.ollama.timeout_s, 10),
+    )
+    resp.raise_for_status()
+    payload = resp.json()
 
     models = payload.get("models", [])
     names: List[str] = []
@@ -195,6 +265,13 @@ def _list_ollama_models() -> List[str]:
     return names
 
 
+model_registry = ModelRegistry(
+    _list_ollama_models,
+    ttl_s=settings.model.discovery_ttl_s,
+    refresh_interval_s=settings.model.discovery_refresh_s,
+)
+
+
 def _is_chat_model_name(name: str) -> bool:
     lowered = name.lower()
     return "embed" not in lowered and "embedding" not in lowered
@@ -208,21 +285,34 @@ def health() -> dict:
         "provider": primary_provider,
         "model": _configured_model_name(),
         "available_models": _available_models(),
+        "model_registry": model_registry.stats(),
+        "http_pools": pool_stats(),
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.post("/query", response_model=QueryResponse)
-def query(req: QueryRequest) -> QueryResponse:
+async def query(req: QueryRequest) -> QueryResponse:
     logger.info("RAG query endpoint called")
-    resp = _run_pipeline_answer(get_pipeline(), req.question)
+    pipeline = await run_in_threadpool(get_pipeline)
+    filters = req.filters.to_filter() if req.filters is not None else None
+    resp = await _run_pipeline_answer(pipeline, req.question, filters)
     sources = [
-        SourceItem(doc_id=s.doc_id, score=s.score, metadata=s.metadata) for s in resp.sources
+        SourceItem(doc_id=s.doc_id, score=s.score, metadata=_public_metadata(s.metadata))
+        for s in resp.sources
     ]
     return QueryResponse(
         answer=resp.answer,
         sources=sources,
         model=resp.model,
         used_fallback=resp.used_fallback,
+        cached=resp.cached,
+        timings=resp.timings if req.include_timings else None,
+        context=resp.context if req.include_timings else None,
     )
 
 
@@ -232,9 +322,16 @@ def list_models() -> OpenAIModelsResponse:
 
 
 @app.post("/v1/chat/completions", response_model=OpenAIChatResponse)
-def openai_chat_completions(req: OpenAIChatRequest) -> OpenAIChatResponse:
+async def openai_chat_completions(req: OpenAIChatRequest) -> OpenAIChatResponse:
     requested_model = (req.model or "").strip()
-    available_models = _available_models()
+    if model_registry.loaded:
+        available_models = _available_models()
+    else:
+        available_models = await run_in_threadpool(_available_models)
+    if requested_model and requested_model not in available_models:
+        # The model may have been pulled since the last refresh (rate-limited re-check).
+        if await run_in_threadpool(model_registry.refresh, False):
+            available_models = _available_models()
     if requested_model and requested_model not in available_models:
         raise HTTPException(
             status_code=400,
@@ -243,13 +340,21 @@ def openai_chat_completions(req: OpenAIChatRequest) -> OpenAIChatResponse:
     logger.info("OpenAI-compatible endpoint called (stream=%s)", req.stream)
     question = _extract_user_prompt(req.messages)
 
+    pipeline = await run_in_threadpool(get_pipeline_for_model, requested_model)
+
     if req.stream:
         chat_id = f"chatcmpl-{uuid4().hex}"
-        pipeline = get_pipeline_for_model(requested_model)
-        stream_iter = pipeline.answer_stream(question)
+        # Retrieval runs before the response starts, so its failures are HTTP errors
+        # rather than a truncated event stream.
+        try:
+            stream_iter = await pipeline.astart_stream(question)
+        except HTTPException:
+            raise
+        except Exception as exc:  # noqa: BLE001
+            raise _upstream_error(exc) from exc
         model_name = _configured_model_name(pipeline.settings)
 
-        def event_stream():
+        async def event_stream():
             # First chunk: send assistant role so some clients start rendering immediately.
             role_payload = {
                 "id": chat_id,
@@ -266,21 +371,27 @@ def openai_chat_completions(req: OpenAIChatRequest) -> OpenAIChatResponse:
             }
             yield f"data: {json.dumps(role_payload)}\n\n"
 
-            for chunk in stream_iter:
-                payload = {
-                    "id": chat_id,
-                    "object": "chat.completion.chunk",
-                    "created": int(time.time()),
-                    "model": model_name,
-                    "choices": [
-                        {
-                            "index": 0,
-                            "delta": {"content": chunk},
-                            "finish_reason": None,
-                        }
-                    ],
-                }
-                yield f"data: {json.dumps(payload)}\n\n"
+            try:
+                async for chunk in stream_iter:
+                    payload = {
+                        "id": chat_id,
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": model_name,
+                        "choices": [
+                            {
+                                "index": 0,
+                                "delta": {"content": chunk},
+                                "finish_reason": None,
+                            }
+                        ],
+                    }
+                    yield f"data: {json.dumps(payload)}\n\n"
+            finally:
+                # Client disconnects close this generator; close the pipeline stream
+                # (and with it the upstream LLM request) even while being cancelled.
+                with anyio.CancelScope(shield=True):
+                    await stream_iter.aclose()
             yield (
                 "data: "
                 + json.dumps(
@@ -312,8 +423,7 @@ def openai_chat_completions(req: OpenAIChatRequest) -> OpenAIChatResponse:
             },
         )
 
-    pipeline = get_pipeline_for_model(requested_model)
-    result = _run_pipeline_answer(pipeline, question)
+    result = await _run_pipeline_answer(pipeline, question)
     return OpenAIChatResponse(
         id=f"chatcmpl-{uuid4().hex}",
         created=int(time.time()),
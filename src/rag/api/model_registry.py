@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """
+    In-memory cache of discovered model names with stale-while-revalidate semantics.
+
+    `models()` never waits on the network once a first list is loaded: a stale list
+    (older than `ttl_s`) is returned immediately while one background refresh runs.
+    Failed refreshes keep the last good list. `start()` adds a periodic refresher so
+    the list is usually fresh before anyone asks.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], List[str]],
+        ttl_s: float = 60.0,
+        refresh_interval_s: float = 30.0,
+        min_refresh_interval_s: float = 5.0,
+    ) -> None:
+        self.fetch = fetch
+        self.ttl_s = ttl_s
+        self.refresh_interval_s = refresh_interval_s
+        self.min_refresh_interval_s = min_refresh_interval_s
+        self._models: Optional[List[str]] = None
+        self._loaded_at = 0.0
+        self._attempted_at: Optional[float] = None
+        self._last_error: Optional[str] = None
+        self._refreshes = 0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._models is not None
+
+    def models(self) -> List[str]:
+        if self._models is None:
+            # Cold start: the first caller loads synchronously; concurrent callers wait
+            # for it and then skip their own fetch (min_refresh_interval_s).
+            self.refresh(force=False)
+        elif time.monotonic() - self._loaded_at > self.ttl_s:
+            self._refresh_in_background()
+        return list(self._models or [])
+
+    def refresh(self, force: bool = True) -> bool:
+        """
+        Fetch the model list now. Without `force`, skips (returns False) if a fetch was
+        attempted less than `min_refresh_interval_s` ago.
+        """
+        with self._refresh_lock:
+            now = time.monotonic()
+            recent = (
+                self._attempted_at is not None
+                and now - self._attempted_at < self.min_refresh_interval_s
+            )
+            if recent and not force:
+                return False
+            self._attempted_at = now
+            try:
+                models = self.fetch()
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Model discovery failed, keeping previous list: %s", exc)
+                with self._lock:
+                    self._last_error = str(exc)
+                    if self._models is None:
+                        self._models = []
+                return False
+            with self._lock:
+                self._models = list(models)
+                self._loaded_at = time.monotonic()
+                self._last_error = None
+                self._refreshes += 1
+            return True
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="model-registry", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def stats(self) -> Dict[str, object]:
+        age = time.monotonic() - self._loaded_at if self._loaded_at else None
+        return {
+            "models": len(self._models or []),
+            "age_s": round(age, 1) if age is not None else None,
+            "stale": age is None or age > self.ttl_s,
+            "refreshes": self._refreshes,
+            "last_error": self._last_error,
+        }
+
+    def _refresh_in_background(self) -> None:
+        if self._refresh_lock.locked():
+            return
+        threading.Thread(
+            target=self.refresh,
+            kwargs={"force": False},
+            name="model-registry-refresh",
+            daemon=True,
+        ).start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.refresh_interval_s)
@@ -1,4 +1,6 @@
 from .base import Embeddings
+from .batching import BatchingEmbeddings
+from .cache import CachedEmbeddings
 from .ollama import OllamaEmbeddings
 
-__all__ = ["Embeddings", "OllamaEmbeddings"]
+__all__ = ["Embeddings", "BatchingEmbeddings", "CachedEmbeddings", "OllamaEmbeddings"]
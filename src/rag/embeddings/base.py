@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from abc import ABC, abstractmethod
 from typing import List
 
@@ -8,3 +9,10 @@ class Embeddings(ABC):
     @abstractmethod
     def embed_texts(self, texts: List[str]) -> List[List[float]]:
         raise NotImplementedError
+
+    async def aembed_texts(self, texts: List[str]) -> List[List[float]]:
+        """
+        Async interface. Default: run the sync implementation in a worker thread.
+        Network-bound implementations should override with a native async client.
+        """
+        return await asyncio.to_thread(self.embed_texts, texts)
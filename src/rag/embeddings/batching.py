@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from .base import Embeddings
+
+_SENTINEL = None
+
+
+@dataclass
+class _Request:
+    texts: List[str]
+    future: Future
+
+
+class BatchingEmbeddings(Embeddings):
+    """
+    Coalesces small concurrent embedding calls (typically one query per API request)
+    into batched calls to `inner`.
+
+    A dispatcher thread takes the first waiting request, keeps collecting requests
+    for up to `max_wait_ms` or until `max_batch` texts are queued, then hands the
+    batch to a small pool that calls `inner.embed_texts` once and resolves each
+    caller's future with its own slice of vectors. Calls with `max_batch` texts or
+    more (ingest batches) bypass the queue.
+    """
+
+    def __init__(
+        self,
+        inner: Embeddings,
+        max_batch: int = 32,
+        max_wait_ms: float = 5.0,
+        max_concurrency: int = 4,
+    ) -> None:
+        self.inner = inner
+        self.model = getattr(inner, "model", type(inner).__name__)
+        self.max_batch = max(1, max_batch)
+        self.max_wait_s = max(0.0, max_wait_ms) / 1000.0
+        self.batches = 0
+        self.requests = 0
+        self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_concurrency), thread_name_prefix="embed-batch"
+        )
+        self._lock = threading.Lock()
+        self._dispatcher = threading.Thread(
+            target=self._dispatch, name="embed-batch-dispatcher", daemon=True
+        )
+        self._dispatcher.start()
+
+    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        if len(texts) >= self.max_batch:
+            return self.inner.embed_texts(texts)
+        return self._submit(texts).result()
+
+    async def aembed_texts(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        if len(texts) >= self.max_batch:
+            return await self.inner.aembed_texts(texts)
+        return await asyncio.wrap_future(self._submit(texts))
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "avg_batch_requests": self.requests / self.batches if self.batches else 0.0,
+        }
+
+    def close(self) -> None:
+        self._queue.put(_SENTINEL)
+        self._dispatcher.join()
+        self._executor.shutdown(wait=True)
+
+    def _submit(self, texts: List[str]) -> Future:
+        future: Future = Future()
+        self._queue.put(_Request(list(texts), future))
+        return future
+
+    def _dispatch(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is _SENTINEL:
+                return
+            batch = [first]
+            size = len(first.texts)
+            deadline = time.monotonic() + self.max_wait_s
+            closing = False
+            while size < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        item = self._queue.get(timeout=remaining)
+                    else:
+                        item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _SENTINEL:
+                    closing = True
+                    break
+                batch.append(item)
+                size += len(item.texts)
+            with self._lock:
+                self.batches += 1
+                self.requests += len(batch)
+            self._executor.submit(self._run_batch, batch)
+            if closing:
+                return
+
+    def _run_batch(self, batch: List[_Request]) -> None:
+        # Callers that gave up (e.g. a cancelled asyncio task) are dropped from the batch.
+        batch = [request for request in batch if request.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        texts = [text for request in batch for text in request.texts]
+        try:
+            vectors = self.inner.embed_texts(texts)
+            if len(vectors) != len(texts):
+                raise ValueError(
+                    f"Embedding backend returned {len(vectors)} vectors for {len(texts)} texts"
+                )
+        except BaseException as exc:  # noqa: BLE001
+            for request in batch:
+                request.future.set_exception(exc)
+            return
+        offset = 0
+        for request in batch:
+            end = offset + len(request.texts)
+            request.future.set_result(vectors[offset:end])
+            offset = end
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .base import Embeddings
+
+_SQL_CHUNK = 500
+
+
+def text_digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _pack(vector: Sequence[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _unpack(blob: bytes) -> List[float]:
+    values = array("f")
+    values.frombytes(blob)
+    return values.tolist()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps any `Embeddings` with an on-disk SQLite cache keyed by (model, sha256(text)).
+    Vectors are stored as float32; the least recently used entries are evicted once
+    the cache grows past `max_entries`.
+    """
+
+    def __init__(
+        self,
+        inner: Embeddings,
+        path: str,
+        model: Optional[str] = None,
+        max_entries: int = 1_000_000,
+    ) -> None:
+        self.inner = inner
+        self.model = model or getattr(inner, "model", type(inner).__name__)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL,"
+            " digest TEXT NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " last_used REAL NOT NULL,"
+            " PRIMARY KEY (model, digest))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings(last_used)"
+        )
+        self._size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        digests, found = self._lookup(texts)
+        missing = self._missing(texts, digests, found)
+        if missing:
+            vectors = self.inner.embed_texts([text for _, text in missing])
+            self._store(missing, vectors, found)
+        return [found[d] for d in digests]
+
+    async def aembed_texts(self, texts: List[str]) -> List[List[float]]:
+        digests, found = await asyncio.to_thread(self._lookup, texts)
+        missing = self._missing(texts, digests, found)
+        if missing:
+            vectors = await self.inner.aembed_texts([text for _, text in missing])
+            await asyncio.to_thread(self._store, missing, vectors, found)
+        return [found[d] for d in digests]
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": self._size,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _missing(
+        self, texts: List[str], digests: List[str], found: Dict[str, List[float]]
+    ) -> List[Tuple[str, str]]:
+        # Deduplicate within the batch so repeated boilerplate is embedded once.
+        missing: Dict[str, str] = {}
+        for digest, text in zip(digests, texts):
+            if digest not in found and digest not in missing:
+                missing[digest] = text
+        with self._lock:
+            self.misses += len(missing)
+            self.hits += len(texts) - len(missing)
+        return list(missing.items())
+
+    def _lookup(self, texts: List[str]) -> Tuple[List[str], Dict[str, List[float]]]:
+        digests = [text_digest(t) for t in texts]
+        unique = list(dict.fromkeys(digests))
+        found: Dict[str, List[float]] = {}
+        now = time.time()
+        with self._lock:
+            for start in range(0, len(unique), _SQL_CHUNK):
+                part = unique[start : start + _SQL_CHUNK]
+                marks = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT digest, vector FROM embeddings WHERE model = ? AND digest IN ({marks})",
+                    (self.model, *part),
+                ).fetchall()
+                for digest, blob in rows:
+                    found[digest] = _unpack(blob)
+            if found:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND digest = ?",
+                    [(now, self.model, digest) for digest in found],
+                )
+                self._conn.execute("COMMIT")
+        return digests, found
+
+    def _store(
+        self,
+        missing: List[Tuple[str, str]],
+        vectors: List[List[float]],
+        found: Dict[str, List[float]],
+    ) -> None:
+        if len(vectors) != len(missing):
+            raise ValueError(
+                f"Embedding backend returned {len(vectors)} vectors for {len(missing)} texts"
+            )
+        now = time.time()
+        rows = []
+        for (digest, _), vector in zip(missing, vectors):
+            found[digest] = list(vector)
+            rows.append((self.model, digest, _pack(vector), now))
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings(model, digest, vector, last_used) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.execute("COMMIT")
+            self._size += self._conn.total_changes - before
+            self._evict()
+
+    def _evict(self) -> None:
+        if self.max_entries <= 0 or self._size <= self.max_entries:
+            return
+        # Evict down to 90% so eviction runs in batches instead of on every insert.
+        excess = self._size - int(self.max_entries * 0.9)
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE rowid IN "
+            "(SELECT rowid FROM embeddings ORDER BY last_used, rowid LIMIT ?)",
+            (excess,),
+        )
+        self._size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
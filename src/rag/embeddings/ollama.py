@@ -1,17 +1,26 @@
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
+import httpx
 import requests
 
+from ..http_pool import get_async_client, get_session
 from .base import Embeddings
 
 
 class OllamaEmbeddings(Embeddings):
-    def __init__(self, base_url: str, model: str, timeout_s: int = 30):
+    def __init__(
+        self,
+        base_url: str,
+        model: str,
+        timeout_s: int = 30,
+        session: Optional[requests.Session] = None,
+    ):
         self.base_url = base_url.rstrip("/")
         self.model = model
         self.timeout_s = timeout_s
+        self.session = session or get_session("ollama")
 
     def embed_texts(self, texts: List[str]) -> List[List[float]]:
         """Embed texts by trying Ollama endpoints from newest to oldest.
@@ -35,54 +44,109 @@ class OllamaEmbeddings(Embeddings):
             raise last_err
         raise RuntimeError("No Ollama embedding endpoint succeeded")
 
+    async def aembed_texts(self, texts: List[str]) -> List[List[float]]:
+        """Async variant of `embed_texts` with the same endpoint preference order."""
+
+        last_err: Optional[Exception] = None
+        for fn in (self._aembed_v2, self._aembed_v1, self._aembed_openai):
+            try:
+                return await fn(texts)
+            except httpx.HTTPStatusError as exc:
+                last_err = exc
+                if exc.response.status_code in (404, 405):
+                    continue
+                raise
+        if last_err:
+            raise last_err
+        raise RuntimeError("No Ollama embedding endpoint succeeded")
+
     def _embed_v2(self, texts: List[str]) -> List[List[float]]:
-        resp = requests.post(
+        resp = self.session.post(
             f"{self.base_url}/api/embed",
             json={"model": self.model, "input": texts},
             timeout=self.timeout_s,
         )
         resp.raise_for_status()
-        data = resp.json()
-        embeddings = data.get("embeddings") or data.get("embedding")
-        if embeddings is None:
-            raise ValueError("Missing embeddings in Ollama response")
-        # Normalize to list of lists
-        if embeddings and isinstance(embeddings[0], (int, float)):
-            return [embeddings]  # single vector
-        return embeddings
+        return _parse_v2(resp.json())
 
     def _embed_v1(self, texts: List[str]) -> List[List[float]]:
         embeddings: List[List[float]] = []
         for text in texts:
-            resp = requests.post(
+            resp = self.session.post(
                 f"{self.base_url}/api/embeddings",
                 json={"model": self.model, "prompt": text},
                 timeout=self.timeout_s,
             )
             resp.raise_for_status()
-            data = resp.json()
-            embedding = data.get("embedding") or data.get("embeddings")
-            if embedding is None:
-                raise ValueError("Missing embedding in Ollama response")
-            if embedding and isinstance(embedding[0], (int, float)):
-                embeddings.append(embedding)
-            else:
-                embeddings.extend(embedding)
+            embeddings.extend(_parse_v1(resp.json()))
         return embeddings
 
     def _embed_openai(self, texts: List[str]) -> List[List[float]]:
-        resp = requests.post(
+        resp = self.session.post(
+            f"{self.base_url}/v1/embeddings",
+            json={"model": self.model, "input": texts},
+            timeout=self.timeout_s,
+        )
+        resp.raise_for_status()
+        return _parse_openai(resp.json())
+
+    async def _aembed_v2(self, texts: List[str]) -> List[List[float]]:
+        resp = await get_async_client("ollama").post(
+            f"{self.base_url}/api/embed",
+            json={"model": self.model, "input": texts},
+            timeout=self.timeout_s,
+        )
+        resp.raise_for_status()
+        return _parse_v2(resp.json())
+
+    async def _aembed_v1(self, texts: List[str]) -> List[List[float]]:
+        client = get_async_client("ollama")
+        embeddings: List[List[float]] = []
+        for text in texts:
+            resp = await client.post(
+                f"{self.base_url}/api/embeddings",
+                json={"model": self.model, "prompt": text},
+                timeout=self.timeout_s,
+            )
+            resp.raise_for_status()
+            embeddings.extend(_parse_v1(resp.json()))
+        return embeddings
+
+    async def _aembed_openai(self, texts: List[str]) -> List[List[float]]:
+        resp = await get_async_client("ollama").post(
             f"{self.base_url}/v1/embeddings",
             json={"model": self.model, "input": texts},
             timeout=self.timeout_s,
         )
         resp.raise_for_status()
-        data = resp.json()
-        if "data" in data:
-            return [item["embedding"] for item in data["data"]]
-        embedding = data.get("embedding") or data.get("embeddings")
-        if embedding is None:
-            raise ValueError("Missing embeddings in OpenAI-compatible response")
-        if embedding and isinstance(embedding[0], (int, float)):
-            return [embedding]
-        return embedding
+        return _parse_openai(resp.json())
+
+
+def _parse_v2(data: Dict[str, Any]) -> List[List[float]]:
+    embeddings = data.get("embeddings") or data.get("embedding")
+    if embeddings is None:
+        raise ValueError("Missing embeddings in Ollama response")
+    # Normalize to list of lists
+    if embeddings and isinstance(embeddings[0], (int, float)):
+        return [embeddings]  # single vector
+    return embeddings
+
+
+def _parse_v1(data: Dict[str, Any]) -> List[List[float]]:
+    embedding = data.get("embedding") or data.get("embeddings")
+    if embedding is None:
+        raise ValueError("Missing embedding in Ollama response")
+    if embedding and isinstance(embedding[0], (int, float)):
+        return [embedding]
+    return embedding
+
+
+def _parse_openai(data: Dict[str, Any]) -> List[List[float]]:
+    if "data" in data:
+        return [item["embedding"] for item in data["data"]]
+    embedding = data.get("embedding") or data.get("embeddings")
+    if embedding is None:
+        raise ValueError("Missing embeddings in OpenAI-compatible response")
+    if embedding and isinstance(embedding[0], (int, float)):
+        return [embedding]
+    return embedding
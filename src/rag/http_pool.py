@@ -0,0 +1,189 @@
+"""Shared, keep-alive HTTP sessions for the upstream model providers.
+
+Every adapter (Ollama embeddings/LLM, cloud LLM, model discovery) borrows a
+named `requests.Session` from this module instead of calling `requests.post`
+directly, so TCP/TLS connections are reused across queries. The async code
+paths get an `httpx.AsyncClient` per (name, event loop) with the same limits.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Any, Dict, MutableMapping, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+RETRY_STATUS_CODES = (502, 503, 504)
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    pool_connections: int = 4
+    pool_maxsize: int = 16
+    pool_block: bool = False
+    keep_alive: bool = True
+    max_retries: int = 2
+    retry_backoff_s: float = 0.3
+
+
+def pool_settings_from(config: Any) -> PoolSettings:
+    """Build pool settings from an `OllamaConfig`/`CloudConfig`-like object."""
+    defaults = PoolSettings()
+    return PoolSettings(
+        pool_connections=getattr(config, "pool_connections", defaults.pool_connections),
+        pool_maxsize=getattr(config, "pool_maxsize", defaults.pool_maxsize),
+        pool_block=getattr(config, "pool_block", defaults.pool_block),
+        keep_alive=getattr(config, "keep_alive", defaults.keep_alive),
+        max_retries=getattr(config, "max_retries", defaults.max_retries),
+        retry_backoff_s=getattr(config, "retry_backoff_s", defaults.retry_backoff_s),
+    )
+
+
+def _build_retry(pool: PoolSettings) -> Retry:
+    # Only retry failures that cannot have started a generation: connection errors
+    # (any method) and gateway-style statuses for idempotent methods. POSTs that reached
+    # the upstream (generate/embed/completions) are never replayed, nor are read errors,
+    # so a slow or failed generation is not run and billed twice.
+    return Retry(
+        total=pool.max_retries,
+        connect=pool.max_retries,
+        read=0,
+        status=pool.max_retries,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        backoff_factor=pool.retry_backoff_s,
+        raise_on_status=False,
+        respect_retry_after_header=True,
+    )
+
+
+def build_session(pool: Optional[PoolSettings] = None) -> requests.Session:
+    pool = pool or PoolSettings()
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool.pool_connections,
+        pool_maxsize=pool.pool_maxsize,
+        pool_block=pool.pool_block,
+        max_retries=_build_retry(pool),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if not pool.keep_alive:
+        session.headers["Connection"] = "close"
+    return session
+
+
+def build_async_client(pool: Optional[PoolSettings] = None) -> httpx.AsyncClient:
+    pool = pool or PoolSettings()
+    limits = httpx.Limits(
+        max_connections=pool.pool_connections * pool.pool_maxsize,
+        max_keepalive_connections=pool.pool_maxsize if pool.keep_alive else 0,
+    )
+    # httpx only retries connection failures, which matches the sync policy for reads.
+    transport = httpx.AsyncHTTPTransport(limits=limits, retries=pool.max_retries)
+    return httpx.AsyncClient(transport=transport, timeout=httpx.Timeout(None))
+
+
+_sessions: Dict[str, requests.Session] = {}
+_pool_settings: Dict[str, PoolSettings] = {}
+_async_clients: MutableMapping[asyncio.AbstractEventLoop, Dict[str, httpx.AsyncClient]] = (
+    weakref.WeakKeyDictionary()
+)
+_sessions_lock = threading.Lock()
+
+
+def get_session(name: str, pool: Optional[PoolSettings] = None) -> requests.Session:
+    """
+    Return the process-wide session registered under `name`.
+    Pool settings only apply when the session is first created.
+    """
+    with _sessions_lock:
+        session = _sessions.get(name)
+        if session is None:
+            pool = pool or _pool_settings.get(name) or PoolSettings()
+            _pool_settings.setdefault(name, pool)
+            session = build_session(pool)
+            _sessions[name] = session
+        return session
+
+
+def get_async_client(name: str, pool: Optional[PoolSettings] = None) -> httpx.AsyncClient:
+    """
+    Return the async client registered under `name` for the running event loop.
+    Falls back to the pool settings the sync session with the same name was created with.
+    """
+    loop = asyncio.get_running_loop()
+    with _sessions_lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(name)
+        if client is None or client.is_closed:
+            pool = pool or _pool_settings.get(name) or PoolSettings()
+            _pool_settings.setdefault(name, pool)
+            client = build_async_client(pool)
+            clients[name] = client
+        return client
+
+
+def close_sessions() -> None:
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+        _pool_settings.clear()
+    for session in sessions:
+        session.close()
+
+
+async def aclose_async_clients() -> None:
+    loop = asyncio.get_running_loop()
+    with _sessions_lock:
+        clients = list(_async_clients.pop(loop, {}).values())
+    for client in clients:
+        await client.aclose()
+
+
+def _adapter_stats(adapter: HTTPAdapter) -> Dict[str, Any]:
+    hosts: Dict[str, Dict[str, int]] = {}
+    pools = adapter.poolmanager.pools
+    for key in pools.keys():
+        conn_pool = pools.get(key)
+        if conn_pool is None:
+            continue
+        host = f"{key.key_scheme}://{key.key_host}:{key.key_port}"
+        idle = conn_pool.pool.qsize() if conn_pool.pool is not None else 0
+        hosts[host] = {
+            "connections_opened": conn_pool.num_connections,
+            "requests": conn_pool.num_requests,
+            "idle_connections": idle,
+            "maxsize": conn_pool.pool.maxsize if conn_pool.pool is not None else 0,
+        }
+    return hosts
+
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-session, per-host connection pool statistics for monitoring."""
+    with _sessions_lock:
+        sessions = dict(_sessions)
+    stats: Dict[str, Dict[str, Any]] = {}
+    for name, session in sessions.items():
+        hosts: Dict[str, Any] = {}
+        seen = set()
+        for adapter in session.adapters.values():
+            if id(adapter) in seen or not isinstance(adapter, HTTPAdapter):
+                continue
+            seen.add(id(adapter))
+            hosts.update(_adapter_stats(adapter))
+        stats[name] = {"hosts": hosts}
+    with _sessions_lock:
+        loops = list(_async_clients.values())
+    for clients in loops:
+        for name, client in clients.items():
+            if client.is_closed:
+                continue
+            entry = stats.setdefault(name, {"hosts": {}})
+            entry["async_clients"] = entry.get("async_clients", 0) + 1
+    return stats
@@ -0,0 +1,27 @@
+from .manifest import (
+    IndexVersionWatcher,
+    IngestManifest,
+    IngestPlan,
+    ManifestEntry,
+    bump_index_version,
+    file_digest,
+    ingest_fingerprint,
+    plan_ingest,
+    read_index_version,
+)
+from .pipeline import IngestPipeline, IngestReport, build_chunks
+
+__all__ = [
+    "IndexVersionWatcher",
+    "IngestManifest",
+    "IngestPipeline",
+    "IngestPlan",
+    "IngestReport",
+    "ManifestEntry",
+    "build_chunks",
+    "bump_index_version",
+    "file_digest",
+    "ingest_fingerprint",
+    "plan_ingest",
+    "read_index_version",
+]
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..settings import Settings
+
+MANIFEST_FILENAME = "ingest_manifest.json"
+MANIFEST_VERSION = 1
+INDEX_VERSION_FILENAME = "index_version"
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def ingest_fingerprint(settings: Settings) -> str:
+    """
+    Hash of the settings that change what ingest stores for a file (chunking, loader
+    representations, embedding model, vector dtype, whether a BM25 index is kept).
+    Indexed chunks are only reusable under the fingerprint they were built with.
+    """
+    config = {
+        "chunk_size": settings.rag.chunk_size,
+        "chunk_overlap": settings.rag.chunk_overlap,
+        "chunking": settings.chunking.model_dump(),
+        "loaders": settings.loaders.model_dump(),
+        "embed_model": settings.ollama.embed_model,
+        "dtype": settings.vectorstore.dtype,
+        "hybrid": settings.rag.hybrid,
+    }
+    encoded = json.dumps(config, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def read_index_version(index_dir: str) -> str:
+    """Opaque stamp that changes whenever ingest modifies the index ("" if never bumped)."""
+    try:
+        return (Path(index_dir) / INDEX_VERSION_FILENAME).read_text(encoding="utf-8").strip()
+    except OSError:
+        return ""
+
+
+class IndexVersionWatcher:
+    """
+    `read_index_version` for hot paths: the stamp file is re-read only when its inode,
+    mtime or size changed (bumps replace the file), so a lookup costs one stat().
+    """
+
+    def __init__(self, index_dir: str) -> None:
+        self.index_dir = index_dir
+        self._path = Path(index_dir) / INDEX_VERSION_FILENAME
+        self._stat: Optional[Tuple[int, int, int]] = None
+        self._version = ""
+
+    def __call__(self) -> str:
+        try:
+            st = self._path.stat()
+            stat: Optional[Tuple[int, int, int]] = (st.st_ino, st.st_mtime_ns, st.st_size)
+        except OSError:
+            stat = None
+        if stat != self._stat:
+            self._stat = stat
+            self._version = read_index_version(self.index_dir) if stat is not None else ""
+        return self._version
+
+
+def bump_index_version(index_dir: str, fingerprint: str = "") -> str:
+    version = f"{time.time_ns()}-{fingerprint}" if fingerprint else str(time.time_ns())
+    path = Path(index_dir) / INDEX_VERSION_FILENAME
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(version, encoding="utf-8")
+    os.replace(tmp_path, path)
+    return version
+
+
+@dataclass
+class ManifestEntry:
+    mtime: float
+    size: int
+    sha256: str
+    chunk_ids: List[str] = field(default_factory=list)
+
+
+@dataclass
+class IngestPlan:
+    to_index: List[Path] = field(default_factory=list)
+    unchanged: List[Path] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    # Files whose content hash was already computed while planning.
+    digests: Dict[str, str] = field(default_factory=dict)
+    # Ingest settings the plan was made for; recorded in the manifest once ingest succeeds.
+    fingerprint: Optional[str] = None
+    # The manifest was built under other ingest settings, so every file is re-indexed.
+    config_changed: bool = False
+
+
+class IngestManifest:
+    """
+    Persistent record of what was indexed, keyed by source path.
+    Lets ingest skip unchanged files and drop chunks of removed/shrunk files.
+    `fingerprint` is the `ingest_fingerprint` the entries were indexed under.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        entries: Optional[Dict[str, ManifestEntry]] = None,
+        fingerprint: str = "",
+    ):
+        self.path = path
+        self.entries: Dict[str, ManifestEntry] = entries or {}
+        self.fingerprint = fingerprint
+        self._owner_counts: Optional[Dict[str, int]] = None
+
+    @classmethod
+    def load(cls, path: Path) -> "IngestManifest":
+        if not path.exists():
+            return cls(path)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return cls(path)
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            return cls(path)
+        entries = {
+            key: ManifestEntry(**value)
+            for key, value in (data.get("files") or {}).items()
+            if isinstance(value, dict)
+        }
+        return cls(path, entries, str(data.get("fingerprint") or ""))
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "version": MANIFEST_VERSION,
+            "fingerprint": self.fingerprint,
+            "files": {key: asdict(entry) for key, entry in sorted(self.entries.items())},
+        }
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    def get(self, path: str) -> Optional[ManifestEntry]:
+        return self.entries.get(path)
+
+    def record(self, path: Path, digest: str, chunk_ids: List[str]) -> None:
+        stat = path.stat()
+        entry = ManifestEntry(
+            mtime=stat.st_mtime,
+            size=stat.st_size,
+            sha256=digest,
+            chunk_ids=list(chunk_ids),
+        )
+        previous = self.entries.get(str(path))
+        self.entries[str(path)] = entry
+        if self._owner_counts is not None:
+            if previous is not None:
+                self._release(previous.chunk_ids)
+            for chunk_id in entry.chunk_ids:
+                self._owner_counts[chunk_id] = self._owner_counts.get(chunk_id, 0) + 1
+
+    def remove(self, path: str) -> Optional[ManifestEntry]:
+        entry = self.entries.pop(path, None)
+        if entry is not None and self._owner_counts is not None:
+            self._release(entry.chunk_ids)
+        return entry
+
+    def _release(self, chunk_ids: Iterable[str]) -> None:
+        assert self._owner_counts is not None
+        for chunk_id in chunk_ids:
+            remaining = self._owner_counts.get(chunk_id, 0) - 1
+            if remaining > 0:
+                self._owner_counts[chunk_id] = remaining
+            else:
+                self._owner_counts.pop(chunk_id, None)
+
+    def orphaned(self, chunk_ids: Iterable[str]) -> List[str]:
+        """
+        Return the ids from `chunk_ids` that no manifest entry owns anymore.
+        Chunk ids are derived from file names, so same-named files in different
+        directories can share ids; those must survive the other file's cleanup.
+        """
+        if self._owner_counts is None:
+            counts: Dict[str, int] = {}
+            for entry in self.entries.values():
+                for chunk_id in entry.chunk_ids:
+                    counts[chunk_id] = counts.get(chunk_id, 0) + 1
+            self._owner_counts = counts
+        return sorted({c for c in chunk_ids if c not in self._owner_counts})
+
+
+def plan_ingest(
+    files: Iterable[Path],
+    manifest: IngestManifest,
+    full: bool = False,
+    fingerprint: Optional[str] = None,
+) -> IngestPlan:
+    """
+    Compare files on disk with the manifest. Size+mtime matches are trusted;
+    otherwise the content hash decides, so touched-but-identical files are skipped.
+    A `fingerprint` other than the manifest's (ingest settings changed) re-indexes all files.
+    """
+    plan = IngestPlan(fingerprint=fingerprint)
+    if fingerprint is not None and fingerprint != manifest.fingerprint:
+        plan.config_changed = True
+        full = True
+    seen = set()
+    for path in files:
+        key = str(path)
+        seen.add(key)
+        entry = manifest.get(key)
+        if full or entry is None:
+            plan.to_index.append(path)
+            continue
+        stat = path.stat()
+        if stat.st_size == entry.size and stat.st_mtime == entry.mtime:
+            plan.unchanged.append(path)
+            continue
+        digest = file_digest(path)
+        plan.digests[key] = digest
+        if digest == entry.sha256:
+            # Content identical: refresh stat fields so the next run takes the fast path.
+            manifest.record(path, digest, entry.chunk_ids)
+            plan.unchanged.append(path)
+        else:
+            plan.to_index.append(path)
+    plan.removed = sorted(key for key in manifest.entries if key not in seen)
+    return plan
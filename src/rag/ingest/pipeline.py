@@ -0,0 +1,496 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from ..embeddings import Embeddings
+from ..loaders import (
+    JSON_LINES_SUFFIXES,
+    LoadRange,
+    iter_document,
+    json_lines_ranges,
+    pdf_page_count,
+)
+from ..models import Document
+from ..retrieval import BM25Index
+from ..settings import ChunkingConfig, IngestConfig, LoaderConfig
+from ..text.chunking import chunk_structured, chunk_text
+from ..text.normalization import normalize_text
+from ..text.terms import TERMS_METADATA_KEY, chunk_terms
+from ..text.tokenizers import load_tokenizer
+from ..vectorstore import VectorStore
+from .manifest import IngestManifest, IngestPlan, file_digest
+
+_QUEUE_POLL_S = 0.1
+_SENTINEL = None
+
+
+@dataclass
+class LoadedFile:
+    """One loader task's output: a whole file, or one of its `parts` (page/line ranges)."""
+
+    path: Path
+    digest: str = ""
+    chunks: List[Document] = field(default_factory=list)
+    error: Optional[str] = None
+    parts: int = 1
+    # Text left out by the loaders' representation mode, and the chunks it would have made.
+    saved_bytes: int = 0
+    saved_chunks: int = 0
+
+
+@dataclass
+class _FileProgress:
+    path: Path
+    digest: str
+    parts_left: int
+    batches_left: int = 0
+    chunk_ids: List[str] = field(default_factory=list)
+    failed: bool = False
+
+
+@dataclass
+class IngestReport:
+    indexed_files: int = 0
+    indexed_chunks: int = 0
+    unchanged_files: int = 0
+    removed_files: int = 0
+    removed_chunks: int = 0
+    # Savings of the configured loader representations over "combined" (chunks estimated).
+    saved_bytes: int = 0
+    saved_chunks: int = 0
+    skipped: List[Tuple[Path, str]] = field(default_factory=list)
+    elapsed_s: float = 0.0
+
+
+def build_chunks(
+    documents: Iterable[Document],
+    chunk_size: int,
+    overlap: int,
+    chunking: Optional[ChunkingConfig] = None,
+) -> List[Document]:
+    """
+    Word-window chunks from `chunk_size`/`overlap`, or structured token-sized chunks
+    when `chunking.strategy == "structured"`.
+    """
+    if chunking is not None and chunking.strategy == "structured":
+        return _build_structured_chunks(documents, chunking)
+    chunks: List[Document] = []
+    for doc in documents:
+        normalized = normalize_text(doc.text)
+        for idx, chunk in enumerate(chunk_text(normalized, chunk_size, overlap)):
+            chunk_id = f"{doc.doc_id}#chunk={idx+1}"
+            chunks.append(
+                Document(
+                    doc_id=chunk_id,
+                    text=chunk,
+                    metadata={
+                        **doc.metadata,
+                        TERMS_METADATA_KEY: chunk_terms(chunk, doc.metadata.get("source", "")),
+                    },
+                )
+            )
+    return chunks
+
+
+def _build_structured_chunks(
+    documents: Iterable[Document], chunking: ChunkingConfig
+) -> List[Document]:
+    tokenizer = load_tokenizer(chunking.tokenizer)
+    chunks: List[Document] = []
+    for doc in documents:
+        pieces = chunk_structured(
+            doc.text, chunking.max_tokens, chunking.overlap_tokens, tokenizer=tokenizer
+        )
+        idx = 0
+        for piece in pieces:
+            text = normalize_text(piece.text)
+            if not text:
+                continue
+            idx += 1
+            chunks.append(
+                Document(
+                    doc_id=f"{doc.doc_id}#chunk={idx}",
+                    text=text,
+                    metadata={
+                        **doc.metadata,
+                        "char_start": piece.start,
+                        "char_end": piece.end,
+                        "tokens": piece.tokens,
+                        "section": piece.section,
+                        TERMS_METADATA_KEY: chunk_terms(text, doc.metadata.get("source", "")),
+                    },
+                )
+            )
+    return chunks
+
+
+def load_and_chunk(
+    path: Path,
+    digest: str,
+    chunk_size: int,
+    overlap: int,
+    chunking: Optional[ChunkingConfig] = None,
+    part: Optional[LoadRange] = None,
+    parts: int = 1,
+    loaders: Optional[LoaderConfig] = None,
+) -> LoadedFile:
+    """
+    Loader stage unit of work. Module-level so it can run in a worker process.
+    Documents are chunked as they are extracted; `part` limits the load to one
+    page/line range of the file.
+    """
+    saved_bytes = 0
+
+    def documents() -> Iterator[Document]:
+        nonlocal saved_bytes
+        for doc in iter_document(path, part, loaders):
+            saved_bytes += doc.saved_bytes
+            yield doc
+
+    try:
+        digest = digest or file_digest(path)
+        chunks = build_chunks(documents(), chunk_size, overlap, chunking)
+    except Exception as exc:  # noqa: BLE001
+        return LoadedFile(path=path, error=str(exc), parts=parts)
+    chunk_bytes = sum(len(chunk.text.encode("utf-8")) for chunk in chunks)
+    saved_chunks = round(saved_bytes * len(chunks) / chunk_bytes) if chunk_bytes else 0
+    return LoadedFile(
+        path=path,
+        digest=digest,
+        chunks=chunks,
+        parts=parts,
+        saved_bytes=saved_bytes,
+        saved_chunks=saved_chunks,
+    )
+
+
+class _Aborted(Exception):
+    pass
+
+
+class _InlineExecutor(Executor):
+    """Runs loader tasks in the calling thread (load_workers=0)."""
+
+    def submit(self, fn, /, *args, **kwargs):  # type: ignore[override]
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as exc:  # noqa: BLE001
+            future.set_exception(exc)
+        return future
+
+
+class IngestPipeline:
+    """
+    Staged producer/consumer ingest:
+
+    loader processes -> bounded embed queue -> N embedding threads
+    -> bounded write queue -> single writer (bulk upserts + manifest updates).
+
+    Large PDFs and JSONL files are split into page/line-range tasks, so one file is
+    parsed on several cores and its first parts are embedded while the rest load.
+    A file enters the manifest once all its parts are written.
+
+    Bounded queues and a bounded number of in-flight loader tasks provide
+    backpressure, so memory stays flat regardless of corpus size.
+    """
+
+    def __init__(
+        self,
+        embedder: Embeddings,
+        store: VectorStore,
+        manifest: IngestManifest,
+        config: IngestConfig,
+        chunk_size: int,
+        chunk_overlap: int,
+        on_file_done: Optional[Callable[[Path], None]] = None,
+        lexical: Optional[BM25Index] = None,
+        chunking: Optional[ChunkingConfig] = None,
+        loaders: Optional[LoaderConfig] = None,
+    ) -> None:
+        self.embedder = embedder
+        self.store = store
+        self.lexical = lexical
+        self.manifest = manifest
+        self.config = config
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.chunking = chunking
+        self.loaders = loaders
+        self.on_file_done = on_file_done
+
+        self._embed_q: "queue.Queue" = queue.Queue(maxsize=max(1, config.queue_size))
+        self._write_q: "queue.Queue" = queue.Queue(maxsize=max(1, config.queue_size))
+        self._stop = threading.Event()
+        self._errors: List[BaseException] = []
+        self._lock = threading.Lock()
+        # file key -> parts not yet loaded, batches not yet written, chunk ids so far
+        self._files: Dict[str, _FileProgress] = {}
+        self._report = IngestReport()
+
+    def run(self, plan: IngestPlan) -> IngestReport:
+        started = time.perf_counter()
+        report = self._report
+        report.unchanged_files = len(plan.unchanged)
+        self._remove_files(plan.removed)
+
+        embed_threads = [
+            threading.Thread(target=self._embed_worker, name=f"ingest-embed-{i}", daemon=True)
+            for i in range(max(1, self.config.embed_workers))
+        ]
+        writer = threading.Thread(target=self._writer, name="ingest-writer", daemon=True)
+        for thread in (*embed_threads, writer):
+            thread.start()
+
+        try:
+            self._load_stage(plan)
+        except _Aborted:
+            pass
+        except BaseException as exc:
+            self._fail(exc)
+        finally:
+            for _ in embed_threads:
+                self._put(self._embed_q, _SENTINEL, force=True)
+            for thread in embed_threads:
+                thread.join()
+            self._put(self._write_q, _SENTINEL, force=True)
+            writer.join()
+
+        report.elapsed_s = time.perf_counter() - started
+        if self._errors:
+            raise self._errors[0]
+        if plan.fingerprint is not None:
+            self._adopt_fingerprint(plan)
+        return report
+
+    def _adopt_fingerprint(self, plan: IngestPlan) -> None:
+        """Mark the manifest as built under the plan's ingest settings."""
+        if plan.config_changed:
+            # Files that failed under the new settings still own chunks from the old ones.
+            for path, _ in self._report.skipped:
+                entry = self.manifest.remove(str(path))
+                stale = self.manifest.orphaned(entry.chunk_ids) if entry else []
+                self._delete_chunks(stale)
+                self._report.removed_chunks += len(stale)
+        self.manifest.fingerprint = plan.fingerprint or ""
+
+    def _remove_files(self, keys: List[str]) -> None:
+        for key in keys:
+            entry = self.manifest.remove(key)
+            stale = self.manifest.orphaned(entry.chunk_ids) if entry else []
+            self._delete_chunks(stale)
+            self._report.removed_files += 1
+            self._report.removed_chunks += len(stale)
+
+    def _executor(self) -> Executor:
+        if self.config.load_workers <= 0:
+            return _InlineExecutor()
+        return ProcessPoolExecutor(max_workers=self.config.load_workers)
+
+    def _load_stage(self, plan: IngestPlan) -> None:
+        max_in_flight = max(1, self.config.load_workers) * 2
+        pending_paths = deque(plan.to_index)
+        pending_tasks: deque = deque()
+        in_flight: Set[Future] = set()
+        with self._executor() as executor:
+            while pending_paths or pending_tasks or in_flight:
+                while (pending_paths or pending_tasks) and len(in_flight) < max_in_flight:
+                    if not pending_tasks:
+                        path = pending_paths.popleft()
+                        digest = plan.digests.get(str(path), "")
+                        pending_tasks.extend(self._load_tasks(path, digest))
+                        continue
+                    path, digest, part, parts = pending_tasks.popleft()
+                    in_flight.add(
+                        executor.submit(
+                            load_and_chunk,
+                            path,
+                            digest,
+                            self.chunk_size,
+                            self.chunk_overlap,
+                            self.chunking,
+                            part,
+                            parts,
+                            self.loaders,
+                        )
+                    )
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self._enqueue_file(future.result())
+                if self._stop.is_set():
+                    for future in in_flight:
+                        future.cancel()
+                    raise _Aborted()
+
+    def _load_tasks(
+        self, path: Path, digest: str
+    ) -> List[Tuple[Path, str, Optional[LoadRange], int]]:
+        """
+        Split PDFs into `pdf_pages_per_task` page ranges and JSONL files into
+        `jsonl_lines_per_task` line ranges; other files are one task.
+        """
+        suffix = path.suffix.lower()
+        try:
+            ranges: List[LoadRange] = []
+            if suffix == ".pdf" and self.config.pdf_pages_per_task > 0:
+                per_task = self.config.pdf_pages_per_task
+                pages = pdf_page_count(path)
+                ranges = [
+                    (start, min(start + per_task, pages)) for start in range(0, pages, per_task)
+                ]
+            elif suffix in JSON_LINES_SUFFIXES and self.config.jsonl_lines_per_task > 0:
+                ranges = json_lines_ranges(path, self.config.jsonl_lines_per_task)
+            if len(ranges) > 1:
+                digest = digest or file_digest(path)
+        except Exception:  # noqa: BLE001 - the loader task reports the error
+            ranges = []
+        if len(ranges) <= 1:
+            return [(path, digest, None, 1)]
+        return [(path, digest, part, len(ranges)) for part in ranges]
+
+    def _enqueue_file(self, loaded: LoadedFile) -> None:
+        key = str(loaded.path)
+        batch_size = max(1, self.config.embed_batch_size)
+        batches = [
+            loaded.chunks[i : i + batch_size] for i in range(0, len(loaded.chunks), batch_size)
+        ]
+        with self._lock:
+            progress = self._files.get(key)
+            if progress is None:
+                progress = _FileProgress(loaded.path, loaded.digest, parts_left=loaded.parts)
+                self._files[key] = progress
+            progress.parts_left -= 1
+            if loaded.error is not None:
+                if not progress.failed:
+                    self._report.skipped.append((loaded.path, loaded.error))
+                progress.failed = True
+                if progress.parts_left > 0 or progress.batches_left > 0:
+                    return
+                # Last piece of a failed file: let the writer discard what earlier parts wrote.
+                progress.batches_left += 1
+            else:
+                progress.chunk_ids.extend(d.doc_id for d in loaded.chunks)
+                self._report.saved_bytes += loaded.saved_bytes
+                self._report.saved_chunks += loaded.saved_chunks
+                progress.batches_left += max(1, len(batches))
+        if loaded.error is not None or not batches:
+            # Nothing to embed, but the writer still has to record (or discard) the file.
+            self._put(self._write_q, (key, [], []))
+            return
+        for batch in batches:
+            self._put(self._embed_q, (key, batch))
+
+    def _embed_worker(self) -> None:
+        while True:
+            item = self._embed_q.get()
+            if item is _SENTINEL:
+                return
+            if self._stop.is_set():
+                continue
+            key, batch = item
+            try:
+                embeddings = self.embedder.embed_texts([d.text for d in batch])
+                self._put(self._write_q, (key, batch, embeddings))
+            except _Aborted:
+                continue
+            except BaseException as exc:  # noqa: BLE001
+                self._fail(exc)
+
+    def _writer(self) -> None:
+        docs: List[Document] = []
+        vectors: List[List[float]] = []
+        keys: List[str] = []
+        while True:
+            item = self._write_q.get()
+            if item is not _SENTINEL:
+                key, batch, embeddings = item
+                docs.extend(batch)
+                vectors.extend(embeddings)
+                keys.append(key)
+            done = item is _SENTINEL
+            if not keys or not (done or len(docs) >= self.config.write_batch_size):
+                if done:
+                    return
+                continue
+            if self._stop.is_set():
+                # A stage failed: never record files whose chunks may be incomplete.
+                if done:
+                    return
+                docs, vectors, keys = [], [], []
+                continue
+            try:
+                if docs:
+                    self.store.upsert(docs, vectors)
+                    if self.lexical is not None:
+                        self.lexical.add(docs)
+                self._report.indexed_chunks += len(docs)
+                for key in keys:
+                    self._batch_written(key)
+            except BaseException as exc:  # noqa: BLE001
+                self._fail(exc)
+            docs, vectors, keys = [], [], []
+            if done:
+                return
+
+    def _batch_written(self, key: str) -> None:
+        with self._lock:
+            progress = self._files[key]
+            progress.batches_left -= 1
+            if progress.batches_left > 0 or progress.parts_left > 0:
+                return
+            del self._files[key]
+        if progress.failed:
+            self._discard_file(progress)
+        else:
+            self._commit_file(progress)
+
+    def _discard_file(self, progress: _FileProgress) -> None:
+        """
+        A part of the file failed, so it is not recorded; delete the chunks its other
+        parts already wrote unless a manifest entry (its previous version) owns them.
+        """
+        stale = self.manifest.orphaned(progress.chunk_ids)
+        if stale:
+            self._delete_chunks(stale)
+
+    def _commit_file(self, progress: _FileProgress) -> None:
+        chunk_ids = progress.chunk_ids
+        previous = self.manifest.get(str(progress.path))
+        self.manifest.record(progress.path, progress.digest, chunk_ids)
+        if previous is not None:
+            stale = self.manifest.orphaned(set(previous.chunk_ids) - set(chunk_ids))
+            self._delete_chunks(stale)
+            self._report.removed_chunks += len(stale)
+        if chunk_ids:
+            self._report.indexed_files += 1
+        if self.on_file_done is not None:
+            self.on_file_done(progress.path)
+
+    def _delete_chunks(self, ids: List[str]) -> None:
+        self.store.delete(ids)
+        if self.lexical is not None:
+            self.lexical.delete(ids)
+
+    def _fail(self, exc: BaseException) -> None:
+        with self._lock:
+            self._errors.append(exc)
+        self._stop.set()
+
+    def _put(self, q: "queue.Queue", item, force: bool = False) -> None:
+        while True:
+            try:
+                q.put(item, timeout=_QUEUE_POLL_S)
+                return
+            except queue.Full:
+                if self._stop.is_set() and not force:
+                    raise _Aborted() from None
+                if force:
+                    # Consumers are draining; on failure they discard items until the sentinel.
+                    continue
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Iterable, Optional
+from typing import AsyncIterator, Iterable, Optional
 
 
 class LLM(ABC):
@@ -15,3 +16,17 @@ class LLM(ABC):
         Implementations can override to yield incremental text chunks.
         """
         yield self.generate(prompt, system_prompt=system_prompt)
+
+    async def agenerate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        """
+        Async interface. Default: run `generate` in a worker thread.
+        """
+        return await asyncio.to_thread(self.generate, prompt, system_prompt)
+
+    async def astream(
+        self, prompt: str, system_prompt: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Async streaming interface. Default: non-streaming, mirrors `stream`.
+        """
+        yield await self.agenerate(prompt, system_prompt=system_prompt)
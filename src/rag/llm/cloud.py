@@ -1,32 +1,226 @@
 from __future__ import annotations
 
-from typing import Optional
+import json
+import time
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
 
 import requests
 
+from ..http_pool import get_async_client, get_session
+from ..metrics import LLM_TTFT_SECONDS
 from .base import LLM
 
+STREAM_ACCEPT = "text/event-stream, application/x-ndjson"
+
 
 class CloudLLM(LLM):
     """
     Generic cloud LLM client. Adjust payload/response mapping for your provider.
+
+    provider "openai" speaks the OpenAI chat completions API; anything else uses the
+    generic {"model", "prompt", "system"} -> {"text"} mapping. Streams are parsed
+    incrementally as SSE (`text/event-stream`) or NDJSON, whichever the server sends.
     """
 
-    def __init__(self, api_url: str, api_key: str, model: str, timeout_s: int = 30):
+    def __init__(
+        self,
+        api_url: str,
+        api_key: str,
+        model: str,
+        timeout_s: int = 30,
+        session: Optional[requests.Session] = None,
+        provider: str = "generic",
+    ):
         self.api_url = api_url
         self.api_key = api_key
         self.model = model
         self.timeout_s = timeout_s
+        self.session = session or get_session("cloud")
+        self.provider = provider
 
-    def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
-        payload = {
-            "model": self.model,
-            "prompt": prompt,
-            "system": system_prompt or "",
-        }
+    def _payload(
+        self, prompt: str, system_prompt: Optional[str], stream: bool = False
+    ) -> Dict[str, Any]:
+        if self.provider == "openai":
+            messages: List[Dict[str, str]] = []
+            if system_prompt:
+                messages.append({"role": "system", "content": system_prompt})
+            messages.append({"role": "user", "content": prompt})
+            payload: Dict[str, Any] = {"model": self.model, "messages": messages}
+        else:
+            payload = {
+                "model": self.model,
+                "prompt": prompt,
+                "system": system_prompt or "",
+            }
+        if stream:
+            payload["stream"] = True
+        return payload
+
+    def _headers(self, stream: bool = False) -> Dict[str, str]:
         headers = {"Authorization": f"Bearer {self.api_key}"}
-        resp = requests.post(self.api_url, json=payload, headers=headers, timeout=self.timeout_s)
-        resp.raise_for_status()
-        data = resp.json()
+        if stream:
+            headers["Accept"] = STREAM_ACCEPT
+        return headers
+
+    def _parse(self, data: Dict[str, Any]) -> str:
+        if self.provider == "openai":
+            return _completion_text(data)
         # Expecting: {"text": "..."}
         return data.get("text", "")
+
+    def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        resp = self.session.post(
+            self.api_url,
+            json=self._payload(prompt, system_prompt),
+            headers=self._headers(),
+            timeout=self.timeout_s,
+        )
+        resp.raise_for_status()
+        return self._parse(resp.json())
+
+    async def agenerate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        resp = await get_async_client("cloud").post(
+            self.api_url,
+            json=self._payload(prompt, system_prompt),
+            headers=self._headers(),
+            timeout=self.timeout_s,
+        )
+        resp.raise_for_status()
+        return self._parse(resp.json())
+
+    def stream(self, prompt: str, system_prompt: Optional[str] = None) -> Iterable[str]:
+        """
+        Yield text chunks as the provider sends them. Closing the generator closes
+        the upstream response.
+        """
+        started = time.perf_counter()
+        resp = self.session.post(
+            self.api_url,
+            json=self._payload(prompt, system_prompt, stream=True),
+            headers=self._headers(stream=True),
+            stream=True,
+            timeout=self.timeout_s,
+        )
+        with resp:
+            resp.raise_for_status()
+            decoder = StreamDecoder(_is_sse(resp.headers.get("content-type", "")))
+            # SSE is always UTF-8; without a charset requests would assume ISO-8859-1.
+            resp.encoding = "utf-8"
+            first = True
+            for line in resp.iter_lines(decode_unicode=True):
+                chunk = decoder.feed(line)
+                if chunk:
+                    if first:
+                        first = False
+                        LLM_TTFT_SECONDS.observe(time.perf_counter() - started, provider="cloud")
+                    yield chunk
+                if decoder.done:
+                    return
+            chunk = decoder.close()
+            if chunk:
+                yield chunk
+
+    async def astream(
+        self, prompt: str, system_prompt: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Async variant of `stream`. When the API client disconnects, closing (or
+        cancelling) this generator closes the upstream connection, which stops the
+        provider's generation.
+        """
+        started = time.perf_counter()
+        async with get_async_client("cloud").stream(
+            "POST",
+            self.api_url,
+            json=self._payload(prompt, system_prompt, stream=True),
+            headers=self._headers(stream=True),
+            timeout=self.timeout_s,
+        ) as resp:
+            resp.raise_for_status()
+            decoder = StreamDecoder(_is_sse(resp.headers.get("content-type", "")))
+            first = True
+            async for line in resp.aiter_lines():
+                chunk = decoder.feed(line)
+                if chunk:
+                    if first:
+                        first = False
+                        LLM_TTFT_SECONDS.observe(time.perf_counter() - started, provider="cloud")
+                    yield chunk
+                if decoder.done:
+                    return
+            chunk = decoder.close()
+            if chunk:
+                yield chunk
+
+
+def _is_sse(content_type: str) -> bool:
+    return "text/event-stream" in content_type.lower()
+
+
+def _completion_text(data: Dict[str, Any]) -> str:
+    """Text carried by one completion payload or stream event, for the common shapes."""
+    choices = data.get("choices")
+    if isinstance(choices, list) and choices:
+        choice = choices[0] or {}
+        message = choice.get("delta") or choice.get("message") or {}
+        return message.get("content") or choice.get("text") or ""
+    for key in ("text", "response", "delta", "content", "token"):
+        value = data.get(key)
+        if isinstance(value, str):
+            return value
+    return ""
+
+
+class StreamDecoder:
+    """
+    Incremental decoder for streamed completions, fed one line at a time: SSE
+    (`data:` fields, events end at a blank line, `[DONE]` ends the stream) or NDJSON
+    (one JSON object per line, `"done": true` ends the stream).
+    """
+
+    def __init__(self, sse: bool) -> None:
+        self.sse = sse
+        self.done = False
+        self._data: List[str] = []
+
+    def feed(self, line: str) -> Optional[str]:
+        """Text completed by `line`, if any."""
+        if self.done:
+            return None
+        if not self.sse:
+            return self._event(line)
+        if not line:
+            data = "\n".join(self._data)
+            self._data = []
+            return self._event(data)
+        if line.startswith(":"):
+            return None
+        name, _, value = line.partition(":")
+        if name == "data":
+            self._data.append(value[1:] if value.startswith(" ") else value)
+        return None
+
+    def close(self) -> Optional[str]:
+        """Flush an SSE event the server did not terminate with a blank line."""
+        return self.feed("") if self.sse else None
+
+    def _event(self, data: str) -> Optional[str]:
+        stripped = data.strip()
+        if not stripped:
+            return None
+        if stripped == "[DONE]":
+            self.done = True
+            return None
+        try:
+            payload = json.loads(stripped)
+        except json.JSONDecodeError:
+            # SSE may carry plain-text tokens (spacing kept); NDJSON lines must be JSON.
+            return data if self.sse else None
+        if not isinstance(payload, dict):
+            return None
+        if payload.get("error"):
+            raise RuntimeError(f"Cloud LLM stream error: {payload['error']}")
+        if payload.get("done") is True:
+            self.done = True
+        return _completion_text(payload) or None
@@ -1,18 +1,29 @@
 from __future__ import annotations
 
 import json
-from typing import Iterable, Optional
+import time
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
 
+import httpx
 import requests
 
+from ..http_pool import get_async_client, get_session
+from ..metrics import LLM_TTFT_SECONDS
 from .base import LLM
 
 
 class OllamaLLM(LLM):
-    def __init__(self, base_url: str, model: str, timeout_s: int = 60):
+    def __init__(
+        self,
+        base_url: str,
+        model: str,
+        timeout_s: int = 60,
+        session: Optional[requests.Session] = None,
+    ):
         self.base_url = base_url.rstrip("/")
         self.model = model
         self.timeout_s = timeout_s
+        self.session = session or get_session("ollama")
 
     def generate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
         try:
@@ -22,16 +33,35 @@ class OllamaLLM(LLM):
                 return self._generate_openai(prompt, system_prompt)
             raise
 
-    def _generate_v1(self, prompt: str, system_prompt: Optional[str]) -> str:
-        payload = {
+    async def agenerate(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        try:
+            return await self._agenerate_v1(prompt, system_prompt)
+        except httpx.HTTPStatusError as exc:
+            if exc.response.status_code in (404, 405):
+                return await self._agenerate_openai(prompt, system_prompt)
+            raise
+
+    def _generate_payload(
+        self, prompt: str, system_prompt: Optional[str], stream: bool
+    ) -> Dict[str, Any]:
+        return {
             "model": self.model,
             "prompt": prompt,
             "system": system_prompt or "",
-            "stream": False,
+            "stream": stream,
         }
-        resp = requests.post(
+
+    def _openai_payload(self, prompt: str, system_prompt: Optional[str]) -> Dict[str, Any]:
+        messages: List[Dict[str, str]] = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+        return {"model": self.model, "messages": messages}
+
+    def _generate_v1(self, prompt: str, system_prompt: Optional[str]) -> str:
+        resp = self.session.post(
             f"{self.base_url}/api/generate",
-            json=payload,
+            json=self._generate_payload(prompt, system_prompt, stream=False),
             timeout=self.timeout_s,
         )
         resp.raise_for_status()
@@ -39,46 +69,94 @@ class OllamaLLM(LLM):
         return data.get("response", "")
 
     def _generate_openai(self, prompt: str, system_prompt: Optional[str]) -> str:
-        messages = []
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-        messages.append({"role": "user", "content": prompt})
-        resp = requests.post(
+        resp = self.session.post(
             f"{self.base_url}/v1/chat/completions",
-            json={"model": self.model, "messages": messages},
+            json=self._openai_payload(prompt, system_prompt),
+            timeout=self.timeout_s,
+        )
+        resp.raise_for_status()
+        return _parse_openai_content(resp.json())
+
+    async def _agenerate_v1(self, prompt: str, system_prompt: Optional[str]) -> str:
+        resp = await get_async_client("ollama").post(
+            f"{self.base_url}/api/generate",
+            json=self._generate_payload(prompt, system_prompt, stream=False),
             timeout=self.timeout_s,
         )
         resp.raise_for_status()
         data = resp.json()
-        choices = data.get("choices") or []
-        if choices:
-            return choices[0].get("message", {}).get("content", "")
-        return ""
+        return data.get("response", "")
+
+    async def _agenerate_openai(self, prompt: str, system_prompt: Optional[str]) -> str:
+        resp = await get_async_client("ollama").post(
+            f"{self.base_url}/v1/chat/completions",
+            json=self._openai_payload(prompt, system_prompt),
+            timeout=self.timeout_s,
+        )
+        resp.raise_for_status()
+        return _parse_openai_content(resp.json())
 
     def stream(self, prompt: str, system_prompt: Optional[str] = None) -> Iterable[str]:
         """
         Stream tokens from Ollama. Uses /api/generate with stream=true.
         """
-        payload = {
-            "model": self.model,
-            "prompt": prompt,
-            "stream": True,
-            "system": system_prompt or "",
-        }
-        resp = requests.post(
+        started = time.perf_counter()
+        resp = self.session.post(
             f"{self.base_url}/api/generate",
-            json=payload,
+            json=self._generate_payload(prompt, system_prompt, stream=True),
             stream=True,
             timeout=self.timeout_s,
         )
-        resp.raise_for_status()
-        for line in resp.iter_lines():
-            if not line:
-                continue
-            try:
-                data = json.loads(line.decode("utf-8"))
-            except json.JSONDecodeError:
-                continue
-            chunk = data.get("response")
-            if chunk:
-                yield chunk
+        with resp:
+            resp.raise_for_status()
+            first = True
+            for line in resp.iter_lines():
+                chunk = _parse_stream_line(line)
+                if chunk:
+                    if first:
+                        first = False
+                        LLM_TTFT_SECONDS.observe(time.perf_counter() - started, provider="ollama")
+                    yield chunk
+
+    async def astream(
+        self, prompt: str, system_prompt: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Async token stream from /api/generate. Closing the generator closes the
+        upstream response, so a disconnected client stops the generation.
+        """
+        started = time.perf_counter()
+        async with get_async_client("ollama").stream(
+            "POST",
+            f"{self.base_url}/api/generate",
+            json=self._generate_payload(prompt, system_prompt, stream=True),
+            timeout=self.timeout_s,
+        ) as resp:
+            resp.raise_for_status()
+            first = True
+            async for line in resp.aiter_lines():
+                chunk = _parse_stream_line(line)
+                if chunk:
+                    if first:
+                        first = False
+                        LLM_TTFT_SECONDS.observe(time.perf_counter() - started, provider="ollama")
+                    yield chunk
+
+
+def _parse_openai_content(data: Dict[str, Any]) -> str:
+    choices = data.get("choices") or []
+    if choices:
+        return choices[0].get("message", {}).get("content", "")
+    return ""
+
+
+def _parse_stream_line(line: Any) -> Optional[str]:
+    if not line:
+        return None
+    if isinstance(line, bytes):
+        line = line.decode("utf-8")
+    try:
+        data = json.loads(line)
+    except json.JSONDecodeError:
+        return None
+    return data.get("response")
@@ -1,16 +1,21 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import List
+from typing import Iterator, List, Optional, Tuple
 
 from .html import load_html
-from .json import load_json
+from .json import JSON_LINES_SUFFIXES, iter_json_lines, json_lines_ranges, load_json
 from .markdown import load_markdown
-from .pdf import load_pdf
+from .pdf import iter_pdf, load_pdf, pdf_page_count
 from .text import load_text
 from .xml import load_xml
 from .yaml import load_yaml
 from ..models import Document
+from ..settings import LoaderConfig
+
+# Loader-specific part of a file: PDF (first_page, stop_page), 0-based;
+# JSONL (start_byte, stop_byte, first_line) as produced by json_lines_ranges.
+LoadRange = Tuple[int, ...]
 
 
 TEXT_EXTENSIONS = {
@@ -40,20 +45,47 @@ SUPPORTED_EXTENSIONS = {
 }
 
 
-def load_document(path: Path) -> List[Document]:
+def iter_document(
+    path: Path,
+    part: Optional[LoadRange] = None,
+    config: Optional[LoaderConfig] = None,
+) -> Iterator[Document]:
+    """
+    Yield the documents of `path` lazily. PDFs yield one document per page and
+    JSONL/NDJSON files one per record group, optionally limited to `part`; other
+    formats are small enough to load whole and ignore it.
+    """
+    config = config or LoaderConfig()
+    suffix = path.suffix.lower()
+    if suffix == ".pdf":
+        start, stop = part or (0, None)
+        yield from iter_pdf(path, start, stop)
+        return
+    if suffix in JSON_LINES_SUFFIXES:
+        start, stop, first_line = part or (0, None, 1)
+        yield from iter_json_lines(
+            path, config.jsonl_records_per_document, start, stop, first_line, config.json_mode
+        )
+        return
+    yield from load_document(path, config)
+
+
+def load_document(path: Path, config: Optional[LoaderConfig] = None) -> List[Document]:
+    config = config or LoaderConfig()
     suffix = path.suffix.lower()
     if suffix == ".pdf":
         return load_pdf(path)
     if suffix in {".md", ".markdown"}:
-        return load_markdown(path)
+        return load_markdown(path, config.markdown_mode)
     if suffix in {".html", ".htm"}:
         return load_html(path)
     if suffix == ".xml":
         return load_xml(path)
     if suffix in {".json", ".jsonl", ".ndjson"}:
-        return load_json(path)
+        return load_json(path, config.json_mode)
     if suffix in {".yaml", ".yml"}:
-        return load_yaml(path)
+        return load_yaml(path, config.yaml_mode)
     if suffix in TEXT_EXTENSIONS:
         return load_text(path)
     raise ValueError(f"Unsupported file type: {path}")
+
@@ -2,47 +2,121 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import Any, List
+from typing import Any, Iterator, List, Optional, Tuple
 
 from ..models import Document
+from .representation import pick_representation
 from .structured import flatten_structured_data
 
+JSON_LINES_SUFFIXES = {".jsonl", ".ndjson"}
 
-def load_json(path: Path) -> List[Document]:
+
+def load_json(path: Path, mode: str = "flattened") -> List[Document]:
+    """`mode`: "flattened" | "raw" | "combined" (flattened fields plus pretty-printed JSON)."""
+    if path.suffix.lower() in JSON_LINES_SUFFIXES:
+        return list(iter_json_lines(path, mode=mode))
     raw = path.read_text(encoding="utf-8", errors="ignore")
-    data = _parse_json_by_extension(raw, path.suffix.lower())
+    try:
+        data = json.loads(raw)
+    except json.JSONDecodeError:
+        data = None
     if data is None:
-        text = raw
+        text, saved = raw, 0
     else:
         flattened = "\n".join(flatten_structured_data(data))
         pretty = json.dumps(data, ensure_ascii=False, indent=2)
-        text = f"Structured fields:\n{flattened}\n\nRaw JSON:\n{pretty}"
+        combined = f"Structured fields:\n{flattened}\n\nRaw JSON:\n{pretty}"
+        text, saved = pick_representation(mode, {"raw": raw, "flattened": flattened}, combined)
     return [
         Document(
             doc_id=path.name,
             text=text,
             metadata={"source": str(path), "format": "json"},
+            saved_bytes=saved,
         )
     ]
 
 
-def _parse_json_by_extension(raw: str, suffix: str) -> Any:
-    if suffix in {".jsonl", ".ndjson"}:
-        return _parse_json_lines(raw)
+def iter_json_lines(
+    path: Path,
+    records_per_document: int = 1,
+    start: int = 0,
+    stop: Optional[int] = None,
+    first_line: int = 1,
+    mode: str = "flattened",
+) -> Iterator[Document]:
+    """
+    Stream a JSONL/NDJSON file, yielding one Document per `records_per_document`
+    non-empty lines. Only the current group is held in memory. `start`/`stop` are
+    line-aligned byte offsets and `first_line` the line number at `start`, so a
+    file can be read in parts (see `json_lines_ranges`).
+    """
+    records_per_document = max(1, records_per_document)
+    group: List[Tuple[str, int]] = []
+    group_start = line_no = first_line - 1
+    with path.open("rb") as f:
+        f.seek(start)
+        position = start
+        for raw_line in f:
+            if stop is not None and position >= stop:
+                break
+            position += len(raw_line)
+            line_no += 1
+            line = raw_line.decode("utf-8", errors="ignore").strip()
+            if not line:
+                continue
+            if not group:
+                group_start = line_no
+            group.append(_record_text(line, mode))
+            if len(group) >= records_per_document:
+                yield _records_document(path, group, group_start, line_no)
+                group = []
+    if group:
+        yield _records_document(path, group, group_start, line_no)
+
+
+def json_lines_ranges(path: Path, lines_per_part: int) -> List[Tuple[int, int, int]]:
+    """
+    Split a JSONL file into (start_byte, stop_byte, first_line) parts of about
+    `lines_per_part` lines, scanning it once without decoding.
+    """
+    ranges: List[Tuple[int, int, int]] = []
+    part_start, part_line = 0, 1
+    position, line_no = 0, 0
+    with path.open("rb") as f:
+        for raw_line in f:
+            position += len(raw_line)
+            line_no += 1
+            if line_no - part_line + 1 >= lines_per_part:
+                ranges.append((part_start, position, part_line))
+                part_start, part_line = position, line_no + 1
+    if position > part_start:
+        ranges.append((part_start, position, part_line))
+    return ranges
+
+
+def _record_text(line: str, mode: str) -> Tuple[str, int]:
     try:
-        return json.loads(raw)
+        record: Any = json.loads(line)
     except json.JSONDecodeError:
-        return None
-
-
-def _parse_json_lines(raw: str) -> List[Any]:
-    rows: List[Any] = []
-    for line in raw.splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        try:
-            rows.append(json.loads(line))
-        except json.JSONDecodeError:
-            rows.append({"raw": line})
-    return rows
+        record = {"raw": line}
+    flattened = "\n".join(flatten_structured_data(record))
+    combined = f"Structured fields:\n{flattened}\n\nRaw JSON:\n{line}"
+    return pick_representation(mode, {"raw": line, "flattened": flattened}, combined)
+
+
+def _records_document(
+    path: Path, group: List[Tuple[str, int]], line_start: int, line_end: int
+) -> Document:
+    return Document(
+        doc_id=f"{path.name}#line={line_start}",
+        text="\n\n".join(text for text, _ in group),
+        metadata={
+            "source": str(path),
+            "format": "json",
+            "line_start": line_start,
+            "line_end": line_end,
+            "records": len(group),
+        },
+        saved_bytes=sum(saved for _, saved in group),
+    )
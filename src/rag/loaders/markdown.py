@@ -15,9 +15,11 @@ except ImportError:  # pragma: no cover - optional dependency
     BeautifulSoup = None
 
 from ..models import Document
+from .representation import pick_representation
 
 
-def load_markdown(path: Path) -> List[Document]:
+def load_markdown(path: Path, mode: str = "raw") -> List[Document]:
+    """`mode`: "raw" | "rendered" | "combined" (raw followed by the rendered text)."""
     raw = path.read_text(encoding="utf-8", errors="ignore")
     html = markdown.markdown(raw) if markdown else raw
     if BeautifulSoup:
@@ -25,14 +27,16 @@ def load_markdown(path: Path) -> List[Document]:
     else:
         rendered_text = _render_markdown_plain(raw)
     if rendered_text:
-        text = f"{raw}\n\nRendered text:\n{rendered_text}"
+        combined = f"{raw}\n\nRendered text:\n{rendered_text}"
     else:
-        text = raw
+        combined = raw
+    text, saved = pick_representation(mode, {"raw": raw, "rendered": rendered_text}, combined)
     return [
         Document(
             doc_id=path.name,
             text=text,
             metadata={"source": str(path), "format": "markdown"},
+            saved_bytes=saved,
         )
     ]
 
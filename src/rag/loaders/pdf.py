@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import List
+from typing import Iterator, List, Optional
 
 try:
     from pypdf import PdfReader
@@ -11,19 +11,31 @@ except ImportError:  # pragma: no cover - optional dependency
 from ..models import Document
 
 
-def load_pdf(path: Path) -> List[Document]:
+def _reader(path: Path) -> "PdfReader":
     if PdfReader is None:
         raise ImportError("pypdf is required for PDF loading")
-    reader = PdfReader(str(path))
-    docs: List[Document] = []
-    for idx, page in enumerate(reader.pages):
-        text = page.extract_text() or ""
-        doc_id = f"{path.name}#page={idx+1}"
-        docs.append(
-            Document(
-                doc_id=doc_id,
-                text=text,
-                metadata={"source": str(path), "page": idx + 1},
-            )
+    return PdfReader(str(path))
+
+
+def pdf_page_count(path: Path) -> int:
+    return len(_reader(path).pages)
+
+
+def iter_pdf(path: Path, start: int = 0, stop: Optional[int] = None) -> Iterator[Document]:
+    """
+    Yield one Document per page in [start, stop) (0-based), extracting lazily so
+    only the current page's text is held in memory.
+    """
+    reader = _reader(path)
+    stop = len(reader.pages) if stop is None else min(stop, len(reader.pages))
+    for idx in range(start, stop):
+        text = reader.pages[idx].extract_text() or ""
+        yield Document(
+            doc_id=f"{path.name}#page={idx+1}",
+            text=text,
+            metadata={"source": str(path), "format": "pdf", "page": idx + 1},
         )
-    return docs
+
+
+def load_pdf(path: Path) -> List[Document]:
+    return list(iter_pdf(path))
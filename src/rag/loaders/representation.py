@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from typing import Dict, Tuple
+
+
+def pick_representation(mode: str, texts: Dict[str, str], combined: str) -> Tuple[str, int]:
+    """
+    Return the text for `mode` ("combined" or a key of `texts`) and the bytes it
+    saves over `combined`. Empty representations fall back to "raw".
+    """
+    text = combined if mode == "combined" else texts.get(mode) or texts["raw"]
+    saved = len(combined.encode("utf-8")) - len(text.encode("utf-8"))
+    return text, max(0, saved)
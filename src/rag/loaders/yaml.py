@@ -9,25 +9,29 @@ except ImportError:  # pragma: no cover - optional dependency
     yaml = None
 
 from ..models import Document
+from .representation import pick_representation
 from .structured import flatten_structured_data
 
 
-def load_yaml(path: Path) -> List[Document]:
+def load_yaml(path: Path, mode: str = "flattened") -> List[Document]:
+    """`mode`: "flattened" | "raw" | "combined" (flattened fields plus a YAML dump)."""
     raw = path.read_text(encoding="utf-8", errors="ignore")
     data = _safe_load_yaml(raw)
 
     if data is None:
-        text = raw
+        text, saved = raw, 0
     else:
         flattened = "\n".join(flatten_structured_data(data))
         dumped = yaml.safe_dump(data, sort_keys=False, allow_unicode=False) if yaml else str(data)
-        text = f"Structured fields:\n{flattened}\n\nRaw YAML:\n{dumped}"
+        combined = f"Structured fields:\n{flattened}\n\nRaw YAML:\n{dumped}"
+        text, saved = pick_representation(mode, {"raw": raw, "flattened": flattened}, combined)
 
     return [
         Document(
             doc_id=path.name,
             text=text,
             metadata={"source": str(path), "format": "yaml"},
+            saved_bytes=saved,
         )
     ]
 
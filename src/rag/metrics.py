@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}{labels} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (per-bucket counts, sum, count)
+        self._series: Dict[LabelKey, Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total, count = self._series.get(key, ([0] * len(self.buckets), 0.0, 0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._series[key] = (counts, total + value, count + 1)
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(self._key(labels))
+        return series[2] if series else 0
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                for bound, bucket_count in zip(self.buckets, counts):
+                    labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                    lines.append(f"{self.name}_bucket{labels} {bucket_count}")
+                labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{labels} {count}")
+                plain = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{plain} {_format_value(total)}")
+                lines.append(f"{self.name}_count{plain} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Process-local metrics rendered in the Prometheus text exposition format."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric):
+                    raise ValueError(f"Metric {metric.name} already registered as {existing.kind}")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(  # type: ignore[return-value]
+            Histogram(name, help_text, labelnames, buckets)
+        )
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "rag_stage_duration_seconds",
+    "Time spent in each RAG pipeline stage.",
+    ("stage",),
+)
+ANSWERS_TOTAL = REGISTRY.counter(
+    "rag_answers_total",
+    "Answers produced by the pipeline, by mode (answer|stream) and outcome.",
+    ("mode", "outcome"),
+)
+FALLBACKS_TOTAL = REGISTRY.counter(
+    "rag_llm_fallbacks_total",
+    "LLM calls that failed over to the secondary provider.",
+    ("provider",),
+)
+ANSWER_CACHE_TOTAL = REGISTRY.counter(
+    "rag_answer_cache_lookups_total",
+    "Answer cache lookups by result (hit|miss).",
+    ("result",),
+)
+LLM_TTFT_SECONDS = REGISTRY.histogram(
+    "rag_llm_ttft_seconds",
+    "Time from sending a streaming LLM request to its first text chunk, by provider.",
+    ("provider",),
+)
+CONTEXT_TOKENS_TOTAL = REGISTRY.counter(
+    "rag_context_tokens_total",
+    "Prompt context tokens sent to the LLM (sent) and removed by packing (saved).",
+    ("kind",),
+)
+RETRIEVAL_WIDENINGS_TOTAL = REGISTRY.counter(
+    "rag_retrieval_widenings_total",
+    "Candidate windows widened by adaptive oversampling, by reason (filtered|rerank).",
+    ("reason",),
+)
+HTTP_REQUESTS_TOTAL = REGISTRY.counter(
+    "rag_http_requests_total",
+    "HTTP requests handled by the API, by route and status code.",
+    ("route", "status"),
+)
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "rag_http_request_duration_seconds",
+    "Time until the API sent response headers, by route.",
+    ("route",),
+)
+
+
+class StageTimings:
+    """
+    Per-request stage durations. Each recorded stage is also observed on the
+    `rag_stage_duration_seconds` histogram.
+    """
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, float] = {}
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+        STAGE_SECONDS.observe(seconds, stage=name)
+
+    def finish(self) -> None:
+        self.record("total", time.perf_counter() - self.started)
+
+    def as_ms(self) -> Dict[str, float]:
+        return {name: round(seconds * 1000, 3) for name, seconds in self.stages.items()}
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 
 @dataclass
@@ -9,14 +9,63 @@ class Document:
     doc_id: str
     text: str
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # Loader accounting, never stored: UTF-8 bytes the loader's representation mode left
+    # out compared to "combined" (summed into the ingest report).
+    saved_bytes: int = field(default=0, repr=False, compare=False)
 
 
-@dataclass
 class RetrievalResult:
-    doc_id: str
-    text: str
-    score: float
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    """
+    A scored chunk. Candidates can start as an id and a score (`pending`) and get their
+    metadata and text later in one bulk read (`VectorStore.hydrate`); until then those
+    fields are None. Slots keep large candidate sets free of per-result dicts.
+    """
+
+    __slots__ = ("doc_id", "text", "score", "metadata")
+
+    def __init__(
+        self,
+        doc_id: str,
+        text: Optional[str],
+        score: float,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.doc_id = doc_id
+        self.text = text
+        self.score = score
+        self.metadata = metadata if metadata is not None else {}
+
+    @classmethod
+    def pending(cls, doc_id: str, score: float) -> "RetrievalResult":
+        result = cls(doc_id, None, score)
+        result.metadata = None
+        return result
+
+    def with_score(self, score: float) -> "RetrievalResult":
+        """Copy with another score; unloaded fields stay unloaded."""
+        result = RetrievalResult.pending(self.doc_id, score)
+        result.text, result.metadata = self.text, self.metadata
+        return result
+
+    @property
+    def hydrated(self) -> bool:
+        return self.text is not None and self.metadata is not None
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RetrievalResult):
+            return NotImplemented
+        return (self.doc_id, self.text, self.score, self.metadata) == (
+            other.doc_id,
+            other.text,
+            other.score,
+            other.metadata,
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"RetrievalResult(doc_id={self.doc_id!r}, text={self.text!r}, "
+            f"score={self.score!r}, metadata={self.metadata!r})"
+        )
 
 
 @dataclass
@@ -25,3 +74,8 @@ class RagResponse:
     sources: List[RetrievalResult]
     model: str
     used_fallback: bool
+    cached: bool = False
+    # Stage name -> milliseconds (embed, retrieve, rerank, context, generate, total, ...).
+    timings: Dict[str, float] = field(default_factory=dict)
+    # Context packing stats: tokens sent, tokens_saved, merged, duplicates, ...
+    context: Dict[str, int] = field(default_factory=dict)
@@ -1,3 +1,22 @@
+from .cache import AnswerCache
+from .context import ContextPacker, PackedContext
 from .pipeline import RagPipeline
+from .rerank import (
+    BM25Reranker,
+    CrossEncoderReranker,
+    KeywordOverlapReranker,
+    Reranker,
+    build_reranker,
+)
 
-__all__ = ["RagPipeline"]
+__all__ = [
+    "AnswerCache",
+    "ContextPacker",
+    "PackedContext",
+    "RagPipeline",
+    "Reranker",
+    "KeywordOverlapReranker",
+    "BM25Reranker",
+    "CrossEncoderReranker",
+    "build_reranker",
+]
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, Iterator, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from ..models import RagResponse
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_REPLAY_TOKEN_RE = re.compile(r"\s*\S+")
+
+
+def normalize_question(question: str) -> str:
+    """Case-fold, collapse whitespace and drop trailing punctuation."""
+    return _WHITESPACE_RE.sub(" ", question.strip().lower()).rstrip(" ?!.")
+
+
+def replay_chunks(text: str, words_per_chunk: int = 8) -> Iterator[str]:
+    """Split a cached answer into stream-sized chunks that concatenate back to `text`."""
+    words = _REPLAY_TOKEN_RE.findall(text)
+    for start in range(0, len(words), words_per_chunk):
+        yield "".join(words[start : start + words_per_chunk])
+    tail = text[len("".join(words)) :]
+    if tail:
+        yield tail
+
+
+@dataclass
+class _Entry:
+    response: RagResponse
+    embedding: Optional[List[float]]
+    expires_at: float
+
+
+class _VectorSlots:
+    """
+    Normalized query embeddings of cached entries, one row per key in a growable matrix.
+    Rows are written and freed in place, so inserts never restack the whole matrix.
+    """
+
+    def __init__(self) -> None:
+        self._matrix: Optional["np.ndarray"] = None
+        self._keys: List[Optional[str]] = []
+        self._slots: Dict[str, int] = {}
+        self._free: List[int] = []
+
+    def set(self, key: str, embedding: List[float]) -> None:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        if norm == 0 or (self._matrix is not None and vector.shape[0] != self._matrix.shape[1]):
+            self.discard(key)
+            return
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._free.pop() if self._free else self._append(vector.shape[0])
+            self._slots[key] = slot
+            self._keys[slot] = key
+        assert self._matrix is not None
+        self._matrix[slot] = vector / norm
+
+    def discard(self, key: str) -> None:
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return
+        assert self._matrix is not None
+        self._keys[slot] = None
+        self._matrix[slot] = 0.0
+        self._free.append(slot)
+
+    def clear(self) -> None:
+        self._matrix = None
+        self._keys, self._free = [], []
+        self._slots = {}
+
+    def nearest(self, embedding: List[float], threshold: float) -> Optional[str]:
+        if not self._slots or self._matrix is None:
+            return None
+        query = np.asarray(embedding, dtype=np.float32)
+        if query.shape[0] != self._matrix.shape[1]:
+            return None
+        norm = float(np.linalg.norm(query))
+        if norm == 0:
+            return None
+        scores = self._matrix[: len(self._keys)] @ (query / norm)
+        if self._free:
+            scores[self._free] = -np.inf
+        best = int(np.argmax(scores))
+        if scores[best] < threshold:
+            return None
+        return self._keys[best]
+
+    def _append(self, dim: int) -> int:
+        slot = len(self._keys)
+        if self._matrix is None:
+            self._matrix = np.zeros((16, dim), dtype=np.float32)
+        elif slot == self._matrix.shape[0]:
+            grown = np.zeros((slot * 2, dim), dtype=np.float32)
+            grown[:slot] = self._matrix
+            self._matrix = grown
+        self._keys.append(None)
+        return slot
+
+
+class AnswerCache:
+    """
+    In-memory cache of pipeline answers with TTL and LRU eviction.
+
+    Lookups match the normalized question exactly, or, when `semantic` is on, the
+    most similar cached query embedding above `similarity_threshold`. Entries are
+    dropped wholesale when `version_fn` (the index version stamp) changes, so an
+    ingest never serves answers built from stale context.
+    """
+
+    def __init__(
+        self,
+        ttl_s: float = 3600.0,
+        max_entries: int = 1024,
+        semantic: bool = False,
+        similarity_threshold: float = 0.95,
+        version_fn: Optional[Callable[[], str]] = None,
+    ) -> None:
+        if semantic and np is None:
+            raise ImportError("numpy is required for the semantic answer cache")
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.semantic = semantic
+        self.similarity_threshold = similarity_threshold
+        self.version_fn = version_fn
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._version = version_fn() if version_fn else ""
+        self._lock = threading.Lock()
+        # Embeddings of entries that have one (semantic mode only).
+        self._vectors = _VectorSlots() if semantic else None
+
+    def get(
+        self, question: str, embedding: Optional[List[float]] = None
+    ) -> Optional[RagResponse]:
+        key = normalize_question(question)
+        with self._lock:
+            self._check_version()
+            entry = self._live(key)
+            if entry is None and embedding is not None and self._vectors is not None:
+                key = self._vectors.nearest(embedding, self.similarity_threshold)
+                entry = self._live(key) if key is not None else None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return replace(entry.response, cached=True)
+
+    def put(
+        self, question: str, response: RagResponse, embedding: Optional[List[float]] = None
+    ) -> None:
+        if not response.answer:
+            return
+        key = normalize_question(question)
+        stored = replace(response, cached=False)
+        with self._lock:
+            self._check_version()
+            self._entries[key] = _Entry(stored, embedding, time.monotonic() + self.ttl_s)
+            self._entries.move_to_end(key)
+            if self._vectors is not None:
+                if embedding is not None:
+                    self._vectors.set(key, embedding)
+                else:
+                    self._vectors.discard(key)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                if self._vectors is not None:
+                    self._vectors.discard(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def _clear(self) -> None:
+        self._entries.clear()
+        if self._vectors is not None:
+            self._vectors.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def _check_version(self) -> None:
+        if self.version_fn is None:
+            return
+        version = self.version_fn()
+        if version != self._version:
+            self._version = version
+            self._clear()
+
+    def _live(self, key: str) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at < time.monotonic():
+            del self._entries[key]
+            if self._vectors is not None:
+                self._vectors.discard(key)
+            return None
+        return entry
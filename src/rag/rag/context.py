@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from ..models import RetrievalResult
+from ..settings import ContextConfig
+from ..text.tokenizers import Tokenizer, load_tokenizer
+
+_CHUNK_ID_RE = re.compile(r"^(?P<parent>.*)#chunk=(?P<index>\d+)$")
+SHINGLE_WORDS = 5
+# A passage that does not fit is cut to the remaining budget only if this much is left.
+MIN_TRUNCATED_TOKENS = 64
+PASSAGE_SEPARATOR = "\n\n"
+# Non-overlapping structured chunks are split at blank lines or spaces: a gap this small
+# between one chunk's char_end and the next one's char_start is only a separator.
+MAX_SEPARATOR_CHARS = 4
+ELLIPSIS = "..."
+
+
+@dataclass
+class _Passage:
+    source: str
+    text: str
+    rank: int
+    parent: str
+    index: Optional[int]
+    start: Optional[int]
+    end: Optional[int]
+    doc_ids: List[str] = field(default_factory=list)
+
+    def follows(self, previous: "_Passage") -> bool:
+        """True if this chunk directly continues (or overlaps) `previous` in its document."""
+        if self.parent != previous.parent:
+            return False
+        if self.index is not None and previous.index is not None:
+            if self.index == previous.index + 1:
+                return True
+        if self.start is None or previous.start is None or previous.end is None:
+            return False
+        return previous.start <= self.start <= previous.end + MAX_SEPARATOR_CHARS
+
+
+@dataclass
+class PackedContext:
+    text: str
+    tokens: int
+    # Tokens the retrieved chunks would take if concatenated as-is.
+    input_tokens: int
+    passages: int
+    merged: int = 0
+    duplicates: int = 0
+    truncated: int = 0
+    dropped: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.input_tokens - self.tokens)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "tokens": self.tokens,
+            "tokens_saved": self.tokens_saved,
+            "passages": self.passages,
+            "merged": self.merged,
+            "duplicates": self.duplicates,
+            "truncated": self.truncated,
+            "dropped": self.dropped,
+        }
+
+
+def _format(source: str, text: str) -> str:
+    return f"[{source}] {text}"
+
+
+def _join_overlapping(first: str, second: str) -> str:
+    """Concatenate two neighbouring chunks, keeping their shared words once."""
+    a, b = first.split(), second.split()
+    if not b:
+        return first
+    for i in range(max(0, len(a) - len(b)), len(a)):
+        if a[i] == b[0] and a[i:] == b[: len(a) - i]:
+            return " ".join(a + b[len(a) - i :])
+    return f"{first} {second}"
+
+
+def _shingles(text: str) -> FrozenSet[int]:
+    words = text.lower().split()
+    if len(words) < SHINGLE_WORDS:
+        return frozenset([hash(tuple(words))])
+    return frozenset(
+        hash(tuple(words[i : i + SHINGLE_WORDS])) for i in range(len(words) - SHINGLE_WORDS + 1)
+    )
+
+
+def _containment(a: FrozenSet[int], b: FrozenSet[int]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / min(len(a), len(b))
+
+
+class ContextPacker:
+    """
+    Builds the prompt context from reranked chunks under a token budget: neighbouring
+    chunks of one document are merged (chunk index or char offsets), near-duplicate
+    passages are dropped, and passages are added in rank order until the budget is used.
+    """
+
+    def __init__(self, tokenizer: Optional[Tokenizer] = None, dedupe_threshold: float = 0.8):
+        self.tokenizer = tokenizer or load_tokenizer("")
+        self.dedupe_threshold = dedupe_threshold
+
+    @classmethod
+    def from_config(cls, config: ContextConfig) -> "ContextPacker":
+        return cls(load_tokenizer(config.tokenizer), config.dedupe_threshold)
+
+    def pack(self, results: List[RetrievalResult], max_tokens: int) -> PackedContext:
+        count = self.tokenizer.count
+        input_tokens = sum(
+            count(_format(r.metadata.get("source", r.doc_id), (r.text or "").strip()))
+            for r in results
+        )
+        passages, merged = self._merge_neighbours(results)
+        passages, duplicates = self._drop_duplicates(passages)
+        packed = PackedContext(
+            text="",
+            tokens=0,
+            input_tokens=input_tokens,
+            passages=0,
+            merged=merged,
+            duplicates=duplicates,
+        )
+        parts: List[str] = []
+        remaining = max_tokens
+        for passage in passages:
+            part = _format(passage.source, passage.text)
+            tokens = count(part)
+            if tokens > remaining:
+                if remaining < MIN_TRUNCATED_TOKENS:
+                    packed.dropped += 1
+                    continue
+                part = self._truncate(part, remaining)
+                tokens = count(part)
+                packed.truncated += 1
+            parts.append(part)
+            packed.tokens += tokens
+            remaining -= tokens
+        packed.text = PASSAGE_SEPARATOR.join(parts)
+        packed.passages = len(parts)
+        return packed
+
+    def _merge_neighbours(self, results: List[RetrievalResult]) -> Tuple[List[_Passage], int]:
+        passages = []
+        for rank, r in enumerate(results):
+            match = _CHUNK_ID_RE.match(r.doc_id)
+            start, end = r.metadata.get("char_start"), r.metadata.get("char_end")
+            passages.append(
+                _Passage(
+                    source=str(r.metadata.get("source", r.doc_id)),
+                    text=(r.text or "").strip(),
+                    rank=rank,
+                    parent=match.group("parent") if match else r.doc_id,
+                    index=int(match.group("index")) if match else None,
+                    start=start if isinstance(start, int) else None,
+                    end=end if isinstance(end, int) else None,
+                    doc_ids=[r.doc_id],
+                )
+            )
+        ordered = sorted(
+            passages,
+            key=lambda p: (p.parent, p.start if p.start is not None else -1, p.index or 0),
+        )
+        combined: List[_Passage] = []
+        merged = 0
+        for passage in ordered:
+            previous = combined[-1] if combined else None
+            if previous is not None and passage.follows(previous):
+                previous.text = _join_overlapping(previous.text, passage.text)
+                previous.rank = min(previous.rank, passage.rank)
+                previous.index = passage.index
+                if passage.end is not None and previous.end is not None:
+                    previous.end = max(previous.end, passage.end)
+                previous.doc_ids.extend(passage.doc_ids)
+                merged += 1
+                continue
+            combined.append(passage)
+        combined.sort(key=lambda p: p.rank)
+        return combined, merged
+
+    def _drop_duplicates(self, passages: List[_Passage]) -> Tuple[List[_Passage], int]:
+        kept: List[_Passage] = []
+        kept_shingles: List[FrozenSet[int]] = []
+        duplicates = 0
+        for passage in passages:
+            shingles = _shingles(passage.text)
+            if any(
+                _containment(shingles, other) >= self.dedupe_threshold for other in kept_shingles
+            ):
+                duplicates += 1
+                continue
+            kept.append(passage)
+            kept_shingles.append(shingles)
+        return kept, duplicates
+
+    def _truncate(self, part: str, max_tokens: int) -> str:
+        spans = self.tokenizer.token_spans(part)
+        keep = min(len(spans), max_tokens - self.tokenizer.count(ELLIPSIS))
+        while keep > 0:
+            text = f"{part[: spans[keep - 1][1]].rstrip()}{ELLIPSIS}"
+            # Subword tokenizers may split the cut text differently; shrink until it fits.
+            if self.tokenizer.count(text) <= max_tokens:
+                return text
+            keep -= 1
+        return ELLIPSIS
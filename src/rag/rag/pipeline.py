@@ -1,19 +1,56 @@
 from __future__ import annotations
 
+import asyncio
 import logging
-import re
-from typing import Iterable, List, Optional
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from ..embeddings import Embeddings
 from ..llm import LLM
+from ..metrics import (
+    ANSWER_CACHE_TOTAL,
+    ANSWERS_TOTAL,
+    CONTEXT_TOKENS_TOTAL,
+    FALLBACKS_TOTAL,
+    RETRIEVAL_WIDENINGS_TOTAL,
+    StageTimings,
+)
 from ..models import RagResponse, RetrievalResult
+from ..retrieval import (
+    BM25Index,
+    RetrievalFilter,
+    reciprocal_rank_fusion,
+    weighted_score_fusion,
+)
 from ..settings import Settings
 from ..vectorstore import VectorStore
+from .cache import AnswerCache, replay_chunks
+from .context import ContextPacker
 from .prompts import SYSTEM_PROMPT, USER_PROMPT_TEMPLATE
+from .rerank import Reranker, build_reranker
 
 logger = logging.getLogger(__name__)
-MAX_CONTEXT_SNIPPET_CHARS = 1400
-RETRIEVAL_OVERSAMPLING_FACTOR = 5
+
+
+def _active(filters: Optional[RetrievalFilter]) -> Optional[RetrievalFilter]:
+    return filters if filters is not None and not filters.is_empty() else None
+
+
+@asynccontextmanager
+async def _aclosing(stream: AsyncIterator[str]) -> AsyncIterator[AsyncIterator[str]]:
+    """contextlib.aclosing (Python 3.10+), kept local for the 3.9 floor."""
+    try:
+        yield stream
+    finally:
+        aclose = getattr(stream, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+async def _areplay(answer: str) -> AsyncIterator[str]:
+    for chunk in replay_chunks(answer):
+        yield chunk
 
 
 class RagPipeline:
@@ -24,52 +61,431 @@ class RagPipeline:
         llm_cloud: LLM,
         llm_ollama: LLM,
         settings: Settings,
+        lexical_index: Optional[BM25Index] = None,
+        answer_cache: Optional[AnswerCache] = None,
+        reranker: Optional[Reranker] = None,
     ) -> None:
         self.embeddings = embeddings
         self.vectorstore = vectorstore
         self.llm_cloud = llm_cloud
         self.llm_ollama = llm_ollama
         self.settings = settings
+        self.lexical_index = lexical_index
+        self.answer_cache = answer_cache
+        # Defaults to the reranker configured under settings.rerank (None for "none").
+        self.reranker = reranker if reranker is not None else build_reranker(settings.rerank)
+        self.context_packer = ContextPacker.from_config(settings.context)
+
+    def _candidate_k(self) -> int:
+        rag_cfg = self.settings.rag
+        return rag_cfg.top_k * max(1, rag_cfg.candidate_factor)
+
+    def _max_candidate_k(self) -> int:
+        rag_cfg = self.settings.rag
+        return rag_cfg.top_k * max(1, rag_cfg.candidate_factor, rag_cfg.max_candidate_factor)
+
+    def _pool_size(self, candidate_k: int) -> int:
+        # Without a reranker only the final top_k are read, so only those are hydrated.
+        return candidate_k if self.reranker is not None else self.settings.rag.top_k
+
+    def retrieve(
+        self,
+        question: str,
+        query_embedding: Optional[List[float]] = None,
+        timings: Optional[StageTimings] = None,
+        filters: Optional[RetrievalFilter] = None,
+    ) -> List[RetrievalResult]:
+        """
+        Dense (+ BM25) candidates for `question`, up to the rerank pool size, with text.
+        `filters` is pushed down into the vector store; lexical-only hits are checked
+        against it after hydration.
+        """
+        timings = timings or StageTimings()
+        candidates, _, _ = self._retrieve(
+            question, query_embedding, timings, _active(filters), self._candidate_k(), {}
+        )
+        return self.vectorstore.hydrate(candidates)
+
+    async def aretrieve(
+        self,
+        question: str,
+        query_embedding: Optional[List[float]] = None,
+        timings: Optional[StageTimings] = None,
+        filters: Optional[RetrievalFilter] = None,
+    ) -> List[RetrievalResult]:
+        timings = timings or StageTimings()
+        candidates, _, _ = await self._aretrieve(
+            question, query_embedding, timings, _active(filters), self._candidate_k(), {}
+        )
+        return await asyncio.to_thread(self.vectorstore.hydrate, candidates)
+
+    def _retrieve(
+        self,
+        question: str,
+        query_embedding: Optional[List[float]],
+        timings: StageTimings,
+        filters: Optional[RetrievalFilter],
+        candidate_k: int,
+        known: Dict[str, Optional[RetrievalResult]],
+    ) -> Tuple[List[RetrievalResult], List[float], bool]:
+        """
+        Return (candidates, query embedding, no deeper candidates exist). Candidates carry
+        metadata, and text only if the reranker reads it.
+        """
+        if query_embedding is None:
+            with timings.stage("embed"):
+                query_embedding = self.embeddings.embed_texts([question])[0]
+        with timings.stage("retrieve"):
+            dense = self._dense_search(query_embedding, candidate_k, filters)
+        lexical: List[Tuple[str, float]] = []
+        if self.lexical_index is not None:
+            with timings.stage("lexical"):
+                lexical = self.lexical_index.search(question, candidate_k)
+        ranking, exhausted = self._rank(dense, lexical, candidate_k, timings)
+        with timings.stage("hydrate"):
+            candidates = self._hydrate(ranking, self._pool_size(candidate_k), filters, known)
+        return candidates, query_embedding, exhausted
+
+    async def _aretrieve(
+        self,
+        question: str,
+        query_embedding: Optional[List[float]],
+        timings: StageTimings,
+        filters: Optional[RetrievalFilter],
+        candidate_k: int,
+        known: Dict[str, Optional[RetrievalResult]],
+    ) -> Tuple[List[RetrievalResult], List[float], bool]:
+        async def dense_search() -> Tuple[List[float], List[RetrievalResult]]:
+            embedding = query_embedding
+            if embedding is None:
+                with timings.stage("embed"):
+                    embedding = (await self.embeddings.aembed_texts([question]))[0]
+            with timings.stage("retrieve"):
+                return embedding, await self._adense_search(embedding, candidate_k, filters)
+
+        async def lexical_search() -> List[Tuple[str, float]]:
+            if self.lexical_index is None:
+                return []
+            with timings.stage("lexical"):
+                return await asyncio.to_thread(self.lexical_index.search, question, candidate_k)
+
+        # Dense and lexical stages overlap here, so their durations can sum past the total.
+        (embedding, dense), lexical = await asyncio.gather(dense_search(), lexical_search())
+        ranking, exhausted = self._rank(dense, lexical, candidate_k, timings)
+        with timings.stage("hydrate"):
+            candidates = await asyncio.to_thread(
+                self._hydrate, ranking, self._pool_size(candidate_k), filters, known
+            )
+        return candidates, embedding, exhausted
+
+    def _dense_search(
+        self, embedding: List[float], top_k: int, filters: Optional[RetrievalFilter]
+    ) -> List[RetrievalResult]:
+        store = self.vectorstore
+        if store.lazy_hydration:
+            if filters is None:
+                hits = store.query_ids(embedding, top_k)
+            else:
+                hits = store.query_ids(embedding, top_k, filters)
+            return [RetrievalResult.pending(doc_id, score) for doc_id, score in hits]
+        if filters is None:
+            return store.query(embedding, top_k)
+        return store.query(embedding, top_k, filters)
+
+    async def _adense_search(
+        self, embedding: List[float], top_k: int, filters: Optional[RetrievalFilter]
+    ) -> List[RetrievalResult]:
+        store = self.vectorstore
+        if store.lazy_hydration:
+            if filters is None:
+                hits = await store.aquery_ids(embedding, top_k)
+            else:
+                hits = await store.aquery_ids(embedding, top_k, filters)
+            return [RetrievalResult.pending(doc_id, score) for doc_id, score in hits]
+        if filters is None:
+            return await store.aquery(embedding, top_k)
+        return await store.aquery(embedding, top_k, filters)
+
+    def _rank(
+        self,
+        dense: List[RetrievalResult],
+        lexical: List[Tuple[str, float]],
+        candidate_k: int,
+        timings: StageTimings,
+    ) -> Tuple[List[RetrievalResult], bool]:
+        """Fused ranking, and whether a wider window could add candidates."""
+        with timings.stage("filter"):
+            kept = self._filter_min_score(dense)
+        # Dense hits come best first, so once min_score cuts some, deeper ones fail it too.
+        exhausted = len(dense) < candidate_k or len(kept) < len(dense)
+        if self.lexical_index is not None:
+            exhausted = exhausted and len(lexical) < candidate_k
+        with timings.stage("fuse"):
+            return self._fuse(kept, lexical, candidate_k), exhausted
+
+    def _filter_min_score(self, results: List[RetrievalResult]) -> List[RetrievalResult]:
+        # min_score is a dense similarity threshold; apply it before fusion rescales scores.
+        if self.settings.rag.min_score > 0:
+            return [r for r in results if r.score >= self.settings.rag.min_score]
+        return results
+
+    def _fuse(
+        self, dense: List[RetrievalResult], lexical: List[Tuple[str, float]], candidate_k: int
+    ) -> List[RetrievalResult]:
+        """Merge dense and BM25 rankings; ids only found lexically become pending results."""
+        if not lexical:
+            return dense[:candidate_k]
+        rag_cfg = self.settings.rag
+        if rag_cfg.fusion == "weighted":
+            fused = weighted_score_fusion(
+                [(r.doc_id, r.score) for r in dense], lexical, rag_cfg.dense_weight
+            )
+        else:
+            fused = reciprocal_rank_fusion(
+                [[r.doc_id for r in dense], [doc_id for doc_id, _ in lexical]], k=rag_cfg.rrf_k
+            )
+        by_id = {r.doc_id: r for r in dense}
+        return [
+            by_id[doc_id].with_score(score) if doc_id in by_id
+            else RetrievalResult.pending(doc_id, score)
+            for doc_id, score in fused[:candidate_k]
+        ]
+
+    def _hydrate(
+        self,
+        ranking: List[RetrievalResult],
+        size: int,
+        filters: Optional[RetrievalFilter],
+        known: Dict[str, Optional[RetrievalResult]],
+    ) -> List[RetrievalResult]:
+        """
+        The first `size` candidates of `ranking` that still exist and match `filters`.
+        Metadata is loaded in bulk per window, text only if the reranker needs it.
+        `known` carries what narrower windows loaded (None for chunks found gone).
+        """
+        results: List[RetrievalResult] = []
+        pos = 0
+        while len(results) < size and pos < len(ranking):
+            window = ranking[pos : pos + size - len(results)]
+            pos += len(window)
+            pending: List[RetrievalResult] = []
+            for candidate in window:
+                if candidate.doc_id in known:
+                    loaded = known[candidate.doc_id]
+                    if loaded is None:
+                        continue
+                    candidate.metadata = loaded.metadata
+                    if candidate.text is None:
+                        candidate.text = loaded.text
+                pending.append(candidate)
+            found = self.vectorstore.hydrate(pending, text=False)
+            for candidate in pending:
+                known.setdefault(candidate.doc_id, None)
+            for candidate in found:
+                known[candidate.doc_id] = candidate
+            results.extend(r for r in found if filters is None or filters.matches(r.metadata))
+        if self.reranker is not None and self.reranker.needs_text(results):
+            results = self.vectorstore.hydrate(results)
+        return results
+
+    def _select_results(
+        self, results: List[RetrievalResult], question: str, timings: StageTimings
+    ) -> List[RetrievalResult]:
+        with timings.stage("rerank"):
+            results = self._rerank_results(results, question)
+        return results[: self.settings.rag.top_k]
+
+    def _should_widen(
+        self,
+        pool: List[RetrievalResult],
+        selected: List[RetrievalResult],
+        candidate_k: int,
+        exhausted: bool,
+    ) -> bool:
+        """
+        Widen the candidate window when hydration dropped hits (filters, deleted chunks)
+        or when the reranker promoted one from the lower half of the pool, which means
+        deeper candidates could rank higher too.
+        """
+        if exhausted or candidate_k >= self._max_candidate_k():
+            return False
+        if len(pool) < self._pool_size(candidate_k):
+            RETRIEVAL_WIDENINGS_TOTAL.inc(reason="filtered")
+            return True
+        if self.reranker is None or len(pool) <= self.settings.rag.top_k:
+            return False
+        tail = {r.doc_id for r in pool[len(pool) // 2 :]}
+        if any(r.doc_id in tail for r in selected):
+            RETRIEVAL_WIDENINGS_TOTAL.inc(reason="rerank")
+            return True
+        return False
+
+    def _context_budget(self) -> int:
+        cfg = self.settings.context
+        model = self._get_model_name(self.settings.primary_provider())
+        return cfg.model_budgets.get(model, cfg.max_tokens)
+
+    def _build_prompt(
+        self, question: str, results: List[RetrievalResult]
+    ) -> Tuple[str, Dict[str, int]]:
+        """Return (prompt, context packing stats)."""
+        packed = self.context_packer.pack(results, self._context_budget())
+        CONTEXT_TOKENS_TOTAL.inc(packed.tokens, kind="sent")
+        CONTEXT_TOKENS_TOTAL.inc(packed.tokens_saved, kind="saved")
+        prompt = USER_PROMPT_TEMPLATE.format(question=question, context=packed.text)
+        return prompt, packed.stats()
+
+    def _prepare(
+        self,
+        question: str,
+        query_embedding: Optional[List[float]],
+        timings: StageTimings,
+        filters: Optional[RetrievalFilter] = None,
+    ) -> Tuple[List[RetrievalResult], str, Dict[str, int]]:
+        candidate_k = self._candidate_k()
+        known: Dict[str, Optional[RetrievalResult]] = {}
+        while True:
+            pool, query_embedding, exhausted = self._retrieve(
+                question, query_embedding, timings, filters, candidate_k, known
+            )
+            results = self._select_results(pool, question, timings)
+            if not self._should_widen(pool, results, candidate_k, exhausted):
+                break
+            candidate_k = min(candidate_k * 2, self._max_candidate_k())
+        with timings.stage("hydrate"):
+            results = self.vectorstore.hydrate(results)
+        with timings.stage("context"):
+            prompt, context = self._build_prompt(question, results)
+        return results, prompt, context
+
+    async def _aprepare(
+        self,
+        question: str,
+        query_embedding: Optional[List[float]],
+        timings: StageTimings,
+        filters: Optional[RetrievalFilter] = None,
+    ) -> Tuple[List[RetrievalResult], str, Dict[str, int]]:
+        candidate_k = self._candidate_k()
+        known: Dict[str, Optional[RetrievalResult]] = {}
+        while True:
+            pool, query_embedding, exhausted = await self._aretrieve(
+                question, query_embedding, timings, filters, candidate_k, known
+            )
+            results = self._select_results(pool, question, timings)
+            if not self._should_widen(pool, results, candidate_k, exhausted):
+                break
+            candidate_k = min(candidate_k * 2, self._max_candidate_k())
+        with timings.stage("hydrate"):
+            results = await asyncio.to_thread(self.vectorstore.hydrate, results)
+        with timings.stage("context"):
+            prompt, context = self._build_prompt(question, results)
+        return results, prompt, context
+
+    def _cache_lookup(
+        self, question: str, timings: StageTimings, filters: Optional[RetrievalFilter] = None
+    ) -> Tuple[Optional[RagResponse], Optional[List[float]]]:
+        """
+        Return (cached response, query embedding). The embedding is only computed for
+        semantic matching and is then reused for retrieval on a miss. Filtered
+        questions bypass the cache, which is keyed by question only.
+        """
+        cache = self.answer_cache
+        if cache is None or filters is not None:
+            return None, None
+        with timings.stage("cache"):
+            cached = cache.get(question)
+        query_embedding = None
+        if cached is None and cache.semantic:
+            with timings.stage("embed"):
+                query_embedding = self.embeddings.embed_texts([question])[0]
+            with timings.stage("cache"):
+                cached = cache.get(question, query_embedding)
+        return self._cache_result(cached, timings), query_embedding
+
+    async def _acache_lookup(
+        self, question: str, timings: StageTimings, filters: Optional[RetrievalFilter] = None
+    ) -> Tuple[Optional[RagResponse], Optional[List[float]]]:
+        cache = self.answer_cache
+        if cache is None or filters is not None:
+            return None, None
+        with timings.stage("cache"):
+            cached = cache.get(question)
+        query_embedding = None
+        if cached is None and cache.semantic:
+            with timings.stage("embed"):
+                query_embedding = (await self.embeddings.aembed_texts([question]))[0]
+            with timings.stage("cache"):
+                cached = cache.get(question, query_embedding)
+        return self._cache_result(cached, timings), query_embedding
+
+    @staticmethod
+    def _cache_result(
+        cached: Optional[RagResponse], timings: StageTimings
+    ) -> Optional[RagResponse]:
+        ANSWER_CACHE_TOTAL.inc(result="miss" if cached is None else "hit")
+        if cached is not None:
+            timings.finish()
+            cached.timings = timings.as_ms()
+        return cached
 
-    def retrieve(self, question: str) -> List[RetrievalResult]:
-        query_embedding = self.embeddings.embed_texts([question])[0]
-        candidate_k = max(
-            self.settings.rag.top_k,
-            self.settings.rag.top_k * RETRIEVAL_OVERSAMPLING_FACTOR,
+    def _cache_store(
+        self,
+        question: str,
+        query_embedding: Optional[List[float]],
+        response: RagResponse,
+        filters: Optional[RetrievalFilter] = None,
+    ) -> None:
+        if self.answer_cache is not None and filters is None:
+            self.answer_cache.put(question, response, query_embedding)
+
+    def _timed_stream(
+        self, chunks: Iterable[str], timings: StageTimings, used_fallback: bool
+    ) -> Iterator[str]:
+        # ttft is measured from the start of the request, generate from the first pull.
+        started = time.perf_counter()
+        emitted = False
+        try:
+            for chunk in chunks:
+                if not emitted:
+                    emitted = True
+                    timings.record("ttft", time.perf_counter() - timings.started)
+                yield chunk
+        except Exception:
+            ANSWERS_TOTAL.inc(mode="stream", outcome="error")
+            raise
+        timings.record("generate", time.perf_counter() - started)
+        timings.finish()
+        ANSWERS_TOTAL.inc(mode="stream", outcome="fallback" if used_fallback else "ok")
+
+    def _caching_stream(
+        self,
+        question: str,
+        query_embedding: Optional[List[float]],
+        results: List[RetrievalResult],
+        model_name: str,
+        used_fallback: bool,
+        chunks: Iterable[str],
+    ) -> Iterator[str]:
+        # Only streams consumed to the end are cached; a closed generator skips the put.
+        parts: List[str] = []
+        for chunk in chunks:
+            parts.append(chunk)
+            yield chunk
+        self._cache_store(
+            question,
+            query_embedding,
+            RagResponse(
+                answer="".join(parts),
+                sources=results,
+                model=model_name,
+                used_fallback=used_fallback,
+            ),
         )
-        return self.vectorstore.query(query_embedding, candidate_k)
-
-    def _build_context(self, results: List[RetrievalResult]) -> str:
-        parts = []
-        for r in results:
-            source = r.metadata.get("source", r.doc_id)
-            text = (r.text or "").strip()
-            if len(text) > MAX_CONTEXT_SNIPPET_CHARS:
-                text = f"{text[:MAX_CONTEXT_SNIPPET_CHARS]}..."
-            parts.append(f"[{source}] {text}")
-        return "\n\n".join(parts)
-
-    def _query_terms(self, question: str) -> set[str]:
-        terms = re.findall(r"[A-Za-z0-9]+", question.lower())
-        return {term for term in terms if len(term) >= 3}
-
-    def _keyword_overlap(self, result: RetrievalResult, terms: set[str]) -> int:
-        if not terms:
-            return 0
-        source = str(result.metadata.get("source", result.doc_id)).lower()
-        text = (result.text or "").lower()
-        haystack = f"{source}\n{text}"
-        return sum(1 for term in terms if term in haystack)
 
     def _rerank_results(self, results: List[RetrievalResult], question: str) -> List[RetrievalResult]:
-        terms = self._query_terms(question)
-        if not terms:
+        if self.reranker is None:
             return results
-        return sorted(
-            results,
-            key=lambda r: (self._keyword_overlap(r, terms), r.score),
-            reverse=True,
-        )
+        return self.reranker.rerank(question, results)
 
     def _get_llm(self, provider: str) -> LLM:
         if provider == "cloud":
@@ -94,56 +510,244 @@ class RagPipeline:
         llm = self._get_llm(provider)
         return llm.stream(prompt, system_prompt=SYSTEM_PROMPT)
 
-    def answer(self, question: str) -> RagResponse:
-        results = self.retrieve(question)
-        if self.settings.rag.min_score > 0:
-            results = [r for r in results if r.score >= self.settings.rag.min_score]
-        results = self._rerank_results(results, question)
-        results = results[: self.settings.rag.top_k]
-        context = self._build_context(results)
-        prompt = USER_PROMPT_TEMPLATE.format(question=question, context=context)
-
+    def _generate_answer(self, prompt: str, timings: StageTimings) -> Tuple[str, str, bool]:
+        """Return (answer, model name, used_fallback)."""
         primary_provider = self.settings.primary_provider()
-        used_fallback = False
-        model_name = self._get_model_name(primary_provider)
+        started = time.perf_counter()
         try:
             answer = self._generate(primary_provider, prompt)
         except Exception as exc:  # noqa: BLE001
+            timings.record("fallback", time.perf_counter() - started)
             logger.warning("%s LLM failed: %s", primary_provider, exc)
             fallback_provider = self._fallback_provider(primary_provider)
             if not self.settings.rag.fallback_to_ollama or fallback_provider is None:
                 raise
-            answer = self._generate(fallback_provider, prompt)
-            used_fallback = True
-            model_name = self._get_model_name(fallback_provider)
+            FALLBACKS_TOTAL.inc(provider=primary_provider)
+            with timings.stage("generate"):
+                answer = self._generate(fallback_provider, prompt)
+            return answer, self._get_model_name(fallback_provider), True
+        timings.record("generate", time.perf_counter() - started)
+        return answer, self._get_model_name(primary_provider), False
 
-        return RagResponse(
+    async def _agenerate_answer(
+        self, prompt: str, timings: StageTimings
+    ) -> Tuple[str, str, bool]:
+        primary_provider = self.settings.primary_provider()
+        started = time.perf_counter()
+        try:
+            answer = await self._get_llm(primary_provider).agenerate(
+                prompt, system_prompt=SYSTEM_PROMPT
+            )
+        except Exception as exc:  # noqa: BLE001
+            timings.record("fallback", time.perf_counter() - started)
+            logger.warning("%s LLM failed: %s", primary_provider, exc)
+            fallback_provider = self._fallback_provider(primary_provider)
+            if not self.settings.rag.fallback_to_ollama or fallback_provider is None:
+                raise
+            FALLBACKS_TOTAL.inc(provider=primary_provider)
+            with timings.stage("generate"):
+                answer = await self._get_llm(fallback_provider).agenerate(
+                    prompt, system_prompt=SYSTEM_PROMPT
+                )
+            return answer, self._get_model_name(fallback_provider), True
+        timings.record("generate", time.perf_counter() - started)
+        return answer, self._get_model_name(primary_provider), False
+
+    def _finish_answer(
+        self,
+        question: str,
+        query_embedding: Optional[List[float]],
+        results: List[RetrievalResult],
+        generated: Tuple[str, str, bool],
+        timings: StageTimings,
+        context: Dict[str, int],
+        filters: Optional[RetrievalFilter] = None,
+    ) -> RagResponse:
+        answer, model_name, used_fallback = generated
+        timings.finish()
+        ANSWERS_TOTAL.inc(mode="answer", outcome="fallback" if used_fallback else "ok")
+        response = RagResponse(
             answer=answer,
             sources=results,
             model=model_name,
             used_fallback=used_fallback,
+            timings=timings.as_ms(),
+            context=context,
+        )
+        self._cache_store(question, query_embedding, response, filters)
+        return response
+
+    def answer(self, question: str, filters: Optional[RetrievalFilter] = None) -> RagResponse:
+        timings = StageTimings()
+        filters = _active(filters)
+        cached, query_embedding = self._cache_lookup(question, timings, filters)
+        if cached is not None:
+            ANSWERS_TOTAL.inc(mode="answer", outcome="cached")
+            return cached
+        results, prompt, context = self._prepare(question, query_embedding, timings, filters)
+        try:
+            generated = self._generate_answer(prompt, timings)
+        except Exception:
+            ANSWERS_TOTAL.inc(mode="answer", outcome="error")
+            raise
+        return self._finish_answer(
+            question, query_embedding, results, generated, timings, context, filters
         )
 
-    def answer_stream(self, question: str) -> Iterable[str]:
+    def answer_stream(
+        self, question: str, filters: Optional[RetrievalFilter] = None
+    ) -> Iterable[str]:
         """
         Stream only the answer text (no metadata). Keeps same retrieval/prompting as answer().
         """
-        results = self.retrieve(question)
-        if self.settings.rag.min_score > 0:
-            results = [r for r in results if r.score >= self.settings.rag.min_score]
-        results = self._rerank_results(results, question)
-        results = results[: self.settings.rag.top_k]
-        context = self._build_context(results)
-        prompt = USER_PROMPT_TEMPLATE.format(question=question, context=context)
+        timings = StageTimings()
+        filters = _active(filters)
+        cached, query_embedding = self._cache_lookup(question, timings, filters)
+        if cached is not None:
+            ANSWERS_TOTAL.inc(mode="stream", outcome="cached")
+            return replay_chunks(cached.answer)
+        results, prompt, _ = self._prepare(question, query_embedding, timings, filters)
 
         primary_provider = self.settings.primary_provider()
         model_name = self._get_model_name(primary_provider)
+        used_fallback = False
         try:
-            return self._generate_stream(primary_provider, prompt)
+            chunks = self._generate_stream(primary_provider, prompt)
         except Exception as exc:  # noqa: BLE001
             logger.warning("%s LLM failed in stream mode: %s", primary_provider, exc)
             fallback_provider = self._fallback_provider(primary_provider)
             if not self.settings.rag.fallback_to_ollama or fallback_provider is None:
+                ANSWERS_TOTAL.inc(mode="stream", outcome="error")
                 raise
+            FALLBACKS_TOTAL.inc(provider=primary_provider)
             model_name = self._get_model_name(fallback_provider)
-            return self._generate_stream(fallback_provider, prompt)
+            used_fallback = True
+            chunks = self._generate_stream(fallback_provider, prompt)
+        chunks = self._timed_stream(chunks, timings, used_fallback)
+        if self.answer_cache is None or filters is not None:
+            return chunks
+        return self._caching_stream(
+            question, query_embedding, results, model_name, used_fallback, chunks
+        )
+
+    async def aanswer(
+        self, question: str, filters: Optional[RetrievalFilter] = None
+    ) -> RagResponse:
+        timings = StageTimings()
+        filters = _active(filters)
+        cached, query_embedding = await self._acache_lookup(question, timings, filters)
+        if cached is not None:
+            ANSWERS_TOTAL.inc(mode="answer", outcome="cached")
+            return cached
+        results, prompt, context = await self._aprepare(
+            question, query_embedding, timings, filters
+        )
+        try:
+            generated = await self._agenerate_answer(prompt, timings)
+        except Exception:
+            ANSWERS_TOTAL.inc(mode="answer", outcome="error")
+            raise
+        return self._finish_answer(
+            question, query_embedding, results, generated, timings, context, filters
+        )
+
+    async def aanswer_stream(
+        self, question: str, filters: Optional[RetrievalFilter] = None
+    ) -> AsyncIterator[str]:
+        """
+        Async variant of answer_stream(). Falls back to the secondary provider only
+        if the primary fails before emitting its first chunk. Cached answers are replayed.
+        """
+        async with _aclosing(await self.astart_stream(question, filters)) as stream:
+            async for chunk in stream:
+                yield chunk
+
+    async def astart_stream(
+        self, question: str, filters: Optional[RetrievalFilter] = None
+    ) -> AsyncIterator[str]:
+        """
+        Run the cache lookup, retrieval and prompt building now and return the stream of
+        answer chunks. Embedding or vector store failures raise here, before a caller has
+        committed to a streaming response; only generation happens while iterating.
+        """
+        timings = StageTimings()
+        filters = _active(filters)
+        cached, query_embedding = await self._acache_lookup(question, timings, filters)
+        if cached is not None:
+            ANSWERS_TOTAL.inc(mode="stream", outcome="cached")
+            return _areplay(cached.answer)
+        results, prompt, _ = await self._aprepare(question, query_embedding, timings, filters)
+        return self._agenerate_stream(question, query_embedding, results, prompt, timings, filters)
+
+    async def _agenerate_stream(
+        self,
+        question: str,
+        query_embedding: Optional[List[float]],
+        results: List[RetrievalResult],
+        prompt: str,
+        timings: StageTimings,
+        filters: Optional[RetrievalFilter],
+    ) -> AsyncIterator[str]:
+        primary_provider = self.settings.primary_provider()
+        provider = primary_provider
+        parts: List[str] = []
+        started = time.perf_counter()
+        try:
+            # _aclosing: a disconnected client closes this generator, which must close the
+            # upstream LLM stream right away rather than whenever it is garbage collected.
+            async with _aclosing(
+                self._get_llm(primary_provider).astream(prompt, system_prompt=SYSTEM_PROMPT)
+            ) as stream:
+                async for chunk in stream:
+                    if not parts:
+                        timings.record("ttft", time.perf_counter() - timings.started)
+                    parts.append(chunk)
+                    yield chunk
+        except (GeneratorExit, asyncio.CancelledError):
+            ANSWERS_TOTAL.inc(mode="stream", outcome="cancelled")
+            raise
+        except Exception as exc:  # noqa: BLE001
+            if parts:
+                ANSWERS_TOTAL.inc(mode="stream", outcome="error")
+                raise
+            logger.warning("%s LLM failed in stream mode: %s", primary_provider, exc)
+            fallback_provider = self._fallback_provider(primary_provider)
+            if not self.settings.rag.fallback_to_ollama or fallback_provider is None:
+                ANSWERS_TOTAL.inc(mode="stream", outcome="error")
+                raise
+            timings.record("fallback", time.perf_counter() - started)
+            FALLBACKS_TOTAL.inc(provider=primary_provider)
+            provider = fallback_provider
+            started = time.perf_counter()
+        if provider != primary_provider:
+            try:
+                async with _aclosing(
+                    self._get_llm(provider).astream(prompt, system_prompt=SYSTEM_PROMPT)
+                ) as stream:
+                    async for chunk in stream:
+                        if not parts:
+                            timings.record("ttft", time.perf_counter() - timings.started)
+                        parts.append(chunk)
+                        yield chunk
+            except (GeneratorExit, asyncio.CancelledError):
+                ANSWERS_TOTAL.inc(mode="stream", outcome="cancelled")
+                raise
+            except Exception:
+                ANSWERS_TOTAL.inc(mode="stream", outcome="error")
+                raise
+        timings.record("generate", time.perf_counter() - started)
+        timings.finish()
+        used_fallback = provider != primary_provider
+        ANSWERS_TOTAL.inc(mode="stream", outcome="fallback" if used_fallback else "ok")
+        self._cache_store(
+            question,
+            query_embedding,
+            RagResponse(
+                answer="".join(parts),
+                sources=results,
+                model=self._get_model_name(provider),
+                used_fallback=used_fallback,
+                timings=timings.as_ms(),
+            ),
+            filters,
+        )
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import math
+from abc import ABC, abstractmethod
+from typing import Dict, FrozenSet, List, Optional
+
+try:
+    from sentence_transformers import CrossEncoder
+except ImportError:  # pragma: no cover - optional dependency
+    CrossEncoder = None
+
+from ..models import RetrievalResult
+from ..settings import RerankConfig
+from ..text.terms import TERMS_METADATA_KEY, chunk_terms, tokenize_terms
+
+MIN_QUERY_TERM_LENGTH = 3
+
+
+def query_terms(question: str) -> FrozenSet[str]:
+    return frozenset(t for t in tokenize_terms(question) if len(t) >= MIN_QUERY_TERM_LENGTH)
+
+
+def result_terms(result: RetrievalResult) -> FrozenSet[str]:
+    """Terms precomputed at ingest, or computed on the fly for chunks indexed before."""
+    stored = result.metadata.get(TERMS_METADATA_KEY)
+    if stored is None:
+        source = str(result.metadata.get("source", result.doc_id))
+        stored = chunk_terms(result.text or "", source)
+    return frozenset(stored.split())
+
+
+class Reranker(ABC):
+    """Reorders retrieved candidates for a question; scores of the results are kept."""
+
+    @abstractmethod
+    def rerank(self, question: str, results: List[RetrievalResult]) -> List[RetrievalResult]:
+        raise NotImplementedError
+
+    def needs_text(self, results: List[RetrievalResult]) -> bool:
+        """Whether chunk text must be loaded for `results` before `rerank`."""
+        return True
+
+
+class _LexicalReranker(Reranker):
+    def needs_text(self, results: List[RetrievalResult]) -> bool:
+        # Only chunks indexed without stored term sets are tokenized from their text.
+        return any(TERMS_METADATA_KEY not in (r.metadata or {}) for r in results)
+
+
+class KeywordOverlapReranker(_LexicalReranker):
+    """Sort by the number of query terms a chunk contains, then by retrieval score."""
+
+    def rerank(self, question: str, results: List[RetrievalResult]) -> List[RetrievalResult]:
+        terms = query_terms(question)
+        if not terms:
+            return results
+        return sorted(
+            results, key=lambda r: (len(terms & result_terms(r)), r.score), reverse=True
+        )
+
+
+class BM25Reranker(_LexicalReranker):
+    """
+    BM25 over the candidate set only (idf from the candidates, binary term
+    frequency from the stored term sets), ties broken by retrieval score.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+
+    def rerank(self, question: str, results: List[RetrievalResult]) -> List[RetrievalResult]:
+        terms = query_terms(question)
+        if not terms or not results:
+            return results
+        term_sets = [result_terms(r) for r in results]
+        n = len(results)
+        avg_len = sum(len(t) for t in term_sets) / n or 1.0
+        df: Dict[str, int] = {term: sum(1 for t in term_sets if term in t) for term in terms}
+        idf = {term: math.log(1 + (n - df[term] + 0.5) / (df[term] + 0.5)) for term in terms}
+        scored = []
+        for result, doc_terms in zip(results, term_sets):
+            norm = self.k1 * (1 - self.b + self.b * len(doc_terms) / avg_len)
+            score = sum(idf[t] * (self.k1 + 1) / (1 + norm) for t in terms & doc_terms)
+            scored.append((score, result.score, result))
+        scored.sort(key=lambda item: (item[0], item[1]), reverse=True)
+        return [result for _, _, result in scored]
+
+
+class CrossEncoderReranker(Reranker):
+    """Local cross-encoder (sentence-transformers) scoring (question, chunk) pairs in batches."""
+
+    def __init__(self, model: str, batch_size: int = 16, device: str = "cpu") -> None:
+        if CrossEncoder is None:
+            raise ImportError("sentence-transformers is required for CrossEncoderReranker")
+        self.batch_size = batch_size
+        self._model = CrossEncoder(model, device=device)
+
+    def rerank(self, question: str, results: List[RetrievalResult]) -> List[RetrievalResult]:
+        if not results:
+            return results
+        pairs = [(question, r.text or "") for r in results]
+        scores = self._model.predict(pairs, batch_size=self.batch_size, show_progress_bar=False)
+        order = sorted(range(len(results)), key=lambda i: float(scores[i]), reverse=True)
+        return [results[i] for i in order]
+
+
+def build_reranker(config: RerankConfig) -> Optional[Reranker]:
+    if config.method == "none":
+        return None
+    if config.method == "bm25":
+        return BM25Reranker()
+    if config.method == "cross_encoder":
+        return CrossEncoderReranker(config.model, config.batch_size, config.device)
+    return KeywordOverlapReranker()
@@ -0,0 +1,5 @@
+from .bm25 import BM25Index
+from .filters import RetrievalFilter
+from .fusion import reciprocal_rank_fusion, weighted_score_fusion
+
+__all__ = ["BM25Index", "RetrievalFilter", "reciprocal_rank_fusion", "weighted_score_fusion"]
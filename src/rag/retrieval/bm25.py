@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import heapq
+import math
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from ..models import Document
+from ..text.terms import term_frequencies, tokenize_terms
+
+BM25_FILENAME = "bm25.sqlite"
+_SQL_CHUNK = 500
+
+
+class BM25Index:
+    """
+    Persistent inverted index with BM25 scoring, stored in SQLite beside the
+    vector index. Postings are kept per (term, chunk id) with term frequency;
+    document frequencies and collection length are maintained incrementally so
+    ingest can upsert and delete chunks.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        k1: float = 1.2,
+        b: float = 0.75,
+        max_df_ratio: float = 0.5,
+    ) -> None:
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        # Terms present in more than this share of chunks are treated as stop words.
+        self.max_df_ratio = max_df_ratio
+        self._lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS docs (doc_id TEXT PRIMARY KEY, length INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS postings ("
+            " term TEXT NOT NULL, doc_id TEXT NOT NULL, tf INTEGER NOT NULL,"
+            " PRIMARY KEY (term, doc_id)) WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS postings_doc ON postings(doc_id)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS terms (term TEXT PRIMARY KEY, df INTEGER NOT NULL)"
+            " WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS stats (key TEXT PRIMARY KEY, value INTEGER)")
+
+    @classmethod
+    def open(cls, index_dir: str, **kwargs) -> "BM25Index":
+        return cls(str(Path(index_dir) / BM25_FILENAME), **kwargs)
+
+    def _stat(self, key: str) -> int:
+        row = self._conn.execute("SELECT value FROM stats WHERE key = ?", (key,)).fetchone()
+        return int(row[0]) if row else 0
+
+    def _add_stat(self, key: str, delta: int) -> None:
+        self._conn.execute(
+            "INSERT INTO stats(key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = value + excluded.value",
+            (key, delta),
+        )
+
+    def count(self) -> int:
+        with self._lock:
+            return self._stat("docs")
+
+    def add(self, documents: Iterable[Document]) -> None:
+        docs = list(documents)
+        if not docs:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._delete_locked(list(dict.fromkeys(d.doc_id for d in docs)))
+                seen = set()
+                for doc in reversed(docs):
+                    # Last write wins for duplicate ids inside one batch.
+                    if doc.doc_id in seen:
+                        continue
+                    seen.add(doc.doc_id)
+                    source = str(doc.metadata.get("source", ""))
+                    freqs = term_frequencies(f"{source}\n{doc.text}")
+                    length = sum(freqs.values())
+                    self._conn.execute(
+                        "INSERT INTO docs(doc_id, length) VALUES (?, ?)", (doc.doc_id, length)
+                    )
+                    self._conn.executemany(
+                        "INSERT INTO postings(term, doc_id, tf) VALUES (?, ?, ?)",
+                        [(term, doc.doc_id, tf) for term, tf in freqs.items()],
+                    )
+                    self._conn.executemany(
+                        "INSERT INTO terms(term, df) VALUES (?, 1) "
+                        "ON CONFLICT(term) DO UPDATE SET df = df + 1",
+                        [(term,) for term in freqs],
+                    )
+                    self._add_stat("docs", 1)
+                    self._add_stat("total_length", length)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def delete(self, ids: List[str]) -> None:
+        if not ids:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._delete_locked(ids)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _delete_locked(self, ids: List[str]) -> None:
+        for start in range(0, len(ids), _SQL_CHUNK):
+            part = ids[start : start + _SQL_CHUNK]
+            marks = ",".join("?" * len(part))
+            existing = self._conn.execute(
+                f"SELECT doc_id, length FROM docs WHERE doc_id IN ({marks})", part
+            ).fetchall()
+            if not existing:
+                continue
+            present = [doc_id for doc_id, _ in existing]
+            present_marks = ",".join("?" * len(present))
+            terms = self._conn.execute(
+                f"SELECT term FROM postings WHERE doc_id IN ({present_marks})", present
+            ).fetchall()
+            self._conn.executemany("UPDATE terms SET df = df - 1 WHERE term = ?", terms)
+            self._conn.execute("DELETE FROM terms WHERE df <= 0")
+            self._conn.execute(f"DELETE FROM postings WHERE doc_id IN ({present_marks})", present)
+            self._conn.execute(f"DELETE FROM docs WHERE doc_id IN ({present_marks})", present)
+            self._add_stat("docs", -len(existing))
+            self._add_stat("total_length", -sum(length for _, length in existing))
+
+    def search(self, query: str, top_k: int) -> List[Tuple[str, float]]:
+        """Return (chunk id, BM25 score) pairs, best first."""
+        terms = list(dict.fromkeys(tokenize_terms(query)))
+        if not terms or top_k <= 0:
+            return []
+        with self._lock:
+            n_docs = self._stat("docs")
+            if n_docs == 0:
+                return []
+            avg_length = max(1.0, self._stat("total_length") / n_docs)
+            marks = ",".join("?" * len(terms))
+            dfs = dict(
+                self._conn.execute(f"SELECT term, df FROM terms WHERE term IN ({marks})", terms)
+            )
+            scores: Dict[str, float] = {}
+            for term, df in dfs.items():
+                if n_docs > 10 and df > self.max_df_ratio * n_docs:
+                    continue
+                idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+                for doc_id, tf, length in self._conn.execute(
+                    "SELECT p.doc_id, p.tf, d.length FROM postings p "
+                    "JOIN docs d ON d.doc_id = p.doc_id WHERE p.term = ?",
+                    (term,),
+                ):
+                    norm = self.k1 * (1.0 - self.b + self.b * length / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (
+                        tf + norm
+                    )
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class RetrievalFilter:
+    """
+    Metadata constraints applied inside the vector store, before top-k:
+    - source_prefix: `source` starts with this path prefix
+    - formats: `format` is one of these (e.g. "pdf", "markdown", "json")
+    - page_min / page_max: inclusive `page` range (chunks without a page never match)
+    - metadata: custom tags, each key must equal its value
+    """
+
+    source_prefix: Optional[str] = None
+    formats: Tuple[str, ...] = ()
+    page_min: Optional[int] = None
+    page_max: Optional[int] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    def is_empty(self) -> bool:
+        return not (
+            self.source_prefix
+            or self.formats
+            or self.page_min is not None
+            or self.page_max is not None
+            or self.metadata
+        )
+
+    def cache_key(self) -> str:
+        return json.dumps(
+            [self.source_prefix, list(self.formats), self.page_min, self.page_max, self.metadata],
+            sort_keys=True,
+            default=str,
+        )
+
+    def matches(self, metadata: Dict[str, Any]) -> bool:
+        if self.source_prefix and not str(metadata.get("source", "")).startswith(
+            self.source_prefix
+        ):
+            return False
+        if self.formats and metadata.get("format") not in self.formats:
+            return False
+        if self.page_min is not None or self.page_max is not None:
+            page = metadata.get("page")
+            if not isinstance(page, (int, float)):
+                return False
+            if self.page_min is not None and page < self.page_min:
+                return False
+            if self.page_max is not None and page > self.page_max:
+                return False
+        return all(metadata.get(key) == value for key, value in self.metadata.items())
+
+    def to_chroma_where(self) -> Optional[Dict[str, Any]]:
+        """
+        Chroma `where` clause for everything but `source_prefix`, which Chroma cannot
+        express on metadata (callers post-filter it with `matches`).
+        """
+        conditions: List[Dict[str, Any]] = []
+        if self.formats:
+            conditions.append({"format": {"$in": list(self.formats)}})
+        if self.page_min is not None:
+            conditions.append({"page": {"$gte": self.page_min}})
+        if self.page_max is not None:
+            conditions.append({"page": {"$lte": self.page_max}})
+        conditions.extend({key: value} for key, value in self.metadata.items())
+        if not conditions:
+            return None
+        return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+    def to_sql(self, column: str = "metadata") -> Tuple[str, List[Any]]:
+        """SQLite condition over a JSON metadata column, with its parameters."""
+        clauses: List[str] = []
+        params: List[Any] = []
+        if self.source_prefix:
+            clauses.append(f"substr(json_extract({column}, '$.source'), 1, ?) = ?")
+            params.extend([len(self.source_prefix), self.source_prefix])
+        if self.formats:
+            marks = ",".join("?" * len(self.formats))
+            clauses.append(f"json_extract({column}, '$.format') IN ({marks})")
+            params.extend(self.formats)
+        if self.page_min is not None:
+            clauses.append(f"json_extract({column}, '$.page') >= ?")
+            params.append(self.page_min)
+        if self.page_max is not None:
+            clauses.append(f"json_extract({column}, '$.page') <= ?")
+            params.append(self.page_max)
+        for key, value in self.metadata.items():
+            clauses.append(f"json_extract({column}, ?) = ?")
+            params.extend([_json_path(key), value])
+        return (" AND ".join(clauses) or "1"), params
+
+
+def _json_path(key: str) -> str:
+    return '$."' + str(key).replace('"', '\\"') + '"'
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from typing import Dict, List, Sequence, Tuple
+
+RRF_K = 60
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[str]], k: int = RRF_K
+) -> List[Tuple[str, float]]:
+    """
+    Fuse ranked id lists: score(id) = sum(1 / (k + rank)). Scores are scaled so a
+    document ranked first in every list gets 1.0.
+    """
+    if not rankings:
+        return []
+    fused: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank)
+    best = len(rankings) / (k + 1)
+    return sorted(
+        ((doc_id, score / best) for doc_id, score in fused.items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+
+
+def weighted_score_fusion(
+    dense: Sequence[Tuple[str, float]],
+    lexical: Sequence[Tuple[str, float]],
+    dense_weight: float = 0.5,
+) -> List[Tuple[str, float]]:
+    """
+    Combine min-max normalized dense and lexical scores:
+    dense_weight * dense + (1 - dense_weight) * lexical.
+    """
+    fused: Dict[str, float] = {}
+    for weight, scored in ((dense_weight, dense), (1.0 - dense_weight, lexical)):
+        if not scored:
+            continue
+        values = [score for _, score in scored]
+        low, high = min(values), max(values)
+        span = high - low
+        for doc_id, score in scored:
+            normalized = (score - low) / span if span > 0 else 1.0
+            fused[doc_id] = fused.get(doc_id, 0.0) + weight * normalized
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
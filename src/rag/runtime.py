@@ -1,12 +1,46 @@
 from __future__ import annotations
 
-from typing import Optional
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
 
-from .embeddings import OllamaEmbeddings
+from .embeddings import BatchingEmbeddings, CachedEmbeddings, Embeddings, OllamaEmbeddings
+from .http_pool import get_session, pool_settings_from
+from .ingest.manifest import IndexVersionWatcher
 from .llm import CloudLLM, OllamaLLM
-from .rag import RagPipeline
+from .rag import AnswerCache, RagPipeline, Reranker, build_reranker
+from .retrieval import BM25Index
 from .settings import Settings, load_settings
-from .vectorstore import ChromaVectorStore
+from .vectorstore import ChromaVectorStore, NumpyVectorStore, VectorStore
+
+T = TypeVar("T")
+
+
+class ComponentRegistry:
+    """
+    Process-wide cache of heavy runtime components (embedder, vector store, lexical
+    index) keyed by the settings that shape them. Pipelines for different chat models
+    share these; only the LLM clients differ per model.
+    """
+
+    def __init__(self) -> None:
+        self._components: Dict[Tuple[Any, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[Any, ...], factory: Callable[[], T]) -> T:
+        with self._lock:
+            if key not in self._components:
+                self._components[key] = factory()
+            return self._components[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._components.clear()
+
+    def __len__(self) -> int:
+        return len(self._components)
+
+
+components = ComponentRegistry()
 
 
 def _resolve_models(settings: Settings) -> tuple[str, str]:
@@ -21,26 +55,124 @@ def _resolve_models(settings: Settings) -> tuple[str, str]:
     return cloud_model, ollama_model
 
 
+def build_embeddings(settings: Settings, batching: bool = True) -> Embeddings:
+    """
+    Ollama embedder with the configured cache. `batching` adds the coalescer for
+    concurrent single queries; ingest sends its own batches and turns it off.
+    """
+    embeddings: Embeddings = OllamaEmbeddings(
+        base_url=settings.ollama.base_url,
+        model=settings.ollama.embed_model,
+        timeout_s=settings.ollama.timeout_s,
+        session=get_session("ollama", pool_settings_from(settings.ollama)),
+    )
+    batch_cfg = settings.embedding_batch
+    if batching and batch_cfg.enabled:
+        embeddings = BatchingEmbeddings(
+            embeddings,
+            max_batch=batch_cfg.max_batch,
+            max_wait_ms=batch_cfg.max_wait_ms,
+            max_concurrency=batch_cfg.max_concurrency,
+        )
+    if settings.embedding_cache.enabled:
+        embeddings = CachedEmbeddings(
+            embeddings,
+            path=settings.embedding_cache.path,
+            model=settings.ollama.embed_model,
+            max_entries=settings.embedding_cache.max_entries,
+        )
+    return embeddings
+
+
+def build_vectorstore(settings: Settings) -> VectorStore:
+    cfg = settings.vectorstore
+    if cfg.backend == "numpy":
+        return NumpyVectorStore(
+            index_dir=settings.paths.index_dir,
+            collection_name=cfg.collection,
+            dtype=cfg.dtype,
+            ann_enabled=cfg.ann.enabled,
+            ann_nprobe=cfg.ann.nprobe,
+        )
+    return ChromaVectorStore(index_dir=settings.paths.index_dir, collection_name=cfg.collection)
+
+
+def build_lexical_index(settings: Settings) -> Optional[BM25Index]:
+    if not settings.rag.hybrid:
+        return None
+    return BM25Index.open(settings.paths.index_dir)
+
+
+def build_answer_cache(settings: Settings) -> Optional[AnswerCache]:
+    cfg = settings.answer_cache
+    if not cfg.enabled:
+        return None
+    return AnswerCache(
+        ttl_s=cfg.ttl_s,
+        max_entries=cfg.max_entries,
+        semantic=cfg.semantic,
+        similarity_threshold=cfg.similarity_threshold,
+        version_fn=IndexVersionWatcher(settings.paths.index_dir),
+    )
+
+
+def shared_embeddings(settings: Settings) -> Embeddings:
+    key = (
+        "embeddings",
+        settings.ollama.base_url,
+        settings.ollama.embed_model,
+        settings.ollama.timeout_s,
+        settings.embedding_cache.model_dump_json(),
+        settings.embedding_batch.model_dump_json(),
+    )
+    return components.get(key, lambda: build_embeddings(settings))
+
+
+def shared_vectorstore(settings: Settings) -> VectorStore:
+    key = ("vectorstore", settings.paths.index_dir, settings.vectorstore.model_dump_json())
+    return components.get(key, lambda: build_vectorstore(settings))
+
+
+def shared_lexical_index(settings: Settings) -> Optional[BM25Index]:
+    key = ("lexical", settings.paths.index_dir, settings.rag.hybrid)
+    return components.get(key, lambda: build_lexical_index(settings))
+
+
+def shared_reranker(settings: Settings) -> Optional[Reranker]:
+    # Cross-encoder weights are loaded once per process.
+    key = ("reranker", settings.rerank.model_dump_json())
+    return components.get(key, lambda: build_reranker(settings.rerank))
+
+
 def build_pipeline(settings: Optional[Settings] = None) -> RagPipeline:
+    """
+    Build a pipeline for `settings`. Retrieval backends come from the shared component
+    registry; the LLM clients (cheap, pooled sessions) and the answer cache, whose
+    entries are model-specific, are per pipeline.
+    """
     runtime_settings = settings or load_settings()
     cloud_model, ollama_model = _resolve_models(runtime_settings)
+    ollama_session = get_session("ollama", pool_settings_from(runtime_settings.ollama))
+    cloud_session = get_session("cloud", pool_settings_from(runtime_settings.cloud))
     return RagPipeline(
-        embeddings=OllamaEmbeddings(
-            base_url=runtime_settings.ollama.base_url,
-            model=runtime_settings.ollama.embed_model,
-            timeout_s=runtime_settings.ollama.timeout_s,
-        ),
-        vectorstore=ChromaVectorStore(index_dir=runtime_settings.paths.index_dir),
+        embeddings=shared_embeddings(runtime_settings),
+        vectorstore=shared_vectorstore(runtime_settings),
         llm_cloud=CloudLLM(
             api_url=runtime_settings.cloud.api_url,
             api_key=runtime_settings.cloud.api_key,
             model=cloud_model,
             timeout_s=runtime_settings.cloud.timeout_s,
+            session=cloud_session,
+            provider=runtime_settings.cloud.provider,
         ),
         llm_ollama=OllamaLLM(
             base_url=runtime_settings.ollama.base_url,
             model=ollama_model,
             timeout_s=runtime_settings.ollama.timeout_s,
+            session=ollama_session,
         ),
         settings=runtime_settings,
+        lexical_index=shared_lexical_index(runtime_settings),
+        reranker=shared_reranker(runtime_settings),
+        answer_cache=build_answer_cache(runtime_settings),
     )
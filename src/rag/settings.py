@@ -19,6 +19,12 @@ class OllamaConfig(BaseModel):
     embed_model: str = "nomic-embed-text"
     llm_model: str = "llama3"
     timeout_s: int = 120
+    pool_connections: int = 4
+    pool_maxsize: int = 16
+    pool_block: bool = False
+    keep_alive: bool = True
+    max_retries: int = 2
+    retry_backoff_s: float = 0.3
 
 
 class CloudConfig(BaseModel):
@@ -27,6 +33,12 @@ class CloudConfig(BaseModel):
     api_key: str = "replace-me"
     model: str = "best-model"
     timeout_s: int = 30
+    pool_connections: int = 2
+    pool_maxsize: int = 16
+    pool_block: bool = False
+    keep_alive: bool = True
+    max_retries: int = 2
+    retry_backoff_s: float = 0.5
 
 
 class RagConfig(BaseModel):
@@ -34,8 +46,161 @@ class RagConfig(BaseModel):
     chunk_size: int = 900
     chunk_overlap: int = 180
     min_score: float = 0.0
+    # Candidates fetched per query start at top_k * candidate_factor and are widened
+    # (doubled, up to top_k * max_candidate_factor) only when filtering or rerank needs more.
+    candidate_factor: int = 2
+    max_candidate_factor: int = 8
     use_cloud_first: bool = True
     fallback_to_ollama: bool = True
+    # Hybrid retrieval: BM25 index built at ingest, fused with dense results.
+    hybrid: bool = True
+    fusion: Literal["rrf", "weighted"] = "rrf"
+    rrf_k: int = 60
+    dense_weight: float = 0.5
+
+
+class RerankConfig(BaseModel):
+    """
+    Reordering of retrieved candidates before the top_k cut:
+    - method: "keyword" (query-term overlap) | "bm25" (BM25 over the candidates) |
+      "cross_encoder" (local sentence-transformers model) | "none"
+    - model / batch_size / device: cross-encoder settings
+    """
+
+    method: Literal["none", "keyword", "bm25", "cross_encoder"] = "keyword"
+    model: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    batch_size: int = 16
+    device: str = "cpu"
+
+
+class ContextConfig(BaseModel):
+    """
+    Packing of reranked chunks into the prompt context:
+    - max_tokens: context budget when the model has no entry in model_budgets
+    - model_budgets: model name -> context budget (tokens), e.g. per Ollama num_ctx
+    - tokenizer: "" or "regex" for the built-in estimate, or a local tokenizer.json
+    - dedupe_threshold: word-shingle containment above which a passage is dropped as a
+      near-duplicate of one already packed (1.0 keeps everything but exact copies)
+    """
+
+    max_tokens: int = 2048
+    model_budgets: Dict[str, int] = Field(default_factory=dict)
+    tokenizer: str = ""
+    dedupe_threshold: float = 0.8
+
+
+class ChunkingConfig(BaseModel):
+    """
+    How loaded documents are split into chunks:
+    - strategy: "structured" (paragraph/heading/sentence boundaries, sized in tokens)
+      | "words" (legacy fixed word windows from rag.chunk_size / rag.chunk_overlap)
+    - tokenizer: "" or "regex" for the built-in estimate, or a path to a local
+      tokenizer.json (requires the `tokenizers` package)
+    - max_tokens / overlap_tokens: chunk budget and overlap for "structured"
+    """
+
+    strategy: Literal["structured", "words"] = "structured"
+    tokenizer: str = ""
+    max_tokens: int = 512
+    overlap_tokens: int = 64
+
+
+class AnnConfig(BaseModel):
+    """
+    IVF approximate search for the numpy backend:
+    - nlist: number of lists (0 = about 4 * sqrt(rows))
+    - nprobe: lists scanned per query (recall/latency knob)
+    - rebuild_growth: retrain after ingest once rows exceed trained_rows * rebuild_growth
+    """
+
+    enabled: bool = False
+    nlist: int = 0
+    nprobe: int = 32
+    rebuild_growth: float = 4.0
+
+
+class VectorStoreConfig(BaseModel):
+    """
+    Vector store backend:
+    - backend: "chroma" (default) | "numpy" (in-process, memory-mapped)
+    - dtype: storage precision for the numpy backend ("float32" | "float16")
+    """
+
+    backend: Literal["chroma", "numpy"] = "chroma"
+    collection: str = "rag"
+    dtype: Literal["float32", "float16"] = "float32"
+    ann: AnnConfig = Field(default_factory=AnnConfig)
+
+
+class EmbeddingCacheConfig(BaseModel):
+    enabled: bool = True
+    path: str = "./data/cache/embeddings.sqlite"
+    max_entries: int = 1_000_000
+
+
+class EmbeddingBatchConfig(BaseModel):
+    """
+    Coalesce concurrent single-query embedding calls into batched Ollama requests:
+    - max_batch: texts per batched call (larger calls bypass the batcher)
+    - max_wait_ms: how long the first request waits for company
+    - max_concurrency: batched calls in flight at once
+    """
+
+    enabled: bool = True
+    max_batch: int = 32
+    max_wait_ms: float = 5.0
+    max_concurrency: int = 4
+
+
+class AnswerCacheConfig(BaseModel):
+    """
+    In-process cache of full answers, invalidated when ingest changes the index:
+    - ttl_s / max_entries: expiry and LRU bound
+    - semantic: also match query embeddings with cosine >= similarity_threshold
+    """
+
+    enabled: bool = True
+    ttl_s: float = 3600.0
+    max_entries: int = 1024
+    semantic: bool = False
+    similarity_threshold: float = 0.95
+
+
+class LoaderConfig(BaseModel):
+    """
+    Per-format loader options:
+    - markdown_mode: "raw" source (keeps headings for structured chunking) | "rendered"
+      plain text | "combined" (both)
+    - json_mode / yaml_mode: "flattened" field paths | "raw" source | "combined" (both)
+    - jsonl_records_per_document: JSONL/NDJSON records grouped into one document
+    """
+
+    markdown_mode: Literal["raw", "rendered", "combined"] = "raw"
+    json_mode: Literal["raw", "flattened", "combined"] = "flattened"
+    yaml_mode: Literal["raw", "flattened", "combined"] = "flattened"
+    jsonl_records_per_document: int = 1
+
+
+class IngestConfig(BaseModel):
+    """
+    Ingest pipeline sizing:
+    - load_workers: processes loading/parsing/chunking files (0 = in-process)
+    - embed_workers: concurrent embedding requests
+    - embed_batch_size: chunks per embedding request
+    - write_batch_size: chunks per vector store upsert
+    - queue_size: max batches buffered between stages (backpressure)
+    - pdf_pages_per_task: PDFs with more pages are extracted as page ranges of this
+      size in parallel loader tasks (0 = one task per file)
+    - jsonl_lines_per_task: same for JSONL/NDJSON files, in lines
+    """
+
+    load_workers: int = 2
+    embed_workers: int = 2
+    embed_batch_size: int = 8
+    write_batch_size: int = 1024
+    queue_size: int = 16
+    pdf_pages_per_task: int = 32
+    jsonl_lines_per_task: int = 10_000
 
 
 class ModelConfig(BaseModel):
@@ -43,10 +208,15 @@ class ModelConfig(BaseModel):
     Runtime model selection:
     - provider: "cloud" | "ollama" | "auto" (keeps legacy behavior from rag.use_cloud_first)
     - name: optional override for the selected provider model
+    - discovery_ttl_s: age after which the cached Ollama model list is refreshed in the
+      background (served stale meanwhile)
+    - discovery_refresh_s: period of the API's background model list refresh
     """
 
     provider: Literal["auto", "cloud", "ollama"] = "auto"
     name: str = ""
+    discovery_ttl_s: float = 60.0
+    discovery_refresh_s: float = 30.0
 
 
 def _coerce_env_bool(value: Any) -> Any:
@@ -106,19 +276,45 @@ def legacy_env_settings_source() -> Dict[str, Any]:
     set_nested("ollama.embed_model", env.get("OLLAMA_EMBED_MODEL"))
     set_nested("ollama.llm_model", env.get("OLLAMA_LLM_MODEL"))
     set_nested("ollama.timeout_s", env.get("OLLAMA_TIMEOUT_S"))
+    set_nested("ollama.pool_maxsize", _coerce_env_number(env.get("OLLAMA_POOL_MAXSIZE")))
+    set_nested("ollama.max_retries", _coerce_env_number(env.get("OLLAMA_MAX_RETRIES")))
 
     set_nested("cloud.provider", env.get("CLOUD_PROVIDER"))
     set_nested("cloud.api_url", env.get("CLOUD_API_URL"))
     set_nested("cloud.api_key", env.get("CLOUD_API_KEY"))
     set_nested("cloud.model", env.get("CLOUD_MODEL"))
     set_nested("cloud.timeout_s", env.get("CLOUD_TIMEOUT_S"))
+    set_nested("cloud.pool_maxsize", _coerce_env_number(env.get("CLOUD_POOL_MAXSIZE")))
+    set_nested("cloud.max_retries", _coerce_env_number(env.get("CLOUD_MAX_RETRIES")))
 
     set_nested("rag.top_k", _coerce_env_number(env.get("TOP_K")))
     set_nested("rag.chunk_size", _coerce_env_number(env.get("CHUNK_SIZE")))
     set_nested("rag.chunk_overlap", _coerce_env_number(env.get("CHUNK_OVERLAP")))
     set_nested("rag.min_score", _coerce_env_number(env.get("MIN_SCORE"), allow_float=True))
+    set_nested("rag.candidate_factor", _coerce_env_number(env.get("CANDIDATE_FACTOR")))
+    set_nested("rag.max_candidate_factor", _coerce_env_number(env.get("MAX_CANDIDATE_FACTOR")))
     set_nested("rag.use_cloud_first", _coerce_env_bool(env.get("USE_CLOUD_FIRST")))
     set_nested("rag.fallback_to_ollama", _coerce_env_bool(env.get("FALLBACK_TO_OLLAMA")))
+    set_nested("rag.hybrid", _coerce_env_bool(env.get("HYBRID_SEARCH")))
+
+    set_nested("rerank.method", env.get("RERANK_METHOD"))
+    set_nested("context.max_tokens", _coerce_env_number(env.get("CONTEXT_MAX_TOKENS")))
+
+    set_nested("chunking.strategy", env.get("CHUNKING_STRATEGY"))
+    set_nested("chunking.tokenizer", env.get("CHUNKING_TOKENIZER"))
+    set_nested("chunking.max_tokens", _coerce_env_number(env.get("CHUNK_MAX_TOKENS")))
+
+    set_nested("vectorstore.backend", env.get("VECTORSTORE_BACKEND"))
+
+    set_nested("embedding_cache.enabled", _coerce_env_bool(env.get("EMBED_CACHE_ENABLED")))
+    set_nested("embedding_cache.path", env.get("EMBED_CACHE_PATH"))
+    set_nested("embedding_batch.enabled", _coerce_env_bool(env.get("EMBED_BATCHING_ENABLED")))
+    set_nested("answer_cache.enabled", _coerce_env_bool(env.get("ANSWER_CACHE_ENABLED")))
+    set_nested("answer_cache.semantic", _coerce_env_bool(env.get("ANSWER_CACHE_SEMANTIC")))
+
+    set_nested("ingest.load_workers", _coerce_env_number(env.get("INGEST_LOAD_WORKERS")))
+    set_nested("ingest.embed_workers", _coerce_env_number(env.get("INGEST_EMBED_WORKERS")))
+    set_nested("ingest.embed_batch_size", _coerce_env_number(env.get("BATCH_SIZE")))
 
     set_nested("model.provider", env.get("MODEL_PROVIDER"))
     set_nested("model.name", env.get("MODEL_NAME"))
@@ -136,6 +332,15 @@ class Settings(BaseSettings):
     ollama: OllamaConfig = Field(default_factory=OllamaConfig)
     cloud: CloudConfig = Field(default_factory=CloudConfig)
     rag: RagConfig = Field(default_factory=RagConfig)
+    chunking: ChunkingConfig = Field(default_factory=ChunkingConfig)
+    rerank: RerankConfig = Field(default_factory=RerankConfig)
+    context: ContextConfig = Field(default_factory=ContextConfig)
+    vectorstore: VectorStoreConfig = Field(default_factory=VectorStoreConfig)
+    ingest: IngestConfig = Field(default_factory=IngestConfig)
+    loaders: LoaderConfig = Field(default_factory=LoaderConfig)
+    embedding_cache: EmbeddingCacheConfig = Field(default_factory=EmbeddingCacheConfig)
+    embedding_batch: EmbeddingBatchConfig = Field(default_factory=EmbeddingBatchConfig)
+    answer_cache: AnswerCacheConfig = Field(default_factory=AnswerCacheConfig)
     model: ModelConfig = Field(default_factory=ModelConfig)
 
     model_config = SettingsConfigDict(
@@ -1,4 +1,20 @@
-from .chunking import chunk_text, chunk_many
+from .chunking import TextChunk, chunk_many, chunk_structured, chunk_text
 from .normalization import normalize_text
+from .terms import TERMS_METADATA_KEY, chunk_terms, term_frequencies, tokenize_terms
+from .tokenizers import HuggingFaceTokenizer, RegexTokenizer, Tokenizer, load_tokenizer
 
-__all__ = ["chunk_text", "chunk_many", "normalize_text"]
+__all__ = [
+    "chunk_text",
+    "chunk_many",
+    "chunk_structured",
+    "TextChunk",
+    "normalize_text",
+    "TERMS_METADATA_KEY",
+    "chunk_terms",
+    "term_frequencies",
+    "tokenize_terms",
+    "Tokenizer",
+    "RegexTokenizer",
+    "HuggingFaceTokenizer",
+    "load_tokenizer",
+]
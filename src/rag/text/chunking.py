@@ -1,6 +1,10 @@
 from __future__ import annotations
 
-from typing import Iterable, List
+import re
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from .tokenizers import RegexTokenizer, Tokenizer
 
 
 def chunk_text(text: str, chunk_size: int, overlap: int) -> List[str]:
@@ -30,3 +34,202 @@ def chunk_many(texts: Iterable[str], chunk_size: int, overlap: int) -> List[str]
     for text in texts:
         all_chunks.extend(chunk_text(text, chunk_size, overlap))
     return all_chunks
+
+
+@dataclass
+class TextChunk:
+    """A chunk as a [start, end) character span of the source text."""
+
+    text: str
+    start: int
+    end: int
+    tokens: int
+    section: str = ""
+
+
+@dataclass
+class _Unit:
+    start: int
+    end: int
+    tokens: int
+    heading: bool = False
+    section: str = ""
+
+
+_HEADING_RE = re.compile(r"#{1,6}[ \t]+(\S.*?)[ \t#]*$")
+_FENCE_RE = re.compile(r"(`{3,}|~{3,})(.*)$")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def _blocks(text: str) -> Iterator[Tuple[int, int, str]]:
+    """
+    Yield (start, end, heading) spans: paragraphs separated by blank lines, with
+    Markdown heading lines as their own blocks (heading is "" for paragraphs).
+    `#` lines inside fenced code blocks are code, not headings.
+    """
+    block_start = None
+    block_end = 0
+    offset = 0
+    fence = ""
+    for line in text.splitlines(keepends=True):
+        line_start, offset = offset, offset + len(line)
+        stripped = line.strip()
+        marker = _FENCE_RE.match(stripped)
+        if marker and not fence:
+            fence = marker.group(1)
+        elif marker and fence and marker.group(1).startswith(fence) and not marker.group(2):
+            fence = ""
+        heading = None
+        if not fence and stripped.startswith("#"):
+            heading = _HEADING_RE.match(stripped)
+        if not stripped or heading:
+            if block_start is not None:
+                yield block_start, block_end, ""
+                block_start = None
+            if heading:
+                lead = len(line) - len(line.lstrip())
+                yield line_start + lead, line_start + lead + len(stripped), heading.group(1)
+            continue
+        if block_start is None:
+            block_start = line_start + len(line) - len(line.lstrip())
+        block_end = line_start + len(line.rstrip())
+    if block_start is not None:
+        yield block_start, block_end, ""
+
+
+def _sentences(text: str, start: int, end: int) -> Iterator[Tuple[int, int]]:
+    position = start
+    for match in _SENTENCE_END_RE.finditer(text, start, end):
+        yield position, match.start()
+        position = match.end()
+    if position < end:
+        yield position, end
+
+
+def _windows(
+    text: str, start: int, end: int, tokenizer: Tokenizer, max_tokens: int
+) -> Iterator[Tuple[int, int, int]]:
+    """Cut text[start:end] into (start, end, tokens) spans of at most `max_tokens` tokens."""
+    spans = tokenizer.token_spans(text[start:end])
+    for i in range(0, len(spans), max_tokens):
+        window = spans[i : i + max_tokens]
+        yield start + window[0][0], start + window[-1][1], len(window)
+
+
+def _units(text: str, tokenizer: Tokenizer, max_tokens: int) -> Iterator[_Unit]:
+    section = ""
+    for start, end, heading in _blocks(text):
+        if heading:
+            section = heading
+            tokens = tokenizer.count(text[start:end])
+            if tokens <= max_tokens:
+                yield _Unit(start, end, tokens, True, section)
+                continue
+            for w_start, w_end, w_tokens in _windows(text, start, end, tokenizer, max_tokens):
+                yield _Unit(w_start, w_end, w_tokens, True, section)
+            continue
+        tokens = tokenizer.count(text[start:end])
+        if tokens <= max_tokens:
+            yield _Unit(start, end, tokens, section=section)
+            continue
+        for s_start, s_end in _sentences(text, start, end):
+            s_tokens = tokenizer.count(text[s_start:s_end])
+            if s_tokens <= max_tokens:
+                yield _Unit(s_start, s_end, s_tokens, section=section)
+                continue
+            # A single sentence over budget: cut it on token boundaries.
+            for w_start, w_end, w_tokens in _windows(text, s_start, s_end, tokenizer, max_tokens):
+                yield _Unit(w_start, w_end, w_tokens, section=section)
+
+
+def _split_unit(
+    text: str, unit: _Unit, tokens: int, tokenizer: Tokenizer
+) -> Tuple[_Unit, Optional[_Unit]]:
+    """
+    Cut `unit` after at most `tokens` tokens, at a word boundary when there is one
+    (the rest is None if nothing is left).
+    """
+    spans = tokenizer.token_spans(text[unit.start : unit.end])
+    if len(spans) <= tokens:
+        return unit, None
+    for cut in range(tokens, 0, -1):
+        if spans[cut][0] > spans[cut - 1][1]:
+            tokens = cut
+            break
+    head = _Unit(unit.start, unit.start + spans[tokens - 1][1], tokens, section=unit.section)
+    tail = _Unit(
+        unit.start + spans[tokens][0], unit.end, len(spans) - tokens, section=unit.section
+    )
+    return head, tail
+
+
+def chunk_structured(
+    text: str,
+    max_tokens: int,
+    overlap_tokens: int = 0,
+    tokenizer: Optional[Tokenizer] = None,
+) -> List[TextChunk]:
+    """
+    Split on paragraph, heading and sentence boundaries into chunks of at most
+    `max_tokens` tokens, measured with `tokenizer`. Headings start a new chunk;
+    consecutive chunks in a section share trailing units of up to `overlap_tokens`.
+    Chunks are slices of `text`, so offsets point back into the source, and each
+    unit is tokenized once (linear in the text length).
+    """
+    if max_tokens <= 0:
+        raise ValueError("max_tokens must be > 0")
+    if overlap_tokens >= max_tokens:
+        raise ValueError("overlap_tokens must be < max_tokens")
+    tokenizer = tokenizer or RegexTokenizer()
+
+    chunks: List[TextChunk] = []
+    current: List[_Unit] = []
+    current_tokens = 0
+    has_body = False
+
+    def flush() -> None:
+        start, end = current[0].start, current[-1].end
+        chunks.append(
+            TextChunk(
+                text=text[start:end],
+                start=start,
+                end=end,
+                tokens=current_tokens,
+                section=current[0].section,
+            )
+        )
+
+    for unit in _units(text, tokenizer, max_tokens):
+        if unit.heading and has_body:
+            flush()
+            current, current_tokens, has_body = [], 0, False
+        elif current and current_tokens + unit.tokens > max_tokens:
+            room = max_tokens - current_tokens
+            if not has_body and not unit.heading and room > 0:
+                # Only headings so far: fill their chunk with the start of this unit
+                # instead of dropping them.
+                head, rest = _split_unit(text, unit, room, tokenizer)
+                current.append(head)
+                current_tokens += head.tokens
+                if rest is None:
+                    continue
+                unit = rest
+            flush()
+            carried: List[_Unit] = []
+            carried_tokens = 0
+            for previous in reversed(current):
+                if previous.heading or carried_tokens + previous.tokens > overlap_tokens:
+                    break
+                carried.append(previous)
+                carried_tokens += previous.tokens
+            while carried and carried_tokens + unit.tokens > max_tokens:
+                carried_tokens -= carried.pop().tokens
+            current = carried[::-1]
+            current_tokens = carried_tokens
+            has_body = False
+        current.append(unit)
+        current_tokens += unit.tokens
+        has_body = has_body or not unit.heading
+    if current and has_body:
+        flush()
+    return chunks
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import re
+from collections import Counter
+from typing import Dict, List
+
+_TERM_RE = re.compile(r"[^\W_]+", re.UNICODE)
+MIN_TERM_LENGTH = 2
+# Chunk metadata key holding the chunk's distinct terms (space-separated), computed at ingest.
+TERMS_METADATA_KEY = "lexical_terms"
+
+
+def tokenize_terms(text: str) -> List[str]:
+    """Lower-cased word terms for lexical matching (Unicode-aware for FR/EN)."""
+    return [t for t in _TERM_RE.findall(text.lower()) if len(t) >= MIN_TERM_LENGTH]
+
+
+def term_frequencies(text: str) -> Dict[str, int]:
+    return dict(Counter(tokenize_terms(text)))
+
+
+def chunk_terms(text: str, source: str = "") -> str:
+    """Distinct terms of a chunk and its source path, stored under TERMS_METADATA_KEY."""
+    return " ".join(sorted(set(tokenize_terms(f"{source}\n{text}"))))
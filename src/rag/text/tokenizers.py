@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import re
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Tuple
+
+try:
+    from tokenizers import Tokenizer as _HFTokenizer
+except ImportError:  # pragma: no cover - optional dependency
+    _HFTokenizer = None
+
+Span = Tuple[int, int]
+
+
+class Tokenizer(ABC):
+    """Maps text to token character spans; chunk sizes are counted in these tokens."""
+
+    @abstractmethod
+    def token_spans(self, text: str) -> List[Span]:
+        raise NotImplementedError
+
+    def count(self, text: str) -> int:
+        return len(self.token_spans(text))
+
+
+class RegexTokenizer(Tokenizer):
+    """
+    Dependency-free estimate of subword tokenization: words are split into pieces
+    of at most `chars_per_token` characters and each punctuation mark is a token.
+    It slightly over-counts typical BPE/WordPiece output, which keeps chunks under
+    the embedding model's context window.
+    """
+
+    def __init__(self, chars_per_token: int = 4) -> None:
+        if chars_per_token <= 0:
+            raise ValueError("chars_per_token must be > 0")
+        self.chars_per_token = chars_per_token
+        self._pattern = re.compile(rf"[^\W_]{{1,{chars_per_token}}}|[^\w\s]|_")
+
+    def token_spans(self, text: str) -> List[Span]:
+        return [m.span() for m in self._pattern.finditer(text)]
+
+    def count(self, text: str) -> int:
+        return sum(1 for _ in self._pattern.finditer(text))
+
+
+class HuggingFaceTokenizer(Tokenizer):
+    """Exact counts from a local `tokenizer.json` (requires the `tokenizers` package)."""
+
+    def __init__(self, path: str) -> None:
+        if _HFTokenizer is None:
+            raise ImportError("tokenizers is required for HuggingFaceTokenizer")
+        self.path = path
+        self._tokenizer = _HFTokenizer.from_file(path)
+        self._tokenizer.no_truncation()
+
+    def token_spans(self, text: str) -> List[Span]:
+        encoding = self._tokenizer.encode(text, add_special_tokens=False)
+        return [span for span in encoding.offsets if span[1] > span[0]]
+
+    def count(self, text: str) -> int:
+        return len(self._tokenizer.encode(text, add_special_tokens=False).ids)
+
+
+@lru_cache(maxsize=8)
+def load_tokenizer(spec: str = "") -> Tokenizer:
+    """
+    "" or "regex" -> RegexTokenizer; a path to a tokenizer.json -> HuggingFaceTokenizer.
+    Cached per process so loader workers build it once.
+    """
+    if not spec or spec == "regex":
+        return RegexTokenizer()
+    if not Path(spec).is_file():
+        raise FileNotFoundError(f"Tokenizer file not found: {spec}")
+    return HuggingFaceTokenizer(spec)
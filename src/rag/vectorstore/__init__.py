@@ -1,4 +1,5 @@
-from .base import VectorStore
+from .base import VectorStore, Where
 from .chroma import ChromaVectorStore
+from .numpy_store import NumpyVectorStore
 
-__all__ = ["VectorStore", "ChromaVectorStore"]
+__all__ = ["VectorStore", "Where", "ChromaVectorStore", "NumpyVectorStore"]
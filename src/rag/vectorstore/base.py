@@ -1,16 +1,113 @@
 from __future__ import annotations
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Iterable, List
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 from ..models import Document, RetrievalResult
+from ..retrieval.filters import RetrievalFilter
+
+
+# Metadata equality filter: every key must match its value.
+Where = Dict[str, Any]
 
 
 class VectorStore(ABC):
+    # True when `query_ids` skips loading text/metadata, so callers should fetch
+    # candidate ids first and hydrate the survivors with `get`.
+    lazy_hydration = False
+
     @abstractmethod
     def add(self, documents: Iterable[Document], embeddings: List[List[float]]) -> None:
+        """Insert chunks, replacing any stored under the same ids."""
         raise NotImplementedError
 
+    def upsert(self, documents: Iterable[Document], embeddings: List[List[float]]) -> None:
+        """Bulk insert-or-replace by id. Backends split it into their own batch limits."""
+        self.add(documents, embeddings)
+
     @abstractmethod
-    def query(self, query_embedding: List[float], top_k: int) -> List[RetrievalResult]:
+    def query(
+        self,
+        query_embedding: List[float],
+        top_k: int,
+        filters: Optional[RetrievalFilter] = None,
+    ) -> List[RetrievalResult]:
+        """Top-k chunks by similarity, restricted to those matching `filters`."""
         raise NotImplementedError
+
+    def query_ids(
+        self,
+        query_embedding: List[float],
+        top_k: int,
+        filters: Optional[RetrievalFilter] = None,
+    ) -> List[Tuple[str, float]]:
+        """(id, score) pairs of the top-k chunks, best first."""
+        if filters is None:
+            return [(r.doc_id, r.score) for r in self.query(query_embedding, top_k)]
+        return [(r.doc_id, r.score) for r in self.query(query_embedding, top_k, filters)]
+
+    def get(self, ids: List[str]) -> List[Document]:
+        """Fetch stored chunks by id (missing ids are skipped)."""
+        raise NotImplementedError(f"{type(self).__name__} does not support lookups by id")
+
+    def get_metadata(self, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Metadata of stored chunks by id, without their text."""
+        return {doc.doc_id: doc.metadata for doc in self.get(ids)}
+
+    def hydrate(self, results: List[RetrievalResult], text: bool = True) -> List[RetrievalResult]:
+        """
+        Fill in what `results` lack (metadata, and text unless `text=False`) with one bulk
+        read. Returns the results that are still stored, in order.
+        """
+        pending = [r for r in results if r.metadata is None or (text and r.text is None)]
+        if pending:
+            ids = [r.doc_id for r in pending]
+            if text:
+                docs = {doc.doc_id: doc for doc in self.get(ids)}
+                for result in pending:
+                    doc = docs.get(result.doc_id)
+                    if doc is not None:
+                        result.text, result.metadata = doc.text, doc.metadata
+            else:
+                metadata = self.get_metadata(ids)
+                for result in pending:
+                    result.metadata = metadata.get(result.doc_id)
+        return [
+            r for r in results if r.metadata is not None and (r.text is not None or not text)
+        ]
+
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Where] = None) -> None:
+        """Delete chunks by id, by metadata filter, or both (chunks matching both)."""
+        raise NotImplementedError(f"{type(self).__name__} does not support deletes")
+
+    def exists(self, ids: List[str]) -> Set[str]:
+        """The subset of `ids` currently stored."""
+        return {doc.doc_id for doc in self.get(ids)}
+
+    def count(self) -> int:
+        raise NotImplementedError(f"{type(self).__name__} does not support count")
+
+    async def aquery(
+        self,
+        query_embedding: List[float],
+        top_k: int,
+        filters: Optional[RetrievalFilter] = None,
+    ) -> List[RetrievalResult]:
+        """
+        Async interface. Default: run `query` in a worker thread so local stores
+        (Chroma, in-process indexes) never block the event loop.
+        """
+        if filters is None:
+            return await asyncio.to_thread(self.query, query_embedding, top_k)
+        return await asyncio.to_thread(self.query, query_embedding, top_k, filters)
+
+    async def aquery_ids(
+        self,
+        query_embedding: List[float],
+        top_k: int,
+        filters: Optional[RetrievalFilter] = None,
+    ) -> List[Tuple[str, float]]:
+        if filters is None:
+            return await asyncio.to_thread(self.query_ids, query_embedding, top_k)
+        return await asyncio.to_thread(self.query_ids, query_embedding, top_k, filters)
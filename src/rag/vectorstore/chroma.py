@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Iterable, List
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 try:
     import chromadb
@@ -8,49 +8,156 @@ except ImportError:  # pragma: no cover - optional dependency
     chromadb = None
 
 from ..models import Document, RetrievalResult
-from .base import VectorStore
+from ..retrieval.filters import RetrievalFilter
+from .base import VectorStore, Where
+
+# Used when the client does not report its limit (older chromadb releases).
+_DEFAULT_MAX_BATCH = 5000
+# Candidate growth factor while a source prefix is checked after the query.
+_PREFIX_OVERSAMPLING = 4
+
+
+def _chroma_where(where: Where) -> Dict[str, Any]:
+    """Chroma accepts a single condition per dict; several keys become an `$and`."""
+    if len(where) <= 1:
+        return dict(where)
+    return {"$and": [{key: value} for key, value in where.items()]}
 
 
 class ChromaVectorStore(VectorStore):
+    lazy_hydration = True
+
     def __init__(self, index_dir: str, collection_name: str = "rag"):
         if chromadb is None:
             raise ImportError("chromadb is required for ChromaVectorStore")
         self.client = chromadb.PersistentClient(path=index_dir)
         self.collection = self.client.get_or_create_collection(name=collection_name)
+        self.max_batch_size = self._max_batch_size()
+
+    def _max_batch_size(self) -> int:
+        getter = getattr(self.client, "get_max_batch_size", None)
+        if callable(getter):
+            return int(getter())
+        return int(getattr(self.client, "max_batch_size", _DEFAULT_MAX_BATCH))
 
     def add(self, documents: Iterable[Document], embeddings: List[List[float]]) -> None:
         docs = list(documents)
         if not docs:
             return
-        ids = [d.doc_id for d in docs]
-        metadatas = [d.metadata for d in docs]
-        texts = [d.text for d in docs]
-        self.collection.upsert(
-            ids=ids,
-            embeddings=embeddings,
-            documents=texts,
-            metadatas=metadatas,
-        )
+        step = max(1, self.max_batch_size)
+        for start in range(0, len(docs), step):
+            batch = docs[start : start + step]
+            self.collection.upsert(
+                ids=[d.doc_id for d in batch],
+                embeddings=embeddings[start : start + step],
+                documents=[d.text for d in batch],
+                metadatas=[d.metadata for d in batch],
+            )
 
-    def query(self, query_embedding: List[float], top_k: int) -> List[RetrievalResult]:
-        res = self.collection.query(
-            query_embeddings=[query_embedding],
-            n_results=top_k,
-            include=["documents", "metadatas", "distances"],
-        )
-        results: List[RetrievalResult] = []
-        docs = res.get("documents", [[]])[0]
-        metas = res.get("metadatas", [[]])[0]
-        dists = res.get("distances", [[]])[0]
-        ids = res.get("ids", [[]])[0]
-        for doc_id, text, meta, dist in zip(ids, docs, metas, dists):
-            score = 1.0 - float(dist) if dist is not None else 0.0
-            results.append(
-                RetrievalResult(
-                    doc_id=doc_id,
-                    text=text,
-                    score=score,
-                    metadata=meta or {},
-                )
+    def get(self, ids: List[str]) -> List[Document]:
+        if not ids:
+            return []
+        res = self.collection.get(ids=list(ids), include=["documents", "metadatas"])
+        by_id = {
+            doc_id: Document(doc_id=doc_id, text=text or "", metadata=meta or {})
+            for doc_id, text, meta in zip(
+                res.get("ids", []), res.get("documents", []), res.get("metadatas", [])
             )
-        return results
+        }
+        return [by_id[doc_id] for doc_id in ids if doc_id in by_id]
+
+    def get_metadata(self, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        if not ids:
+            return {}
+        res = self.collection.get(ids=list(ids), include=["metadatas"])
+        return {
+            doc_id: meta or {}
+            for doc_id, meta in zip(res.get("ids", []), res.get("metadatas", []))
+        }
+
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Where] = None) -> None:
+        if where:
+            self.collection.delete(ids=list(ids) if ids else None, where=_chroma_where(where))
+            return
+        if not ids:
+            return
+        ids = list(ids)
+        step = max(1, self.max_batch_size)
+        for start in range(0, len(ids), step):
+            self.collection.delete(ids=ids[start : start + step])
+
+    def exists(self, ids: List[str]) -> Set[str]:
+        if not ids:
+            return set()
+        return set(self.collection.get(ids=list(ids), include=[]).get("ids", []))
+
+    def count(self) -> int:
+        return int(self.collection.count())
+
+    def _search(
+        self,
+        query_embedding: List[float],
+        top_k: int,
+        filters: Optional[RetrievalFilter],
+        include: List[str],
+    ) -> List[Tuple[str, float, Optional[str], Dict[str, Any]]]:
+        """
+        (id, score, text, metadata) of the `top_k` nearest chunks matching `filters`.
+        Chroma cannot express `source_prefix`, so it is checked on the results and the
+        query is widened until `top_k` matches are found or the collection is exhausted.
+        """
+        where = filters.to_chroma_where() if filters is not None else None
+        post_filter = filters is not None and bool(filters.source_prefix)
+        if post_filter and "metadatas" not in include:
+            include = include + ["metadatas"]
+        n_results = top_k * _PREFIX_OVERSAMPLING if post_filter else top_k
+        total = self.count() if post_filter else n_results
+        while True:
+            n_results = min(n_results, total)
+            if n_results <= 0:
+                return []
+            res = self.collection.query(
+                query_embeddings=[query_embedding],
+                n_results=n_results,
+                where=where,
+                include=include,
+            )
+            ids = res.get("ids", [[]])[0]
+            dists = (res.get("distances") or [[]])[0]
+            docs = (res.get("documents") or [[]])[0] or [None] * len(ids)
+            metas = (res.get("metadatas") or [[]])[0] or [None] * len(ids)
+            hits = []
+            for doc_id, dist, text, meta in zip(ids, dists, docs, metas):
+                if post_filter and not filters.matches(meta or {}):
+                    continue
+                score = 1.0 - float(dist) if dist is not None else 0.0
+                hits.append((doc_id, score, text, meta or {}))
+            if not post_filter or len(hits) >= top_k or len(ids) < n_results:
+                return hits[:top_k]
+            if n_results >= total:
+                return hits
+            n_results *= _PREFIX_OVERSAMPLING
+
+    def query(
+        self,
+        query_embedding: List[float],
+        top_k: int,
+        filters: Optional[RetrievalFilter] = None,
+    ) -> List[RetrievalResult]:
+        hits = self._search(
+            query_embedding, top_k, filters, ["documents", "metadatas", "distances"]
+        )
+        return [
+            RetrievalResult(doc_id=doc_id, text=text or "", score=score, metadata=meta)
+            for doc_id, score, text, meta in hits
+        ]
+
+    def query_ids(
+        self,
+        query_embedding: List[float],
+        top_k: int,
+        filters: Optional[RetrievalFilter] = None,
+    ) -> List[Tuple[str, float]]:
+        # Distances only: documents are fetched later for the candidates that survive.
+        hits = self._search(query_embedding, top_k, filters, ["distances"])
+        return [(doc_id, score) for doc_id, score, _, _ in hits]
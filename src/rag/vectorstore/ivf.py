@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+CENTROIDS_FILENAME = "ivf_centroids.npy"
+ASSIGNMENTS_FILENAME = "ivf_assignments.npy"
+INFO_FILENAME = "ivf.json"
+_ASSIGN_BLOCK_ROWS = 1 << 16
+_MAX_TRAIN_ROWS = 100_000
+
+
+def default_nlist(count: int) -> int:
+    """Rule of thumb: about 4 * sqrt(n) lists, at least 1."""
+    return max(1, int(4 * (count**0.5)))
+
+
+class IvfIndex:
+    """
+    Inverted-file ANN index in pure NumPy, stored next to a NumpyVectorStore matrix.
+
+    Spherical k-means centroids partition the (normalized) vectors into `nlist`
+    lists; a query scores only the rows in its `nprobe` closest lists. Row
+    assignments live in a memory-mapped int32 array, so new rows from ingest are
+    inserted incrementally without retraining.
+    """
+
+    def __init__(self, root: Path, centroids: "np.ndarray", trained_rows: int):
+        self.root = root
+        self.centroids = centroids.astype(np.float32)
+        self.trained_rows = trained_rows
+        self._order: Optional["np.ndarray"] = None
+        self._offsets: Optional["np.ndarray"] = None
+
+    @property
+    def nlist(self) -> int:
+        return int(self.centroids.shape[0])
+
+    # -- persistence --------------------------------------------------------
+
+    @classmethod
+    def load(cls, root: Path) -> Optional["IvfIndex"]:
+        info_path = root / INFO_FILENAME
+        if not info_path.exists() or not (root / CENTROIDS_FILENAME).exists():
+            return None
+        info = json.loads(info_path.read_text(encoding="utf-8"))
+        centroids = np.load(root / CENTROIDS_FILENAME)
+        return cls(root, centroids, int(info.get("trained_rows", 0)))
+
+    def _save_info(self) -> None:
+        info = {"nlist": self.nlist, "trained_rows": self.trained_rows, "built_at": time.time()}
+        tmp_path = self.root / f"{INFO_FILENAME}.tmp"
+        tmp_path.write_text(json.dumps(info), encoding="utf-8")
+        os.replace(tmp_path, self.root / INFO_FILENAME)
+
+    @staticmethod
+    def remove(root: Path) -> None:
+        for name in (INFO_FILENAME, CENTROIDS_FILENAME, ASSIGNMENTS_FILENAME):
+            path = root / name
+            if path.exists():
+                path.unlink()
+
+    # -- training / inserts -------------------------------------------------
+
+    @classmethod
+    def train(
+        cls,
+        root: Path,
+        matrix: "np.ndarray",
+        count: int,
+        nlist: int = 0,
+        iterations: int = 10,
+        seed: int = 0,
+    ) -> "IvfIndex":
+        if count <= 0:
+            raise ValueError("Cannot train an IVF index on an empty store")
+        nlist = min(nlist or default_nlist(count), count)
+        rng = np.random.default_rng(seed)
+        sample_size = min(count, max(nlist * 64, 10_000), _MAX_TRAIN_ROWS)
+        sample_rows = np.sort(rng.choice(count, size=sample_size, replace=False))
+        sample = np.asarray(matrix[sample_rows], dtype=np.float32)
+
+        centroids = sample[rng.choice(sample_size, size=nlist, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            sizes = np.bincount(labels, minlength=nlist)
+            empty = sizes == 0
+            if empty.any():
+                sums[empty] = sample[rng.choice(sample_size, size=int(empty.sum()))]
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            centroids = sums / norms
+
+        index = cls(root, centroids, trained_rows=count)
+        tmp_path = root / f"{CENTROIDS_FILENAME}.tmp.npy"
+        np.save(tmp_path, index.centroids)
+        os.replace(tmp_path, root / CENTROIDS_FILENAME)
+        assignments = index._writable_assignments(count, reset=True)
+        for start in range(0, count, _ASSIGN_BLOCK_ROWS):
+            end = min(count, start + _ASSIGN_BLOCK_ROWS)
+            assignments[start:end] = index.assign(matrix[start:end])
+        assignments.flush()
+        del assignments
+        index._save_info()
+        return index
+
+    def assign(self, vectors: "np.ndarray") -> "np.ndarray":
+        block = np.asarray(vectors, dtype=np.float32)
+        return np.argmax(block @ self.centroids.T, axis=1).astype(np.int32)
+
+    def _writable_assignments(self, needed_rows: int, reset: bool = False) -> "np.ndarray":
+        path = self.root / ASSIGNMENTS_FILENAME
+        current = None
+        if path.exists() and not reset:
+            current = np.load(path, mmap_mode="r+")
+            if current.shape[0] >= needed_rows:
+                return current
+        previous = current.shape[0] if current is not None else 0
+        capacity = max(1024, needed_rows, 2 * previous)
+        tmp_path = self.root / f"{ASSIGNMENTS_FILENAME}.tmp.npy"
+        grown = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.int32, shape=(capacity,))
+        grown[:] = -1
+        if current is not None:
+            grown[:previous] = current[:previous]
+        grown.flush()
+        del current, grown
+        os.replace(tmp_path, path)
+        return np.load(path, mmap_mode="r+")
+
+    def insert(self, rows: Sequence[int], vectors: "np.ndarray") -> None:
+        if len(rows) == 0:
+            return
+        assignments = self._writable_assignments(int(max(rows)) + 1)
+        assignments[list(rows)] = self.assign(vectors)
+        assignments.flush()
+        del assignments
+        self._order = None
+
+    # -- search -------------------------------------------------------------
+
+    def prepare(self, count: int) -> None:
+        """Group rows by list for reading. Called after (re)loading the store."""
+        path = self.root / ASSIGNMENTS_FILENAME
+        if not path.exists() or count == 0:
+            self._order = np.empty(0, dtype=np.int64)
+            self._offsets = np.zeros(self.nlist + 1, dtype=np.int64)
+            return
+        assignments = np.load(path, mmap_mode="r")[:count]
+        order = np.argsort(assignments, kind="stable")
+        sorted_lists = assignments[order]
+        # Rows never assigned (-1) sort first; skip them.
+        first = int(np.searchsorted(sorted_lists, 0))
+        self._order = order[first:]
+        self._offsets = np.searchsorted(sorted_lists[first:], np.arange(self.nlist + 1))
+
+    def candidates(self, query: "np.ndarray", nprobe: int) -> "np.ndarray":
+        if self._order is None or self._offsets is None:
+            raise RuntimeError("IvfIndex.prepare() must be called before searching")
+        nprobe = max(1, min(nprobe, self.nlist))
+        centroid_scores = self.centroids @ query
+        if nprobe < self.nlist:
+            probe = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        else:
+            probe = np.arange(self.nlist)
+        parts = [self._order[self._offsets[i] : self._offsets[i + 1]] for i in probe]
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        # Sorted rows keep memory-mapped reads sequential.
+        return np.sort(np.concatenate(parts))
+
+    def search(
+        self,
+        matrix: "np.ndarray",
+        alive: "np.ndarray",
+        query: "np.ndarray",
+        top_k: int,
+        nprobe: int,
+    ) -> List[Tuple[int, float]]:
+        rows = self.candidates(query, nprobe)
+        rows = rows[alive[rows]]
+        if len(rows) == 0 or top_k <= 0:
+            return []
+        scores = np.asarray(matrix[rows], dtype=np.float32) @ query
+        k = min(top_k, len(rows))
+        if k < len(rows):
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(rows))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(rows[i]), float(scores[i])) for i in top]
+
+
+def recall_at_k(
+    exact: Sequence[Sequence[int]], approximate: Sequence[Sequence[int]], k: int
+) -> float:
+    """
+    Mean fraction of the exact top-k rows that the approximate search also returned.
+    Queries with no exact results are not scored; 1.0 when no query was scored.
+    """
+    total = 0.0
+    scored = 0
+    for truth, found in zip(exact, approximate):
+        truth_k = list(truth)[:k]
+        if not truth_k:
+            continue
+        total += len(set(truth_k) & set(list(found)[:k])) / len(truth_k)
+        scored += 1
+    return total / scored if scored else 1.0
+
+
+def summarize_latencies(samples_s: Sequence[float]) -> Dict[str, float]:
+    ordered = sorted(samples_s)
+    if not ordered:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "mean_ms": 0.0}
+    p50 = ordered[len(ordered) // 2]
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return {
+        "p50_ms": p50 * 1000,
+        "p95_ms": p95 * 1000,
+        "mean_ms": sum(ordered) / len(ordered) * 1000,
+    }
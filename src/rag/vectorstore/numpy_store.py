@@ -0,0 +1,503 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from ..models import Document, RetrievalResult
+from ..retrieval.filters import RetrievalFilter
+from .base import VectorStore, Where
+from .ivf import IvfIndex
+
+VECTORS_FILENAME = "vectors.npy"
+TABLE_FILENAME = "chunks.sqlite"
+_MIN_CAPACITY = 1024
+_SCAN_BLOCK_ROWS = 1 << 18
+_SQL_CHUNK = 500
+_MAX_FILTER_MASKS = 64
+# Filters selecting less than this fraction of rows scan just those rows, even with IVF.
+_SUBSET_SCAN_FRACTION = 0.1
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    In-process vector store backed by a memory-mapped `.npy` matrix of
+    L2-normalized embeddings (float32 or float16) and a SQLite id/offset table
+    holding chunk text and metadata.
+
+    Readers map the matrix read-only, so several API workers share the same
+    pages through the OS page cache. Writers (ingest) append rows in place and
+    bump a version counter that readers check before each query.
+
+    When an IVF index has been built (`build_ann_index`) and `ann_enabled` is set,
+    queries only scan the `ann_nprobe` closest lists instead of every row.
+
+    Metadata filters resolve to a cached per-version row bitmap; selective filters
+    score only the matching rows, so they are cheaper than unfiltered queries.
+    """
+
+    lazy_hydration = True
+
+    def __init__(
+        self,
+        index_dir: str,
+        collection_name: str = "rag",
+        dtype: str = "float32",
+        ann_enabled: bool = False,
+        ann_nprobe: int = 32,
+    ):
+        if np is None:
+            raise ImportError("numpy is required for NumpyVectorStore")
+        if dtype not in ("float32", "float16"):
+            raise ValueError("dtype must be 'float32' or 'float16'")
+        self.root = Path(index_dir) / f"numpy-{collection_name}"
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.vectors_path = self.root / VECTORS_FILENAME
+        self.dtype = dtype
+        self.ann_enabled = ann_enabled
+        self.ann_nprobe = ann_nprobe
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            str(self.root / TABLE_FILENAME), check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            " row INTEGER PRIMARY KEY,"
+            " doc_id TEXT NOT NULL UNIQUE,"
+            " text TEXT NOT NULL,"
+            " metadata TEXT NOT NULL,"
+            " deleted INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._matrix: Optional["np.ndarray"] = None
+        self._alive: Optional["np.ndarray"] = None
+        self._count = 0
+        self._ivf: Optional[IvfIndex] = None
+        self._loaded_version: Optional[str] = None
+        # filter cache key -> row bitmap, valid for the loaded version only
+        self._masks: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+    # -- metadata helpers -------------------------------------------------
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: Any) -> None:
+        self._conn.execute(
+            "INSERT INTO meta(key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, str(value)),
+        )
+
+    def _refresh(self) -> None:
+        """Re-map the matrix if another process (or this one) wrote since the last load."""
+        version = self._meta("version")
+        if version == self._loaded_version and self._matrix is not None:
+            return
+        count = int(self._meta("count") or 0)
+        stored_dtype = self._meta("dtype")
+        if stored_dtype:
+            self.dtype = stored_dtype
+        if count and self.vectors_path.exists():
+            self._matrix = np.load(self.vectors_path, mmap_mode="r")
+        else:
+            self._matrix = None
+        alive = np.ones(count, dtype=bool)
+        deleted = self._conn.execute(
+            "SELECT row FROM chunks WHERE deleted = 1 AND row < ?", (count,)
+        ).fetchall()
+        if deleted:
+            alive[[r[0] for r in deleted]] = False
+        self._alive = alive
+        self._count = count
+        self._ivf = IvfIndex.load(self.root) if self.ann_enabled else None
+        if self._ivf is not None:
+            self._ivf.prepare(count)
+        self._masks.clear()
+        self._loaded_version = version
+
+    def _filter_mask(self, filters: RetrievalFilter) -> "np.ndarray":
+        key = filters.cache_key()
+        mask = self._masks.get(key)
+        if mask is not None:
+            self._masks.move_to_end(key)
+            return mask
+        mask = np.zeros(self._count, dtype=bool)
+        clause, params = filters.to_sql()
+        rows = [
+            row
+            for (row,) in self._conn.execute(
+                f"SELECT row FROM chunks WHERE deleted = 0 AND row < ? AND {clause}",
+                [self._count, *params],
+            )
+        ]
+        if rows:
+            mask[rows] = True
+        self._masks[key] = mask
+        if len(self._masks) > _MAX_FILTER_MASKS:
+            self._masks.popitem(last=False)
+        return mask
+
+    def count(self) -> int:
+        with self._lock:
+            self._refresh()
+            return int(self._alive.sum()) if self._alive is not None else 0
+
+    # -- writes -----------------------------------------------------------
+
+    def _normalize(self, embeddings: List[List[float]]) -> "np.ndarray":
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.ndim != 2:
+            raise ValueError("embeddings must be a 2-D list of vectors")
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def _writable_matrix(self, needed_rows: int, dim: int) -> "np.ndarray":
+        current = None
+        if self.vectors_path.exists():
+            current = np.load(self.vectors_path, mmap_mode="r+")
+            if current.shape[1] != dim:
+                raise ValueError(
+                    f"Embedding dimension {dim} does not match index dimension {current.shape[1]}"
+                )
+            if current.shape[0] >= needed_rows:
+                return current
+        previous_capacity = current.shape[0] if current is not None else 0
+        capacity = max(_MIN_CAPACITY, needed_rows, 2 * previous_capacity)
+        tmp_path = self.vectors_path.with_suffix(".tmp.npy")
+        grown = np.lib.format.open_memmap(
+            tmp_path, mode="w+", dtype=self.dtype, shape=(capacity, dim)
+        )
+        rows = self._count_rows()
+        if current is not None and rows:
+            for start in range(0, rows, _SCAN_BLOCK_ROWS):
+                end = min(rows, start + _SCAN_BLOCK_ROWS)
+                grown[start:end] = current[start:end]
+        grown.flush()
+        del current
+        # Readers keep their mapping of the old inode until they notice the new version.
+        os.replace(tmp_path, self.vectors_path)
+        return np.load(self.vectors_path, mmap_mode="r+")
+
+    def _count_rows(self) -> int:
+        return int(self._meta("count") or 0)
+
+    def add(self, documents: Iterable[Document], embeddings: List[List[float]]) -> None:
+        docs = list(documents)
+        if not docs:
+            return
+        vectors = self._normalize(embeddings)
+        if len(vectors) != len(docs):
+            raise ValueError("documents and embeddings must have the same length")
+        with self._lock:
+            if self._meta("dim") and int(self._meta("dim")) != vectors.shape[1]:
+                raise ValueError(
+                    f"Embedding dimension {vectors.shape[1]} does not match "
+                    f"index dimension {self._meta('dim')}"
+                )
+            stored_dtype = self._meta("dtype")
+            if stored_dtype:
+                self.dtype = stored_dtype
+            existing = self._rows_for([d.doc_id for d in docs])
+            count = self._count_rows()
+            rows: List[int] = []
+            # Last write wins for duplicate ids inside one batch.
+            assigned: Dict[str, int] = {}
+            for doc in docs:
+                row = existing.get(doc.doc_id, assigned.get(doc.doc_id))
+                if row is None:
+                    row = count
+                    count += 1
+                assigned[doc.doc_id] = row
+                rows.append(row)
+
+            matrix = self._writable_matrix(count, vectors.shape[1])
+            matrix[rows] = vectors.astype(self.dtype)
+            matrix.flush()
+            del matrix
+            ivf = IvfIndex.load(self.root)
+            if ivf is not None:
+                ivf.insert(rows, vectors)
+
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT INTO chunks(row, doc_id, text, metadata, deleted) VALUES (?, ?, ?, ?, 0) "
+                "ON CONFLICT(row) DO UPDATE SET doc_id = excluded.doc_id, text = excluded.text, "
+                "metadata = excluded.metadata, deleted = 0",
+                [
+                    (row, doc.doc_id, doc.text, json.dumps(doc.metadata, ensure_ascii=False))
+                    for row, doc in zip(rows, docs)
+                ],
+            )
+            self._set_meta("count", count)
+            self._set_meta("dim", vectors.shape[1])
+            self._set_meta("dtype", self.dtype)
+            self._bump_version()
+            self._conn.execute("COMMIT")
+
+    def get(self, ids: List[str]) -> List[Document]:
+        found: Dict[str, Document] = {}
+        unique = list(dict.fromkeys(ids))
+        with self._lock:
+            for start in range(0, len(unique), _SQL_CHUNK):
+                part = unique[start : start + _SQL_CHUNK]
+                marks = ",".join("?" * len(part))
+                for doc_id, text, metadata in self._conn.execute(
+                    "SELECT doc_id, text, metadata FROM chunks "
+                    f"WHERE deleted = 0 AND doc_id IN ({marks})",
+                    part,
+                ):
+                    found[doc_id] = Document(
+                        doc_id=doc_id, text=text, metadata=json.loads(metadata) if metadata else {}
+                    )
+        return [found[doc_id] for doc_id in ids if doc_id in found]
+
+    def get_metadata(self, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        found: Dict[str, Dict[str, Any]] = {}
+        unique = list(dict.fromkeys(ids))
+        with self._lock:
+            for start in range(0, len(unique), _SQL_CHUNK):
+                part = unique[start : start + _SQL_CHUNK]
+                marks = ",".join("?" * len(part))
+                for doc_id, metadata in self._conn.execute(
+                    "SELECT doc_id, metadata FROM chunks "
+                    f"WHERE deleted = 0 AND doc_id IN ({marks})",
+                    part,
+                ):
+                    found[doc_id] = json.loads(metadata) if metadata else {}
+        return found
+
+    def exists(self, ids: List[str]) -> Set[str]:
+        with self._lock:
+            return set(self._rows_for(ids, alive_only=True))
+
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Where] = None) -> None:
+        if not ids and not where:
+            return
+        with self._lock:
+            if where:
+                matched = self._rows_where(where)
+                if ids:
+                    wanted = set(self._rows_for(ids).values())
+                    matched = [row for row in matched if row in wanted]
+                rows = matched
+            else:
+                rows = list(self._rows_for(ids).values())
+            if not rows:
+                return
+            if self.vectors_path.exists():
+                matrix = np.load(self.vectors_path, mmap_mode="r+")
+                matrix[rows] = 0
+                matrix.flush()
+                del matrix
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "UPDATE chunks SET deleted = 1, text = '', metadata = '{}' WHERE row = ?",
+                [(row,) for row in rows],
+            )
+            self._bump_version()
+            self._conn.execute("COMMIT")
+
+    def build_ann_index(self, nlist: int = 0, iterations: int = 10) -> Optional[IvfIndex]:
+        """(Re)train the IVF index over every stored row. Returns None for an empty store."""
+        with self._lock:
+            count = self._count_rows()
+            if count == 0 or not self.vectors_path.exists():
+                return None
+            matrix = np.load(self.vectors_path, mmap_mode="r")
+            ivf = IvfIndex.train(self.root, matrix, count, nlist=nlist, iterations=iterations)
+            del matrix
+            self._conn.execute("BEGIN")
+            self._bump_version()
+            self._conn.execute("COMMIT")
+            return ivf
+
+    def ensure_ann_index(self, nlist: int = 0, rebuild_growth: float = 4.0) -> bool:
+        """
+        Build the IVF index if missing, or retrain it once the store has grown
+        `rebuild_growth` times past the size it was trained on. Returns True if trained.
+        """
+        with self._lock:
+            count = self._count_rows()
+            ivf = IvfIndex.load(self.root)
+            if ivf is not None and count <= ivf.trained_rows * rebuild_growth:
+                return False
+            return self.build_ann_index(nlist=nlist) is not None
+
+    def _bump_version(self) -> None:
+        self._set_meta("version", int(self._meta("version") or 0) + 1)
+
+    def _rows_for(self, ids: List[str], alive_only: bool = False) -> Dict[str, int]:
+        found: Dict[str, int] = {}
+        unique = list(dict.fromkeys(ids))
+        alive = " AND deleted = 0" if alive_only else ""
+        for start in range(0, len(unique), _SQL_CHUNK):
+            part = unique[start : start + _SQL_CHUNK]
+            marks = ",".join("?" * len(part))
+            for doc_id, row in self._conn.execute(
+                f"SELECT doc_id, row FROM chunks WHERE doc_id IN ({marks}){alive}", part
+            ):
+                found[doc_id] = row
+        return found
+
+    def _rows_where(self, where: Where) -> List[int]:
+        clause, params = RetrievalFilter(metadata=dict(where)).to_sql()
+        sql = f"SELECT row FROM chunks WHERE deleted = 0 AND {clause}"
+        return [row for (row,) in self._conn.execute(sql, params)]
+
+    # -- reads ------------------------------------------------------------
+
+    def _snapshot(self, filters: Optional[RetrievalFilter] = None):
+        with self._lock:
+            self._refresh()
+            alive = self._alive
+            if filters is not None and alive is not None and not filters.is_empty():
+                alive = alive & self._filter_mask(filters)
+            return self._matrix, alive, self._count, self._ivf
+
+    def sample_vectors(self, n: int, seed: int = 0) -> "np.ndarray":
+        """
+        Up to `n` stored (normalized) vectors of random live rows, as a float32 copy.
+        Used to build evaluation queries, e.g. by scripts/ann_recall.py.
+        """
+        matrix, alive, count, _ = self._snapshot()
+        if matrix is None or alive is None or count == 0:
+            return np.empty((0, 0), dtype=np.float32)
+        live_rows = np.flatnonzero(alive)
+        rng = np.random.default_rng(seed)
+        sampled = rng.choice(live_rows, size=min(n, len(live_rows)), replace=False)
+        return np.asarray(matrix[np.sort(sampled)], dtype=np.float32)
+
+    def search(
+        self,
+        query_embedding: List[float],
+        top_k: int,
+        exact: bool = False,
+        filters: Optional[RetrievalFilter] = None,
+    ) -> List[Tuple[int, float]]:
+        """Return (row, score) pairs, best first, without loading text or metadata."""
+        # Scoring runs outside the lock: numpy releases the GIL, so concurrent
+        # queries in one worker scan the shared mapping in parallel.
+        matrix, alive, count, ivf = self._snapshot(filters)
+        if matrix is None or alive is None or count == 0 or top_k <= 0:
+            return []
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(query))
+        if norm:
+            query = query / norm
+        filtered = filters is not None and not filters.is_empty()
+        if filtered:
+            rows = np.flatnonzero(alive)
+            if len(rows) < count * _SUBSET_SCAN_FRACTION or ivf is None or exact:
+                return _top_k(_scan_rows(matrix, rows, query), rows, top_k)
+        if ivf is not None and not exact:
+            return ivf.search(matrix, alive, query, top_k, self.ann_nprobe)
+        scores = _scan_scores(matrix, count, query)
+        scores[~alive] = -np.inf
+        k = min(top_k, int(alive.sum()))
+        if k <= 0:
+            return []
+        if k < len(scores):
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(len(scores))
+        order = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(int(row), float(scores[row])) for row in order]
+
+    def _hydrate(self, ranked: List[Tuple[int, float]]) -> List[RetrievalResult]:
+        if not ranked:
+            return []
+        rows = [row for row, _ in ranked]
+        marks = ",".join("?" * len(rows))
+        records = {
+            row: (doc_id, text, metadata)
+            for row, doc_id, text, metadata in self._conn.execute(
+                f"SELECT row, doc_id, text, metadata FROM chunks WHERE row IN ({marks})", rows
+            )
+        }
+        results: List[RetrievalResult] = []
+        for row, score in ranked:
+            record = records.get(row)
+            if record is None:
+                continue
+            doc_id, text, metadata = record
+            results.append(
+                RetrievalResult(
+                    doc_id=doc_id,
+                    text=text,
+                    score=score,
+                    metadata=json.loads(metadata) if metadata else {},
+                )
+            )
+        return results
+
+    def query(
+        self,
+        query_embedding: List[float],
+        top_k: int,
+        filters: Optional[RetrievalFilter] = None,
+    ) -> List[RetrievalResult]:
+        ranked = self.search(query_embedding, top_k, filters=filters)
+        with self._lock:
+            return self._hydrate(ranked)
+
+    def query_ids(
+        self,
+        query_embedding: List[float],
+        top_k: int,
+        filters: Optional[RetrievalFilter] = None,
+    ) -> List[Tuple[str, float]]:
+        ranked = self.search(query_embedding, top_k, filters=filters)
+        if not ranked:
+            return []
+        rows = [row for row, _ in ranked]
+        marks = ",".join("?" * len(rows))
+        with self._lock:
+            ids = dict(
+                self._conn.execute(f"SELECT row, doc_id FROM chunks WHERE row IN ({marks})", rows)
+            )
+        return [(ids[row], score) for row, score in ranked if row in ids]
+
+
+def _scan_scores(matrix: "np.ndarray", count: int, query: "np.ndarray") -> "np.ndarray":
+    scores = np.empty(count, dtype=np.float32)
+    # Block-wise scan keeps float16 upcasts bounded and avoids copying the mapping.
+    for start in range(0, count, _SCAN_BLOCK_ROWS):
+        end = min(count, start + _SCAN_BLOCK_ROWS)
+        block = matrix[start:end]
+        if block.dtype != np.float32:
+            block = block.astype(np.float32)
+        scores[start:end] = block @ query
+    return scores
+
+
+def _scan_rows(matrix: "np.ndarray", rows: "np.ndarray", query: "np.ndarray") -> "np.ndarray":
+    scores = np.empty(len(rows), dtype=np.float32)
+    for start in range(0, len(rows), _SCAN_BLOCK_ROWS):
+        block = np.asarray(matrix[rows[start : start + _SCAN_BLOCK_ROWS]], dtype=np.float32)
+        scores[start : start + len(block)] = block @ query
+    return scores
+
+
+def _top_k(scores: "np.ndarray", rows: "np.ndarray", top_k: int) -> List[Tuple[int, float]]:
+    k = min(top_k, len(rows))
+    if k <= 0:
+        return []
+    if k < len(rows):
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(len(rows))
+    top = top[np.argsort(-scores[top], kind="stable")]
+    return [(int(rows[i]), float(scores[i])) for i in top]
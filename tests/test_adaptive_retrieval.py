@@ -0,0 +1,155 @@
+import asyncio
+
+from rag.embeddings.base import Embeddings
+from rag.llm.base import LLM
+from rag.metrics import RETRIEVAL_WIDENINGS_TOTAL
+from rag.models import Document, RetrievalResult
+from rag.rag import RagPipeline
+from rag.rag.rerank import KeywordOverlapReranker, Reranker
+from rag.settings import Settings
+from rag.text.terms import TERMS_METADATA_KEY
+from rag.vectorstore import NumpyVectorStore
+from rag.vectorstore.base import VectorStore
+
+
+class DummyEmbeddings(Embeddings):
+    def embed_texts(self, texts):
+        return [[1.0, 0.0] for _ in texts]
+
+
+class EchoLLM(LLM):
+    def generate(self, prompt, system_prompt=None):
+        return "ok"
+
+
+class RankedStore(VectorStore):
+    """Chunks c0..cN scored in order; records id queries, metadata and text reads."""
+
+    lazy_hydration = True
+
+    def __init__(self, size, gone=()):
+        self.chunks = {
+            f"c{i}": Document(f"c{i}", f"text {i}", {"source": f"c{i}.md"}) for i in range(size)
+        }
+        self.gone = set(gone)
+        self.queried = []
+        self.described = []
+        self.fetched = []
+
+    def add(self, documents, embeddings):
+        return None
+
+    def query(self, query_embedding, top_k, filters=None):
+        raise AssertionError("lazy stores are queried by id first")
+
+    def query_ids(self, query_embedding, top_k, filters=None):
+        self.queried.append(top_k)
+        return [(f"c{i}", 1.0 - i / 100) for i in range(min(top_k, len(self.chunks)))]
+
+    def get(self, ids):
+        self.fetched.extend(ids)
+        return [self.chunks[i] for i in ids if i in self.chunks and i not in self.gone]
+
+    def get_metadata(self, ids):
+        self.described.extend(ids)
+        return {i: self.chunks[i].metadata for i in ids if i in self.chunks and i not in self.gone}
+
+
+class ReverseReranker(Reranker):
+    def rerank(self, question, results):
+        return list(reversed(results))
+
+
+def _pipeline(store, reranker=None, **rag):
+    return RagPipeline(
+        embeddings=DummyEmbeddings(),
+        vectorstore=store,
+        llm_cloud=EchoLLM(),
+        llm_ollama=EchoLLM(),
+        settings=Settings(
+            model={"provider": "ollama"},
+            rag={"top_k": 2, "hybrid": False, **rag},
+            rerank={"method": "none"},
+        ),
+        reranker=reranker,
+    )
+
+
+def test_without_reranker_only_top_k_are_hydrated():
+    store = RankedStore(50)
+
+    resp = _pipeline(store).answer("question")
+
+    assert [r.doc_id for r in resp.sources] == ["c0", "c1"]
+    assert store.queried == [4]
+    assert store.fetched == ["c0", "c1"]
+
+
+def test_missing_chunks_are_backfilled_then_widen():
+    store = RankedStore(50, gone={"c0", "c1", "c2", "c3"})
+    before = RETRIEVAL_WIDENINGS_TOTAL.value(reason="filtered")
+
+    resp = _pipeline(store).answer("question")
+
+    assert [r.doc_id for r in resp.sources] == ["c4", "c5"]
+    assert store.queried == [4, 8]
+    # Ids already known to be gone are not looked up twice.
+    assert store.described.count("c0") == 1
+    assert store.fetched == ["c4", "c5"]
+    assert RETRIEVAL_WIDENINGS_TOTAL.value(reason="filtered") == before + 1
+
+
+def test_reranker_promoting_the_tail_widens_up_to_the_cap():
+    store = RankedStore(50)
+    pipeline = _pipeline(store, ReverseReranker(), candidate_factor=2, max_candidate_factor=8)
+
+    resp = asyncio.run(pipeline.aanswer("question"))
+
+    assert store.queried == [4, 8, 16]
+    assert [r.doc_id for r in resp.sources] == ["c15", "c14"]
+    assert len(store.fetched) == len(set(store.fetched)) == 16
+
+
+def test_no_widening_when_the_store_is_exhausted():
+    store = RankedStore(3)
+
+    _pipeline(store, ReverseReranker()).answer("question")
+
+    assert store.queried == [4]
+
+
+def test_numpy_query_ids_match_query_order(tmp_path):
+    store = NumpyVectorStore(index_dir=str(tmp_path))
+    docs = [Document(i, f"text {i}", {}) for i in ("a", "b", "c")]
+    store.add(docs, [[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]])
+
+    ids = store.query_ids([1.0, 0.2], 3)
+
+    assert [doc_id for doc_id, _ in ids] == [r.doc_id for r in store.query([1.0, 0.2], 3)]
+
+
+def test_lexical_reranker_reads_text_only_for_the_survivors():
+    store = RankedStore(50)
+    for doc in store.chunks.values():
+        doc.metadata[TERMS_METADATA_KEY] = "text"
+    pipeline = _pipeline(store, KeywordOverlapReranker())
+
+    resp = pipeline.answer("text")
+
+    assert len(store.described) == 4
+    assert store.fetched == ["c0", "c1"]
+    assert all(s.text for s in resp.sources)
+
+
+def test_pending_results_are_slotted_and_hydrate_in_bulk(tmp_path):
+    store = NumpyVectorStore(index_dir=str(tmp_path))
+    store.add([Document("a", "text a", {"source": "a.md"})], [[1.0, 0.0]])
+    results = [RetrievalResult.pending("a", 0.9), RetrievalResult.pending("gone", 0.5)]
+
+    assert not hasattr(results[0], "__dict__")
+    assert not results[0].hydrated
+    assert store.hydrate(results, text=False) == [
+        RetrievalResult("a", None, 0.9, {"source": "a.md"})
+    ]
+    assert store.hydrate(results) == [RetrievalResult("a", "text a", 0.9, {"source": "a.md"})]
+    assert results[0].hydrated
@@ -0,0 +1,161 @@
+import asyncio
+
+from rag.embeddings.base import Embeddings
+from rag.llm.base import LLM
+from rag.models import RagResponse, RetrievalResult
+from rag.rag import AnswerCache, RagPipeline
+from rag.rag.cache import normalize_question, replay_chunks
+from rag.settings import Settings
+from rag.vectorstore.base import VectorStore
+
+
+class KeywordEmbeddings(Embeddings):
+    def embed_texts(self, texts):
+        return [[1.0, 0.0] if "reset" in t.lower() else [0.0, 1.0] for t in texts]
+
+
+class OneDocStore(VectorStore):
+    def add(self, documents, embeddings):
+        return None
+
+    def query(self, query_embedding, top_k):
+        return [RetrievalResult("doc#1", "context", 0.9, {"source": "doc"})]
+
+
+class CountingLLM(LLM):
+    model = "counting"
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate(self, prompt, system_prompt=None):
+        self.calls += 1
+        return "Open settings, then choose reset password."
+
+    def stream(self, prompt, system_prompt=None):
+        self.calls += 1
+        yield "Open settings, "
+        yield "then choose reset password."
+
+
+def _pipeline(cache):
+    llm = CountingLLM()
+    pipeline = RagPipeline(
+        embeddings=KeywordEmbeddings(),
+        vectorstore=OneDocStore(),
+        llm_cloud=llm,
+        llm_ollama=llm,
+        settings=Settings(model={"provider": "ollama"}, rag={"hybrid": False}),
+        answer_cache=cache,
+    )
+    return pipeline, llm
+
+
+def _response(answer="ok"):
+    return RagResponse(answer=answer, sources=[], model="m", used_fallback=False)
+
+
+def test_normalized_question_hits_cache():
+    pipeline, llm = _pipeline(AnswerCache())
+
+    first = pipeline.answer("How do I reset my password?")
+    second = pipeline.answer("  how do I   RESET my password ")
+
+    assert llm.calls == 1
+    assert first.cached is False
+    assert second.cached is True
+    assert second.answer == first.answer
+    assert normalize_question("Hello  World?!") == "hello world"
+
+
+def test_semantic_match_reuses_similar_question():
+    pipeline, llm = _pipeline(AnswerCache(semantic=True, similarity_threshold=0.9))
+
+    pipeline.answer("How do I reset my password?")
+    similar = pipeline.answer("password reset steps")
+    other = pipeline.answer("What is the VPN address?")
+
+    assert similar.cached is True
+    assert other.cached is False
+    assert llm.calls == 2
+
+
+def test_semantic_index_follows_inserts_replacements_and_evictions():
+    cache = AnswerCache(max_entries=2, semantic=True, similarity_threshold=0.9)
+    for i in range(40):
+        cache.put(f"q{i}", _response(f"a{i}"), [float(i), 1.0])
+
+    assert cache.get("other", [39.0, 1.0]).answer == "a39"
+    # Evicted entries no longer match, even with an identical embedding.
+    assert cache.get("other", [0.0, 1.0]) is None
+
+    cache.put("q39", _response("new"), [1.0, -1.0])
+    assert cache.get("other", [1.0, -1.0]).answer == "new"
+    assert cache.get("other", [39.0, 1.0]).answer == "a38"
+
+
+def test_index_version_watcher_rereads_only_after_a_bump(tmp_path, monkeypatch):
+    from rag.ingest import manifest as manifest_module
+    from rag.ingest import IndexVersionWatcher, bump_index_version
+
+    reads = []
+    real_read = manifest_module.read_index_version
+    monkeypatch.setattr(
+        manifest_module, "read_index_version", lambda d: reads.append(d) or real_read(d)
+    )
+    watcher = IndexVersionWatcher(str(tmp_path))
+    assert watcher() == ""
+
+    version = bump_index_version(str(tmp_path))
+    assert watcher() == version
+    assert watcher() == version
+    assert len(reads) == 1
+
+    bumped = bump_index_version(str(tmp_path))
+    assert watcher() == bumped != version
+    assert len(reads) == 2
+
+
+def test_ttl_lru_and_index_version_invalidation():
+    version = {"value": "1"}
+    cache = AnswerCache(max_entries=2, version_fn=lambda: version["value"])
+    cache.put("a", _response("a"))
+    cache.put("b", _response("b"))
+    assert cache.get("a") is not None
+    cache.put("c", _response("c"))
+
+    # "b" was least recently used.
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+
+    version["value"] = "2"
+    assert cache.get("a") is None
+    assert cache.get("c") is None
+
+    expired = AnswerCache(ttl_s=-1)
+    expired.put("a", _response("a"))
+    assert expired.get("a") is None
+
+
+def test_streamed_answers_are_cached_and_replayed():
+    pipeline, llm = _pipeline(AnswerCache())
+
+    streamed = "".join(pipeline.answer_stream("How do I reset my password?"))
+
+    async def collect():
+        return [chunk async for chunk in pipeline.aanswer_stream("how do i reset my password")]
+
+    replayed = asyncio.run(collect())
+
+    assert llm.calls == 1
+    assert "".join(replayed) == streamed
+    assert pipeline.answer("How do I reset my password").cached is True
+
+
+def test_replay_chunks_round_trip():
+    text = "  one two three\nfour five six seven eight nine ten  "
+
+    chunks = list(replay_chunks(text, words_per_chunk=3))
+
+    assert "".join(chunks) == text
+    assert len(chunks) > 1
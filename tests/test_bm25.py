@@ -0,0 +1,124 @@
+import asyncio
+
+from rag.embeddings.base import Embeddings
+from rag.llm.base import LLM
+from rag.models import Document, RetrievalResult
+from rag.rag import RagPipeline
+from rag.retrieval import BM25Index, reciprocal_rank_fusion, weighted_score_fusion
+from rag.settings import Settings
+from rag.vectorstore.base import VectorStore
+
+
+def _doc(doc_id, text, source="notes.md"):
+    return Document(doc_id=doc_id, text=text, metadata={"source": source})
+
+
+def test_bm25_ranks_exact_identifiers_first(tmp_path):
+    index = BM25Index.open(str(tmp_path))
+    index.add(
+        [
+            _doc("a#1", "The error code ERR_4021 is raised when the token expires."),
+            _doc("b#1", "Tokens are refreshed automatically by the client."),
+            _doc("c#1", "Unrelated text about gardening and tomatoes."),
+        ]
+    )
+
+    hits = index.search("what does ERR_4021 mean", top_k=5)
+
+    assert hits[0][0] == "a#1"
+    assert "c#1" not in [doc_id for doc_id, _ in hits]
+
+
+def test_bm25_upsert_and_delete_keep_statistics_consistent(tmp_path):
+    index = BM25Index.open(str(tmp_path))
+    index.add([_doc("a#1", "alpha beta"), _doc("b#1", "beta gamma")])
+    index.add([_doc("a#1", "delta epsilon")])
+
+    assert index.count() == 2
+    assert index.search("alpha", top_k=5) == []
+    assert [doc_id for doc_id, _ in index.search("delta", top_k=5)] == ["a#1"]
+
+    index.delete(["a#1", "missing"])
+
+    assert index.count() == 1
+    assert index.search("delta", top_k=5) == []
+    # Reopening reads the persisted postings.
+    assert [doc_id for doc_id, _ in BM25Index.open(str(tmp_path)).search("gamma", 5)] == ["b#1"]
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "d"]], k=60)
+
+    assert fused[0][0] == "b"
+    assert {doc_id for doc_id, _ in fused} == {"a", "b", "c", "d"}
+    assert reciprocal_rank_fusion([["a"], ["a"]])[0][1] == 1.0
+
+
+def test_weighted_score_fusion_normalizes_each_ranking():
+    fused = dict(weighted_score_fusion([("a", 0.9), ("b", 0.1)], [("b", 12.0), ("c", 2.0)], 0.5))
+
+    assert fused["a"] == 0.5
+    assert fused["b"] == 0.5
+    assert fused["c"] == 0.0
+
+
+class DummyEmbeddings(Embeddings):
+    def embed_texts(self, texts):
+        return [[0.0] * 3 for _ in texts]
+
+
+class DenseOnlyStore(VectorStore):
+    def __init__(self):
+        self.chunks = {
+            "dense#1": _doc("dense#1", "general overview of authentication"),
+            "lexical#1": _doc("lexical#1", "ERR_4021 means the session token expired"),
+        }
+
+    def add(self, documents, embeddings):
+        return None
+
+    def query(self, query_embedding, top_k):
+        doc = self.chunks["dense#1"]
+        return [RetrievalResult(doc.doc_id, doc.text, 0.8, doc.metadata)]
+
+    def get(self, ids):
+        return [self.chunks[i] for i in ids if i in self.chunks]
+
+
+class EchoLLM(LLM):
+    def generate(self, prompt, system_prompt=None):
+        return "ok"
+
+
+def _hybrid_pipeline(tmp_path, **rag):
+    index = BM25Index.open(str(tmp_path))
+    store = DenseOnlyStore()
+    index.add(store.chunks.values())
+    return RagPipeline(
+        embeddings=DummyEmbeddings(),
+        vectorstore=store,
+        llm_cloud=EchoLLM(),
+        llm_ollama=EchoLLM(),
+        settings=Settings(rag={"top_k": 2, **rag}),
+        lexical_index=index,
+    )
+
+
+def test_hybrid_retrieval_hydrates_lexical_only_hits(tmp_path):
+    pipeline = _hybrid_pipeline(tmp_path)
+
+    results = {r.doc_id: r for r in pipeline.retrieve("ERR_4021")}
+
+    assert set(results) == {"dense#1", "lexical#1"}
+    assert "ERR_4021" in results["lexical#1"].text
+    assert results["lexical#1"].metadata["source"] == "notes.md"
+
+
+def test_hybrid_async_retrieval_matches_sync(tmp_path):
+    pipeline = _hybrid_pipeline(tmp_path, fusion="weighted", dense_weight=0.3)
+
+    sync_ids = [r.doc_id for r in pipeline.retrieve("ERR_4021")]
+    async_ids = [r.doc_id for r in asyncio.run(pipeline.aretrieve("ERR_4021"))]
+
+    assert sync_ids == async_ids
+    assert sync_ids[0] == "lexical#1"
@@ -1,4 +1,8 @@
-from rag.text.chunking import chunk_text
+from rag.ingest.pipeline import build_chunks
+from rag.models import Document
+from rag.settings import ChunkingConfig
+from rag.text.chunking import chunk_structured, chunk_text
+from rag.text.tokenizers import RegexTokenizer, load_tokenizer
 
 
 def test_chunk_text_basic():
@@ -7,3 +11,87 @@ def test_chunk_text_basic():
     assert chunks[0] == "one two three four"
     assert chunks[1].startswith("four")
     assert chunks[-1].endswith("ten")
+
+
+def test_regex_tokenizer_splits_long_words_and_punctuation():
+    tokenizer = RegexTokenizer(chars_per_token=4)
+    assert tokenizer.count("tokenization, ok") == 5  # toke niza tion , ok
+    assert load_tokenizer("regex").count("a b") == 2
+
+
+def test_chunk_structured_respects_headings_and_offsets():
+    text = (
+        "# Intro\n\nFirst paragraph. Short.\n\n"
+        "## Setup\n\nInstall it. Configure it.\nStill setup.\n"
+    )
+    chunks = chunk_structured(text, max_tokens=64, overlap_tokens=0)
+
+    assert [c.section for c in chunks] == ["Intro", "Setup"]
+    assert chunks[0].text == "# Intro\n\nFirst paragraph. Short."
+    assert chunks[1].text.startswith("## Setup")
+    for chunk in chunks:
+        assert text[chunk.start : chunk.end] == chunk.text
+
+
+def test_chunk_structured_token_budget_and_overlap():
+    tokenizer = RegexTokenizer()
+    text = " ".join(f"Sentence number {i} ends here." for i in range(50))
+    chunks = chunk_structured(text, max_tokens=30, overlap_tokens=8, tokenizer=tokenizer)
+
+    assert len(chunks) > 1
+    assert all(tokenizer.count(c.text) <= 30 for c in chunks)
+    # Overlap repeats the last sentence of the previous chunk.
+    assert chunks[1].start < chunks[0].end
+    assert chunks[-1].end == len(text)
+
+
+def test_chunk_structured_splits_oversized_sentence_on_tokens():
+    text = "word " * 100
+    chunks = chunk_structured(text, max_tokens=16, overlap_tokens=0)
+
+    assert [c.tokens for c in chunks] == [16] * 6 + [4]
+    assert "".join(c.text.replace(" ", "") for c in chunks) == "word" * 100
+
+
+def test_chunk_structured_keeps_heading_before_oversized_paragraph():
+    tokenizer = RegexTokenizer()
+    text = "# Title\n\n" + " ".join(f"word{i}" for i in range(40))
+    chunks = chunk_structured(text, max_tokens=20, overlap_tokens=0, tokenizer=tokenizer)
+
+    assert chunks[0].text.startswith("# Title\n\nword0 ")
+    assert all(c.tokens <= 20 and c.section == "Title" for c in chunks)
+    assert " ".join(c.text for c in chunks).split()[2:] == [f"word{i}" for i in range(40)]
+
+
+def test_chunk_structured_splits_oversized_heading():
+    tokenizer = RegexTokenizer()
+    heading = " ".join(f"title{i}" for i in range(30))
+    text = f"# {heading}\n\nShort body."
+    chunks = chunk_structured(text, max_tokens=20, overlap_tokens=0, tokenizer=tokenizer)
+
+    assert all(tokenizer.count(c.text) <= 20 for c in chunks)
+    assert "".join("".join(c.text.split()) for c in chunks) == "".join(text.split())
+    assert all(c.section == heading for c in chunks)
+
+
+def test_chunk_structured_ignores_hash_lines_in_code_fences():
+    text = (
+        "# Install\n\nRun the script:\n\n"
+        "```bash\n# download first\ncurl -O example.sh\n# then run it\nsh example.sh\n```\n"
+    )
+    chunks = chunk_structured(text, max_tokens=64, overlap_tokens=0)
+
+    assert [c.section for c in chunks] == ["Install"]
+    assert chunks[0].text == text.rstrip()
+
+
+def test_build_chunks_structured_metadata():
+    doc = Document(doc_id="a.md", text="# Title\n\nBody   text.", metadata={"source": "a.md"})
+    chunks = build_chunks([doc], 900, 180, ChunkingConfig(max_tokens=32, overlap_tokens=4))
+
+    assert len(chunks) == 1
+    assert chunks[0].doc_id == "a.md#chunk=1"
+    assert chunks[0].text == "# Title Body text."
+    assert chunks[0].metadata["section"] == "Title"
+    assert chunks[0].metadata["char_start"] == 0
+    assert chunks[0].metadata["char_end"] == len(doc.text)
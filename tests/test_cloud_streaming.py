@@ -0,0 +1,241 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from rag.embeddings.base import Embeddings
+from rag.http_pool import aclose_async_clients, close_sessions
+from rag.llm.base import LLM
+from rag.llm.cloud import CloudLLM, StreamDecoder
+from rag.metrics import ANSWERS_TOTAL, LLM_TTFT_SECONDS
+from rag.models import RetrievalResult
+from rag.rag import RagPipeline
+from rag.settings import Settings
+from rag.vectorstore.base import VectorStore
+
+
+def _sse(data):
+    if not isinstance(data, str):
+        data = json.dumps(data, ensure_ascii=False)
+    return f"data: {data}\n\n".encode()
+
+
+def _openai_delta(text):
+    return {"choices": [{"index": 0, "delta": {"content": text}}]}
+
+
+class _StreamHandler(BaseHTTPRequestHandler):
+    """Stand-in provider: writes `server.events` as separate HTTP chunks."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        server.requests.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+        self.send_response(200)
+        self.send_header("Content-Type", server.content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for i, event in enumerate(server.events):
+                self._chunk(event)
+                if i == 0:
+                    server.release.wait(5)
+            while server.endless:
+                self._chunk(_sse(_openai_delta("more")))
+                server.release.wait(0.02)
+            self._chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            server.disconnected.set()
+
+    def _chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def log_message(self, *args):
+        return None
+
+
+@pytest.fixture
+def provider():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StreamHandler)
+    server.daemon_threads = True
+    server.requests = []
+    server.events = []
+    server.content_type = "text/event-stream"
+    server.endless = False
+    server.release = threading.Event()
+    server.disconnected = threading.Event()
+    server.url = f"http://127.0.0.1:{server.server_port}/v1/chat/completions"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    close_sessions()
+    try:
+        yield server
+    finally:
+        server.release.set()
+        close_sessions()
+        server.shutdown()
+
+
+def test_decoder_parses_sse_events_and_stops_at_done():
+    decoder = StreamDecoder(sse=True)
+    lines = [
+        ": keep-alive",
+        "",
+        "event: message",
+        'data: {"choices": [{"delta": ',
+        'data: {"content": "Hi"}}]}',
+        "",
+    ]
+    assert [decoder.feed(line) for line in lines] == [None, None, None, None, None, "Hi"]
+    assert decoder.feed("data:  world ") is None
+    assert decoder.feed("") == " world "
+    assert decoder.feed("data: [DONE]") is None
+    assert decoder.feed("") is None
+    assert decoder.done
+
+
+def test_decoder_parses_ndjson_and_raises_provider_errors():
+    decoder = StreamDecoder(sse=False)
+    assert decoder.feed('{"text": "a"}') == "a"
+    assert decoder.feed("not json") is None
+    assert decoder.feed('{"response": "b", "done": true}') == "b"
+    assert decoder.done
+    with pytest.raises(RuntimeError, match="overloaded"):
+        StreamDecoder(sse=False).feed('{"error": "overloaded"}')
+
+
+def test_openai_stream_yields_chunks_before_the_response_ends(provider):
+    provider.events = [
+        _sse(_openai_delta("Hel")),
+        _sse(_openai_delta("lo")) + _sse({"choices": [{"index": 0, "delta": {}}]}),
+        _sse("[DONE]"),
+    ]
+    llm = CloudLLM(provider.url, "key", "gpt", timeout_s=5, provider="openai")
+    before = LLM_TTFT_SECONDS.count(provider="cloud")
+
+    stream = llm.stream("question", system_prompt="system")
+    assert next(stream) == "Hel"
+    # The server is still holding the rest of the response.
+    assert not provider.release.is_set()
+    provider.release.set()
+    assert list(stream) == ["lo"]
+
+    assert LLM_TTFT_SECONDS.count(provider="cloud") == before + 1
+    request = provider.requests[0]
+    assert request["stream"] is True
+    assert request["messages"] == [
+        {"role": "system", "content": "system"},
+        {"role": "user", "content": "question"},
+    ]
+
+
+def test_sync_stream_decodes_utf8_without_charset(provider):
+    # The multi-byte "é" of the first event is split across two HTTP chunks.
+    first = _sse(_openai_delta("Réponse très"))
+    split = first.index("é".encode()) + 1
+    provider.events = [
+        first[:split],
+        first[split:] + _sse(_openai_delta(" élégante")),
+        _sse("[DONE]"),
+    ]
+    provider.release.set()
+    llm = CloudLLM(provider.url, "key", "gpt", timeout_s=5, provider="openai")
+
+    assert "".join(llm.stream("question")) == "Réponse très élégante"
+
+
+def test_generic_provider_streams_ndjson(provider):
+    provider.content_type = "application/x-ndjson"
+    provider.events = [b'{"text": "a"}\n', b'{"text": "b"}\n{"text": "c"}\n', b'{"done": true}\n']
+    provider.release.set()
+    llm = CloudLLM(provider.url, "key", "model", timeout_s=5)
+
+    async def collect():
+        try:
+            return [chunk async for chunk in llm.astream("question")]
+        finally:
+            await aclose_async_clients()
+
+    assert asyncio.run(collect()) == ["a", "b", "c"]
+    assert provider.requests[0] == {
+        "model": "model",
+        "prompt": "question",
+        "system": "",
+        "stream": True,
+    }
+
+
+def test_closing_astream_disconnects_from_the_provider(provider):
+    provider.events = [_sse(_openai_delta("first"))]
+    provider.endless = True
+    llm = CloudLLM(provider.url, "key", "gpt", timeout_s=5, provider="openai")
+
+    async def first_chunk_then_close():
+        stream = llm.astream("question")
+        try:
+            chunk = await stream.__anext__()
+            provider.release.set()
+            await stream.aclose()
+            return chunk
+        finally:
+            await aclose_async_clients()
+
+    assert asyncio.run(first_chunk_then_close()) == "first"
+    assert provider.disconnected.wait(5)
+
+
+class DummyEmbeddings(Embeddings):
+    def embed_texts(self, texts):
+        return [[0.0] * 3 for _ in texts]
+
+
+class DummyVectorStore(VectorStore):
+    def add(self, documents, embeddings):
+        return None
+
+    def query(self, query_embedding, top_k):
+        return [RetrievalResult("doc#1", "context", 0.9, {"source": "doc"})]
+
+
+class EndlessLLM(LLM):
+    model = "endless"
+
+    def __init__(self):
+        self.closed = False
+
+    def generate(self, prompt, system_prompt=None):
+        return "ok"
+
+    async def astream(self, prompt, system_prompt=None):
+        try:
+            while True:
+                yield "token"
+                await asyncio.sleep(0)
+        finally:
+            self.closed = True
+
+
+def test_closing_pipeline_stream_closes_the_llm_stream():
+    llm = EndlessLLM()
+    pipeline = RagPipeline(
+        embeddings=DummyEmbeddings(),
+        vectorstore=DummyVectorStore(),
+        llm_cloud=llm,
+        llm_ollama=llm,
+        settings=Settings(model={"provider": "cloud"}, rag={"hybrid": False}),
+    )
+    before = ANSWERS_TOTAL.value(mode="stream", outcome="cancelled")
+
+    async def first_chunk_then_close():
+        stream = pipeline.aanswer_stream("question")
+        chunk = await stream.__anext__()
+        await stream.aclose()
+        return chunk
+
+    assert asyncio.run(first_chunk_then_close()) == "token"
+    assert llm.closed
+    assert ANSWERS_TOTAL.value(mode="stream", outcome="cancelled") == before + 1
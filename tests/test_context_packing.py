@@ -0,0 +1,133 @@
+from rag.embeddings.base import Embeddings
+from rag.llm.base import LLM
+from rag.models import RetrievalResult
+from rag.rag import RagPipeline
+from rag.rag.context import ContextPacker
+from rag.settings import Settings
+from rag.text.chunking import chunk_structured
+from rag.vectorstore.base import VectorStore
+
+
+def _words(start, stop):
+    return " ".join(f"w{i}" for i in range(start, stop))
+
+
+def _result(doc_id, text, score=0.5, **metadata):
+    return RetrievalResult(doc_id, text, score, {"source": doc_id.split("#")[0], **metadata})
+
+
+def test_neighbouring_chunks_are_merged_without_the_overlap():
+    results = [
+        _result("guide.md#chunk=2", _words(8, 20), 0.9),
+        _result("other.md#chunk=1", "unrelated passage about something else", 0.8),
+        _result("guide.md#chunk=1", _words(0, 10), 0.7),
+    ]
+
+    packed = ContextPacker().pack(results, max_tokens=10_000)
+
+    assert packed.merged == 1
+    assert packed.passages == 2
+    assert packed.text.startswith(f"[guide.md] {_words(0, 20)}\n\n[other.md]")
+    assert packed.tokens_saved > 0
+
+
+def test_structured_chunks_merge_on_char_offsets():
+    results = [
+        _result("a.md#chunk=1", "First part of the section.", char_start=0, char_end=30),
+        _result("a.md#chunk=9", "Far away text.", char_start=500, char_end=520),
+        _result("a.md#chunk=2", "Second part follows.", char_start=30, char_end=55),
+    ]
+
+    packed = ContextPacker().pack(results, max_tokens=10_000)
+
+    assert packed.merged == 1
+    assert "First part of the section. Second part follows." in packed.text
+    assert packed.passages == 2
+
+
+def test_adjacent_non_overlapping_chunks_are_merged():
+    text = "First paragraph of the guide.\n\nSecond paragraph continues it."
+    first, second = chunk_structured(text, max_tokens=12, overlap_tokens=0)[:2]
+    assert second.start > first.end
+    results = [
+        _result("guide.md#chunk=1", first.text, char_start=first.start, char_end=first.end),
+        _result("guide.md#chunk=2", second.text, char_start=second.start, char_end=second.end),
+        # Not the next index, but separated from chunk 2 by a single space.
+        _result("guide.md#chunk=7", "Tail text.", char_start=second.end + 1, char_end=999),
+    ]
+
+    packed = ContextPacker().pack(results, max_tokens=10_000)
+
+    assert packed.merged == 2
+    assert packed.passages == 1
+    assert "First paragraph of the guide. Second paragraph continues it. Tail text." in packed.text
+
+
+def test_near_duplicates_from_other_sources_are_dropped():
+    text = _words(0, 60)
+    results = [
+        _result("a.md#chunk=1", text, 0.9),
+        _result("copy.md#chunk=4", f"{text} w999", 0.8),
+    ]
+
+    packed = ContextPacker().pack(results, max_tokens=10_000)
+
+    assert packed.duplicates == 1
+    assert "copy.md" not in packed.text
+
+
+def test_budget_is_filled_by_rank_and_respected():
+    packer = ContextPacker()
+    results = [_result(f"d{i}.md#chunk=1", _words(i * 1000, i * 1000 + 120)) for i in range(5)]
+
+    packed = packer.pack(results, max_tokens=400)
+
+    assert packed.tokens <= 400
+    assert packed.text.startswith("[d0.md]")
+    assert packed.truncated + packed.dropped >= 1
+    assert packed.tokens == sum(packer.tokenizer.count(p) for p in packed.text.split("\n\n"))
+
+
+class DummyEmbeddings(Embeddings):
+    def embed_texts(self, texts):
+        return [[1.0, 0.0] for _ in texts]
+
+
+class LongStore(VectorStore):
+    def add(self, documents, embeddings):
+        return None
+
+    def query(self, query_embedding, top_k):
+        return [_result(f"d{i}.md#chunk=1", _words(i * 1000, i * 1000 + 300)) for i in range(4)]
+
+
+class PromptLLM(LLM):
+    model = "small-model"
+
+    def __init__(self):
+        self.prompts = []
+
+    def generate(self, prompt, system_prompt=None):
+        self.prompts.append(prompt)
+        return "ok"
+
+
+def test_pipeline_uses_the_model_budget_and_reports_savings():
+    llm = PromptLLM()
+    pipeline = RagPipeline(
+        embeddings=DummyEmbeddings(),
+        vectorstore=LongStore(),
+        llm_cloud=llm,
+        llm_ollama=llm,
+        settings=Settings(
+            model={"provider": "ollama"},
+            rag={"top_k": 4, "hybrid": False},
+            context={"max_tokens": 10_000, "model_budgets": {"small-model": 256}},
+        ),
+    )
+
+    resp = pipeline.answer("question")
+
+    assert resp.context["tokens"] <= 256
+    assert resp.context["tokens_saved"] > 0
+    assert "[d3.md]" not in llm.prompts[0]
@@ -0,0 +1,66 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from rag.embeddings import BatchingEmbeddings
+from rag.embeddings.base import Embeddings
+
+
+class RecordingEmbeddings(Embeddings):
+    model = "recording"
+
+    def __init__(self, fail: bool = False):
+        self.calls = []
+        self.fail = fail
+        self._lock = threading.Lock()
+
+    def embed_texts(self, texts):
+        with self._lock:
+            self.calls.append(list(texts))
+        if self.fail:
+            raise RuntimeError("backend down")
+        return [[float(len(t)), float(t.count("a"))] for t in texts]
+
+
+def test_concurrent_queries_are_coalesced_and_routed_back():
+    inner = RecordingEmbeddings()
+    batcher = BatchingEmbeddings(inner, max_batch=64, max_wait_ms=50)
+    questions = [f"question {'a' * i}" for i in range(16)]
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        vectors = list(pool.map(lambda q: batcher.embed_texts([q])[0], questions))
+
+    assert vectors == [[float(len(q)), float(q.count("a"))] for q in questions]
+    assert len(inner.calls) < len(questions)
+    assert batcher.stats()["requests"] == len(questions)
+    batcher.close()
+
+
+def test_async_callers_share_batches():
+    inner = RecordingEmbeddings()
+    batcher = BatchingEmbeddings(inner, max_batch=64, max_wait_ms=50)
+
+    async def run():
+        return await asyncio.gather(*(batcher.aembed_texts([f"q{i}"]) for i in range(8)))
+
+    results = asyncio.run(run())
+
+    assert [r[0][0] for r in results] == [float(len(f"q{i}")) for i in range(8)]
+    assert len(inner.calls) == 1
+    batcher.close()
+
+
+def test_large_calls_bypass_and_errors_propagate():
+    inner = RecordingEmbeddings()
+    batcher = BatchingEmbeddings(inner, max_batch=2, max_wait_ms=1)
+    batcher.embed_texts(["a", "b", "c"])
+    assert inner.calls == [["a", "b", "c"]]
+    assert batcher.stats()["batches"] == 0
+    batcher.close()
+
+    failing = BatchingEmbeddings(RecordingEmbeddings(fail=True), max_wait_ms=1)
+    with pytest.raises(RuntimeError, match="backend down"):
+        failing.embed_texts(["a"])
+    failing.close()
@@ -0,0 +1,61 @@
+import asyncio
+from pathlib import Path
+
+from rag.embeddings import CachedEmbeddings
+from rag.embeddings.base import Embeddings
+
+
+class CountingEmbeddings(Embeddings):
+    model = "fake-embed"
+
+    def __init__(self):
+        self.seen = []
+
+    def embed_texts(self, texts):
+        self.seen.extend(texts)
+        return [[float(len(t)), 0.5] for t in texts]
+
+
+def test_cache_skips_repeated_texts_across_calls_and_batches(tmp_path: Path):
+    inner = CountingEmbeddings()
+    cache = CachedEmbeddings(inner, path=str(tmp_path / "cache.sqlite"))
+
+    first = cache.embed_texts(["footer", "body", "footer"])
+    second = cache.embed_texts(["body", "new"])
+
+    assert inner.seen == ["footer", "body", "new"]
+    assert first[0] == first[2] == [6.0, 0.5]
+    assert second[0] == first[1]
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 3
+
+
+def test_cache_persists_and_is_keyed_by_model(tmp_path: Path):
+    path = str(tmp_path / "cache.sqlite")
+    CachedEmbeddings(CountingEmbeddings(), path=path).embed_texts(["persisted"])
+
+    reopened_inner = CountingEmbeddings()
+    reopened = CachedEmbeddings(reopened_inner, path=path)
+    other_model_inner = CountingEmbeddings()
+    other_model = CachedEmbeddings(other_model_inner, path=path, model="other-embed")
+
+    reopened.embed_texts(["persisted"])
+    asyncio.run(other_model.aembed_texts(["persisted"]))
+
+    assert reopened_inner.seen == []
+    assert other_model_inner.seen == ["persisted"]
+
+
+def test_cache_evicts_least_recently_used(tmp_path: Path):
+    inner = CountingEmbeddings()
+    cache = CachedEmbeddings(inner, path=str(tmp_path / "cache.sqlite"), max_entries=10)
+
+    for i in range(10):
+        cache.embed_texts([f"t{i}"])
+    cache.embed_texts(["t0"])
+    cache.embed_texts(["t10"])
+    inner.seen.clear()
+    cache.embed_texts(["t0", "t1"])
+
+    assert cache.stats()["entries"] <= 10
+    assert inner.seen == ["t1"]
@@ -0,0 +1,74 @@
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from rag.http_pool import (
+    PoolSettings,
+    build_session,
+    close_sessions,
+    get_session,
+    pool_settings_from,
+    pool_stats,
+)
+from rag.settings import Settings
+
+
+class _OkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"models": []}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        return None
+
+
+def test_get_session_is_shared_per_name():
+    close_sessions()
+    try:
+        assert get_session("ollama") is get_session("ollama")
+        assert get_session("ollama") is not get_session("cloud")
+    finally:
+        close_sessions()
+
+
+def test_build_session_applies_pool_and_retry_settings():
+    session = build_session(PoolSettings(pool_maxsize=3, max_retries=5, keep_alive=False))
+    adapter = session.get_adapter("http://localhost")
+    assert adapter._pool_maxsize == 3
+    assert adapter.max_retries.total == 5
+    assert adapter.max_retries.read == 0
+    assert adapter.max_retries.is_retry("GET", 503)
+    assert not adapter.max_retries.is_retry("POST", 503)
+    assert session.headers["Connection"] == "close"
+
+
+def test_pool_settings_come_from_provider_config():
+    settings = Settings(ollama={"pool_maxsize": 32, "max_retries": 0})
+    pool = pool_settings_from(settings.ollama)
+    assert pool.pool_maxsize == 32
+    assert pool.max_retries == 0
+
+
+def test_connections_are_reused_and_reported():
+    server = HTTPServer(("127.0.0.1", 0), _OkHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    close_sessions()
+    try:
+        session = get_session("ollama")
+        url = f"http://127.0.0.1:{server.server_port}/api/tags"
+        for _ in range(3):
+            session.get(url, timeout=5).raise_for_status()
+
+        hosts = pool_stats()["ollama"]["hosts"]
+        host = hosts[f"http://127.0.0.1:{server.server_port}"]
+        assert host["requests"] == 3
+        assert host["connections_opened"] == 1
+    finally:
+        close_sessions()
+        server.shutdown()
@@ -0,0 +1,94 @@
+import os
+from pathlib import Path
+
+from rag.ingest import IngestManifest, ManifestEntry, file_digest, ingest_fingerprint, plan_ingest
+from rag.settings import Settings
+
+
+def _write(path: Path, text: str, mtime: float) -> Path:
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_plan_skips_unchanged_and_reports_removed(tmp_path: Path):
+    manifest = IngestManifest(tmp_path / "manifest.json")
+    keep = _write(tmp_path / "keep.txt", "same", 1000)
+    edit = _write(tmp_path / "edit.txt", "before", 1000)
+    manifest.record(keep, file_digest(keep), ["keep.txt#chunk=1"])
+    manifest.record(edit, file_digest(edit), ["edit.txt#chunk=1", "edit.txt#chunk=2"])
+    manifest.entries[str(tmp_path / "gone.txt")] = ManifestEntry(
+        mtime=1.0, size=1, sha256="x", chunk_ids=["gone.txt#chunk=1"]
+    )
+    new = _write(tmp_path / "new.txt", "fresh", 1000)
+    _write(edit, "after!", 2000)
+
+    plan = plan_ingest([keep, edit, new], manifest)
+
+    assert plan.unchanged == [keep]
+    assert plan.to_index == [edit, new]
+    assert plan.removed == [str(tmp_path / "gone.txt")]
+
+
+def test_plan_treats_touched_identical_file_as_unchanged(tmp_path: Path):
+    manifest = IngestManifest(tmp_path / "manifest.json")
+    path = _write(tmp_path / "doc.txt", "content", 1000)
+    manifest.record(path, file_digest(path), ["doc.txt#chunk=1"])
+    os.utime(path, (5000, 5000))
+
+    plan = plan_ingest([path], manifest)
+
+    assert plan.unchanged == [path]
+    assert manifest.get(str(path)).mtime == 5000
+
+
+def test_orphaned_keeps_ids_owned_by_other_files(tmp_path: Path):
+    manifest = IngestManifest(tmp_path / "manifest.json")
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    first = _write(tmp_path / "a" / "README.md", "one", 1000)
+    second = _write(tmp_path / "b" / "README.md", "two", 1000)
+    manifest.record(first, file_digest(first), ["README.md#chunk=1", "README.md#chunk=2"])
+    manifest.record(second, file_digest(second), ["README.md#chunk=1"])
+
+    entry = manifest.remove(str(first))
+
+    assert manifest.orphaned(entry.chunk_ids) == ["README.md#chunk=2"]
+
+
+def test_manifest_round_trip(tmp_path: Path):
+    path = _write(tmp_path / "doc.txt", "content", 1000)
+    manifest = IngestManifest(tmp_path / "idx" / "manifest.json")
+    manifest.record(path, file_digest(path), ["doc.txt#chunk=1"])
+    manifest.save()
+
+    loaded = IngestManifest.load(tmp_path / "idx" / "manifest.json")
+
+    assert loaded.get(str(path)) == manifest.get(str(path))
+
+
+def test_fingerprint_tracks_ingest_settings():
+    base = ingest_fingerprint(Settings())
+
+    assert ingest_fingerprint(Settings()) == base
+    assert ingest_fingerprint(Settings(ollama={"embed_model": "other"})) != base
+    assert ingest_fingerprint(Settings(chunking={"max_tokens": 128})) != base
+    assert ingest_fingerprint(Settings(loaders={"markdown_mode": "combined"})) != base
+    assert ingest_fingerprint(Settings(rag={"hybrid": not Settings().rag.hybrid})) != base
+    assert ingest_fingerprint(Settings(ollama={"llm_model": "other"})) == base
+
+
+def test_plan_reindexes_everything_when_settings_change(tmp_path: Path):
+    path = _write(tmp_path / "doc.txt", "content", 1000)
+    manifest = IngestManifest(tmp_path / "manifest.json", fingerprint="old")
+    manifest.record(path, file_digest(path), ["doc.txt#chunk=1"])
+
+    assert plan_ingest([path], manifest, fingerprint="old").unchanged == [path]
+    plan = plan_ingest([path], manifest, fingerprint="new")
+
+    assert plan.to_index == [path]
+    assert plan.config_changed
+
+    manifest.fingerprint = "new"
+    manifest.save()
+    assert IngestManifest.load(tmp_path / "manifest.json").fingerprint == "new"
@@ -0,0 +1,251 @@
+from pathlib import Path
+
+import pytest
+
+from rag.embeddings.base import Embeddings
+from rag.ingest import IngestManifest, IngestPipeline, ingest_fingerprint, plan_ingest
+from rag.retrieval import BM25Index
+from rag.settings import IngestConfig, Settings
+from rag.vectorstore.base import VectorStore
+
+
+class MemoryStore(VectorStore):
+    def __init__(self):
+        self.docs = {}
+        self.writes = []
+
+    def add(self, documents, embeddings):
+        documents = list(documents)
+        self.writes.append(len(documents))
+        for doc in documents:
+            self.docs[doc.doc_id] = doc.text
+
+    def delete(self, ids):
+        for doc_id in ids:
+            self.docs.pop(doc_id, None)
+
+    def query(self, query_embedding, top_k):
+        return []
+
+
+class CountingEmbeddings(Embeddings):
+    def __init__(self, fail: bool = False):
+        self.texts = 0
+        self.fail = fail
+
+    def embed_texts(self, texts):
+        if self.fail:
+            raise RuntimeError("embedding backend down")
+        self.texts += len(texts)
+        return [[1.0, 0.0] for _ in texts]
+
+
+def _corpus(root: Path, files: int, words: int) -> list:
+    paths = []
+    for i in range(files):
+        path = root / f"doc{i}.txt"
+        path.write_text(" ".join(f"w{i}_{j}" for j in range(words)), encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+@pytest.mark.parametrize("load_workers", [0, 2])
+def test_pipeline_indexes_all_chunks_with_bulk_writes(tmp_path: Path, load_workers: int):
+    files = _corpus(tmp_path, files=5, words=100)
+    manifest = IngestManifest(tmp_path / "manifest.json")
+    store = MemoryStore()
+    embedder = CountingEmbeddings()
+    config = IngestConfig(
+        load_workers=load_workers,
+        embed_workers=3,
+        embed_batch_size=2,
+        write_batch_size=8,
+        queue_size=2,
+    )
+
+    pipeline = IngestPipeline(embedder, store, manifest, config, chunk_size=20, chunk_overlap=0)
+    report = pipeline.run(plan_ingest(files, manifest))
+
+    assert report.indexed_files == 5
+    assert report.indexed_chunks == 25
+    assert embedder.texts == 25
+    assert len(store.docs) == 25
+    assert max(store.writes) >= 8
+    assert all(manifest.get(str(p)) is not None for p in files)
+
+
+def test_pipeline_propagates_embedding_errors_without_recording_files(tmp_path: Path):
+    files = _corpus(tmp_path, files=3, words=50)
+    manifest = IngestManifest(tmp_path / "manifest.json")
+    config = IngestConfig(load_workers=0, embed_workers=2, embed_batch_size=4, queue_size=1)
+    pipeline = IngestPipeline(
+        CountingEmbeddings(fail=True),
+        MemoryStore(),
+        manifest,
+        config,
+        chunk_size=10,
+        chunk_overlap=0,
+    )
+
+    with pytest.raises(RuntimeError, match="embedding backend down"):
+        pipeline.run(plan_ingest(files, manifest))
+    assert manifest.entries == {}
+
+
+def test_pipeline_records_fingerprint_and_reindexes_when_it_changes(tmp_path: Path):
+    files = _corpus(tmp_path, files=2, words=30)
+    manifest = IngestManifest(tmp_path / "manifest.json")
+    embedder = CountingEmbeddings()
+    store = MemoryStore()
+
+    def run(fingerprint):
+        config = IngestConfig(load_workers=0)
+        pipeline = IngestPipeline(embedder, store, manifest, config, chunk_size=10, chunk_overlap=0)
+        return pipeline.run(plan_ingest(files, manifest, fingerprint=fingerprint))
+
+    run("v1")
+    assert manifest.fingerprint == "v1"
+    assert run("v1").indexed_files == 0
+
+    report = run("v2")
+
+    assert report.indexed_files == 2
+    assert embedder.texts == 12
+    assert manifest.fingerprint == "v2"
+
+
+def test_enabling_hybrid_reindexes_into_the_bm25_index(tmp_path: Path):
+    files = _corpus(tmp_path, files=2, words=30)
+    manifest = IngestManifest(tmp_path / "manifest.json")
+    lexical = BM25Index.open(str(tmp_path / "index"))
+
+    def run(hybrid):
+        fingerprint = ingest_fingerprint(Settings(rag={"hybrid": hybrid}))
+        pipeline = IngestPipeline(
+            CountingEmbeddings(),
+            MemoryStore(),
+            manifest,
+            IngestConfig(load_workers=0),
+            chunk_size=10,
+            chunk_overlap=0,
+            lexical=lexical if hybrid else None,
+        )
+        return pipeline.run(plan_ingest(files, manifest, fingerprint=fingerprint))
+
+    run(hybrid=False)
+    assert lexical.count() == 0
+
+    report = run(hybrid=True)
+
+    assert report.indexed_files == 2
+    assert lexical.count() == 6
+
+
+def _pdf(path: Path, pages: int) -> Path:
+    pypdf = pytest.importorskip("pypdf")
+    from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+    font = DictionaryObject(
+        {
+            NameObject("/Type"): NameObject("/Font"),
+            NameObject("/Subtype"): NameObject("/Type1"),
+            NameObject("/BaseFont"): NameObject("/Helvetica"),
+        }
+    )
+    writer = pypdf.PdfWriter()
+    for i in range(pages):
+        page = writer.add_blank_page(612, 792)
+        page[NameObject("/Resources")] = DictionaryObject(
+            {NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})}
+        )
+        content = DecodedStreamObject()
+        content.set_data(f"BT /F1 12 Tf 72 720 Td (page {i + 1} words) Tj ET".encode())
+        page.replace_contents(content)
+    with path.open("wb") as f:
+        writer.write(f)
+    return path
+
+
+@pytest.mark.parametrize("load_workers", [0, 2])
+def test_pipeline_splits_large_pdfs_into_page_range_tasks(tmp_path: Path, load_workers: int):
+    pdf = _pdf(tmp_path / "manual.pdf", pages=7)
+    manifest = IngestManifest(tmp_path / "manifest.json")
+    store = MemoryStore()
+    config = IngestConfig(load_workers=load_workers, embed_batch_size=2, pdf_pages_per_task=3)
+    pipeline = IngestPipeline(
+        CountingEmbeddings(), store, manifest, config, chunk_size=20, chunk_overlap=0
+    )
+
+    assert [task[2:] for task in pipeline._load_tasks(pdf, "")] == [
+        ((0, 3), 3),
+        ((3, 6), 3),
+        ((6, 7), 3),
+    ]
+    report = pipeline.run(plan_ingest([pdf], manifest))
+
+    assert report.indexed_files == 1
+    assert report.indexed_chunks == 7
+    assert store.docs["manual.pdf#page=7#chunk=1"] == "page 7 words"
+    assert len(manifest.get(str(pdf)).chunk_ids) == 7
+
+
+def test_pipeline_splits_jsonl_into_line_range_tasks(tmp_path: Path):
+    path = tmp_path / "export.jsonl"
+    path.write_text("".join(f'{{"id": {i}}}\n' for i in range(10)), encoding="utf-8")
+    manifest = IngestManifest(tmp_path / "manifest.json")
+    store = MemoryStore()
+    config = IngestConfig(load_workers=2, embed_batch_size=3, jsonl_lines_per_task=4)
+    pipeline = IngestPipeline(
+        CountingEmbeddings(), store, manifest, config, chunk_size=50, chunk_overlap=0
+    )
+
+    assert len(pipeline._load_tasks(path, "")) == 3
+    report = pipeline.run(plan_ingest([path], manifest))
+
+    assert report.indexed_files == 1
+    assert report.indexed_chunks == 10
+    assert "export.jsonl#line=10#chunk=1" in store.docs
+
+
+def test_pipeline_discards_written_parts_of_a_failed_file(tmp_path: Path, monkeypatch):
+    from rag.ingest import pipeline as pipeline_module
+
+    path = tmp_path / "export.jsonl"
+    path.write_text("".join(f'{{"id": {i}}}\n' for i in range(10)), encoding="utf-8")
+    real_iter_document = pipeline_module.iter_document
+
+    def iter_document(path, part=None, config=None):
+        if part is not None and part[2] == 9:
+            raise ValueError("broken line range")
+        return real_iter_document(path, part, config)
+
+    monkeypatch.setattr(pipeline_module, "iter_document", iter_document)
+    manifest = IngestManifest(tmp_path / "manifest.json")
+    store = MemoryStore()
+    config = IngestConfig(load_workers=0, write_batch_size=1, jsonl_lines_per_task=4)
+    pipeline = IngestPipeline(
+        CountingEmbeddings(), store, manifest, config, chunk_size=50, chunk_overlap=0
+    )
+
+    report = pipeline.run(plan_ingest([path], manifest))
+
+    assert report.skipped == [(path, "broken line range")]
+    assert manifest.get(str(path)) is None
+    assert store.docs == {}
+
+
+def test_pipeline_reports_representation_savings(tmp_path: Path):
+    path = tmp_path / "config.yaml"
+    path.write_text("".join(f"key{i}: value {i}\n" for i in range(50)), encoding="utf-8")
+    manifest = IngestManifest(tmp_path / "manifest.json")
+    store = MemoryStore()
+    config = IngestConfig(load_workers=0)
+    pipeline = IngestPipeline(
+        CountingEmbeddings(), store, manifest, config, chunk_size=30, chunk_overlap=0
+    )
+
+    report = pipeline.run(plan_ingest([path], manifest))
+
+    assert report.saved_bytes > 0
+    assert report.saved_chunks >= report.indexed_chunks // 2
+    assert all("Raw YAML" not in text for text in store.docs.values())
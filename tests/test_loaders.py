@@ -1,6 +1,7 @@
 from pathlib import Path
 
-from rag.loaders import SUPPORTED_EXTENSIONS, load_document
+from rag.loaders import SUPPORTED_EXTENSIONS, iter_document, json_lines_ranges, load_document
+from rag.settings import LoaderConfig
 
 
 def test_supported_extensions_include_structured_formats():
@@ -20,6 +21,41 @@ def test_json_loader_flattens_fields(tmp_path: Path):
     assert "items[0]: 1" in docs[0].text
 
 
+def test_jsonl_loader_streams_one_document_per_record(tmp_path: Path):
+    path = tmp_path / "events.jsonl"
+    lines = ['{"level":"info","msg":"start"}', "", "not json", '{"msg":"stop"}']
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    docs = list(iter_document(path))
+
+    assert [d.doc_id for d in docs] == [
+        "events.jsonl#line=1",
+        "events.jsonl#line=3",
+        "events.jsonl#line=4",
+    ]
+    assert "level: info" in docs[0].text
+    assert "raw: not json" in docs[1].text
+    assert docs[2].metadata["line_start"] == docs[2].metadata["line_end"] == 4
+
+
+def test_jsonl_loader_groups_records_and_reads_line_ranges(tmp_path: Path):
+    path = tmp_path / "rows.ndjson"
+    path.write_text("".join(f'{{"n": {i}}}\n' for i in range(1, 8)), encoding="utf-8")
+    config = LoaderConfig(jsonl_records_per_document=3)
+
+    grouped = list(iter_document(path, config=config))
+    ranges = json_lines_ranges(path, lines_per_part=3)
+    parts = [d for part in ranges for d in iter_document(path, part, config)]
+
+    assert [(d.metadata["line_start"], d.metadata["records"]) for d in grouped] == [
+        (1, 3),
+        (4, 3),
+        (7, 1),
+    ]
+    assert [r[2] for r in ranges] == [1, 4, 7]
+    assert [d.text for d in parts] == [d.text for d in grouped]
+
+
 def test_yaml_loader_flattens_fields(tmp_path: Path):
     path = tmp_path / "sample.yml"
     path.write_text("name: project\nsettings:\n  env: dev\n", encoding="utf-8")
@@ -42,12 +78,38 @@ def test_xml_loader_extracts_text(tmp_path: Path):
     assert "Hello world" in docs[0].text
 
 
-def test_markdown_loader_keeps_raw_and_rendered_text(tmp_path: Path):
+def test_markdown_loader_keeps_raw_text_by_default(tmp_path: Path):
     path = tmp_path / "sample.md"
     path.write_text("# Title\n\n- item-a\n- item-b\n", encoding="utf-8")
 
     docs = load_document(path)
 
     assert len(docs) == 1
-    assert "# Title" in docs[0].text
-    assert "Rendered text:" in docs[0].text
+    assert docs[0].text == "# Title\n\n- item-a\n- item-b\n"
+    assert docs[0].saved_bytes > 0
+    assert docs[0].metadata == {"source": str(path), "format": "markdown"}
+
+
+def test_markdown_loader_representation_modes(tmp_path: Path):
+    path = tmp_path / "sample.md"
+    path.write_text("# Title\n\n- item-a\n- item-b\n", encoding="utf-8")
+
+    rendered = load_document(path, LoaderConfig(markdown_mode="rendered"))[0]
+    combined = load_document(path, LoaderConfig(markdown_mode="combined"))[0]
+
+    assert "#" not in rendered.text and "item-a" in rendered.text
+    assert "# Title" in combined.text
+    assert "Rendered text:" in combined.text
+    assert combined.saved_bytes == 0
+
+
+def test_structured_loaders_drop_raw_dump_unless_combined(tmp_path: Path):
+    path = tmp_path / "sample.json"
+    path.write_text('{"title": "Plan"}', encoding="utf-8")
+
+    flattened = load_document(path)[0]
+    combined = load_document(path, LoaderConfig(json_mode="combined"))[0]
+
+    assert flattened.text == "title: Plan"
+    assert "Raw JSON:" in combined.text
+    assert flattened.saved_bytes == len(combined.text) - len(flattened.text)
@@ -0,0 +1,98 @@
+from fastapi.testclient import TestClient
+
+from rag.embeddings.base import Embeddings
+from rag.llm.base import LLM
+from rag.metrics import ANSWERS_TOTAL, STAGE_SECONDS, MetricsRegistry
+from rag.models import RetrievalResult
+from rag.rag import RagPipeline
+from rag.settings import Settings
+from rag.vectorstore.base import VectorStore
+
+
+class DummyEmbeddings(Embeddings):
+    def embed_texts(self, texts):
+        return [[0.0] * 3 for _ in texts]
+
+
+class DummyVectorStore(VectorStore):
+    def add(self, documents, embeddings):
+        return None
+
+    def query(self, query_embedding, top_k):
+        return [RetrievalResult("doc#1", "context", 0.9, {"source": "doc"})]
+
+
+class ChunkLLM(LLM):
+    model = "chunky"
+
+    def generate(self, prompt, system_prompt=None):
+        return "ok"
+
+    def stream(self, prompt, system_prompt=None):
+        yield "o"
+        yield "k"
+
+
+def _pipeline():
+    return RagPipeline(
+        embeddings=DummyEmbeddings(),
+        vectorstore=DummyVectorStore(),
+        llm_cloud=ChunkLLM(),
+        llm_ollama=ChunkLLM(),
+        settings=Settings(model={"provider": "ollama"}, rag={"hybrid": False}),
+    )
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    counter = registry.counter("demo_total", "Demo counter.", ("kind",))
+    histogram = registry.histogram("demo_seconds", "Demo latency.", buckets=(0.1, 1.0))
+    counter.inc(kind="a")
+    counter.inc(2, kind="a")
+    histogram.observe(0.5)
+
+    text = registry.render()
+
+    assert '# TYPE demo_total counter' in text
+    assert 'demo_total{kind="a"} 3' in text
+    assert 'demo_seconds_bucket{le="0.1"} 0' in text
+    assert 'demo_seconds_bucket{le="1"} 1' in text
+    assert 'demo_seconds_bucket{le="+Inf"} 1' in text
+    assert "demo_seconds_count 1" in text
+
+
+def test_answer_reports_stage_timings():
+    before = STAGE_SECONDS.count(stage="rerank")
+
+    resp = _pipeline().answer("hello world")
+
+    for stage in ("embed", "retrieve", "filter", "rerank", "context", "generate", "total"):
+        assert stage in resp.timings
+    assert STAGE_SECONDS.count(stage="rerank") == before + 1
+
+
+def test_stream_records_time_to_first_token():
+    before_ttft = STAGE_SECONDS.count(stage="ttft")
+    before_ok = ANSWERS_TOTAL.value(mode="stream", outcome="ok")
+
+    assert "".join(_pipeline().answer_stream("hello")) == "ok"
+
+    assert STAGE_SECONDS.count(stage="ttft") == before_ttft + 1
+    assert ANSWERS_TOTAL.value(mode="stream", outcome="ok") == before_ok + 1
+
+
+def test_metrics_endpoint_and_query_timings(monkeypatch):
+    from rag.api import app as app_module
+
+    monkeypatch.setattr(app_module, "get_pipeline", _pipeline)
+    client = TestClient(app_module.app)
+
+    plain = client.post("/query", json={"question": "hi"}).json()
+    timed = client.post("/query", json={"question": "hi", "include_timings": True}).json()
+    metrics = client.get("/metrics")
+
+    assert plain["timings"] is None
+    assert timed["timings"]["total"] >= 0
+    assert metrics.status_code == 200
+    assert 'rag_http_requests_total{route="/query",status="200"}' in metrics.text
+    assert 'rag_stage_duration_seconds_count{stage="generate"}' in metrics.text
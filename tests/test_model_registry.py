@@ -0,0 +1,59 @@
+import threading
+import time
+
+from rag.api.model_registry import ModelRegistry
+
+
+class FlakyFetch:
+    def __init__(self, lists):
+        self.lists = list(lists)
+        self.calls = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self):
+        self.calls += 1
+        self.release.wait(2)
+        item = self.lists.pop(0) if len(self.lists) > 1 else self.lists[0]
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+
+def test_cold_start_loads_once_then_serves_from_memory():
+    fetch = FlakyFetch([["llama3"]])
+    registry = ModelRegistry(fetch, ttl_s=60)
+
+    assert registry.models() == ["llama3"]
+    assert registry.models() == ["llama3"]
+    assert fetch.calls == 1
+    assert registry.loaded
+
+
+def test_stale_list_is_served_while_refreshing_in_background():
+    fetch = FlakyFetch([["old"], ["new"]])
+    registry = ModelRegistry(fetch, ttl_s=0.0, min_refresh_interval_s=0.0)
+    assert registry.models() == ["old"]
+
+    fetch.release.clear()
+    started = time.perf_counter()
+    assert registry.models() == ["old"]
+    assert time.perf_counter() - started < 0.5
+
+    fetch.release.set()
+    deadline = time.time() + 2
+    while registry.models() != ["new"] and time.time() < deadline:
+        time.sleep(0.01)
+    assert registry.models() == ["new"]
+
+
+def test_failed_refresh_keeps_last_good_list_and_is_rate_limited():
+    fetch = FlakyFetch([["llama3"], RuntimeError("ollama down")])
+    registry = ModelRegistry(fetch, min_refresh_interval_s=60)
+    registry.refresh()
+
+    assert registry.refresh() is False
+    assert registry.models() == ["llama3"]
+    assert registry.stats()["last_error"] == "ollama down"
+    assert registry.refresh(force=False) is False
+    assert fetch.calls == 2
@@ -0,0 +1,110 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from rag.models import Document
+from rag.vectorstore import NumpyVectorStore
+from rag.vectorstore.ivf import recall_at_k
+
+
+def _docs(*ids):
+    return [Document(doc_id=i, text=f"text {i}", metadata={"source": f"{i}.md"}) for i in ids]
+
+
+def test_query_returns_cosine_top_k_with_text_and_metadata(tmp_path: Path):
+    store = NumpyVectorStore(index_dir=str(tmp_path))
+    store.add(_docs("a", "b", "c"), [[1.0, 0.0], [0.0, 2.0], [1.0, 1.0]])
+
+    results = store.query([3.0, 0.1], top_k=2)
+
+    assert [r.doc_id for r in results] == ["a", "c"]
+    assert results[0].score == pytest.approx(0.9994, abs=1e-3)
+    assert results[0].text == "text a"
+    assert results[0].metadata == {"source": "a.md"}
+
+
+def test_upsert_and_delete_are_visible_to_other_readers(tmp_path: Path):
+    writer = NumpyVectorStore(index_dir=str(tmp_path))
+    reader = NumpyVectorStore(index_dir=str(tmp_path))
+    writer.add(_docs("a", "b"), [[1.0, 0.0], [0.0, 1.0]])
+    assert [r.doc_id for r in reader.query([1.0, 0.0], top_k=1)] == ["a"]
+
+    writer.add(_docs("a"), [[0.0, 1.0]])
+    writer.delete(["b"])
+
+    results = reader.query([0.0, 1.0], top_k=5)
+    assert [r.doc_id for r in results] == ["a"]
+    assert reader.count() == 1
+
+
+def test_bulk_upsert_exists_count_and_delete_where(tmp_path: Path):
+    store = NumpyVectorStore(index_dir=str(tmp_path))
+    docs = _docs("a", "b", "c")
+    docs[2].metadata = {"source": "a.md", "page": 2}
+    store.upsert(docs, [[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]])
+
+    assert store.exists(["a", "c", "zzz"]) == {"a", "c"}
+    assert store.count() == 3
+
+    store.delete(where={"source": "a.md", "page": 2})
+    assert store.exists(["a", "c"]) == {"a"}
+
+    store.delete(ids=["a", "b"], where={"source": "b.md"})
+    assert store.exists(["a", "b", "c"]) == {"a"}
+    assert store.count() == 1
+
+
+def test_sample_vectors_returns_live_rows(tmp_path: Path):
+    store = NumpyVectorStore(index_dir=str(tmp_path))
+    assert store.sample_vectors(5).shape == (0, 0)
+    store.add(_docs("a", "b", "c"), [[1.0, 0.0], [0.0, 2.0], [3.0, 4.0]])
+    store.delete(["b"])
+
+    sampled = store.sample_vectors(5)
+
+    assert sampled.dtype == np.float32
+    assert sorted(map(tuple, sampled.tolist())) == [
+        pytest.approx((0.6, 0.8)),
+        pytest.approx((1.0, 0.0)),
+    ]
+
+
+def test_matrix_grows_and_supports_float16(tmp_path: Path):
+    store = NumpyVectorStore(index_dir=str(tmp_path), dtype="float16")
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(1500, 8)).tolist()
+    ids = [f"d{i}" for i in range(1500)]
+    store.add(_docs(*ids[:700]), vectors[:700])
+    store.add(_docs(*ids[700:]), vectors[700:])
+
+    results = store.query(vectors[1234], top_k=3)
+
+    assert results[0].doc_id == "d1234"
+    assert np.load(store.vectors_path, mmap_mode="r").dtype == np.float16
+    assert store.count() == 1500
+
+
+def test_recall_at_k_ignores_queries_without_exact_results():
+    assert recall_at_k([[1, 2], [], [3, 4]], [[1, 9], [5], [3, 4]], 2) == 0.75
+    assert recall_at_k([[], []], [[1], [2]], 2) == 1.0
+
+
+def test_ivf_index_matches_exact_search_and_accepts_incremental_inserts(tmp_path: Path):
+    store = NumpyVectorStore(index_dir=str(tmp_path), ann_enabled=True, ann_nprobe=4)
+    rng = np.random.default_rng(1)
+    vectors = rng.normal(size=(2000, 16)).tolist()
+    store.add(_docs(*[f"d{i}" for i in range(2000)]), vectors)
+    ivf = store.build_ann_index(nlist=16)
+    assert ivf is not None and ivf.nlist == 16
+
+    queries = vectors[:50]
+    exact = [[row for row, _ in store.search(q, 10, exact=True)] for q in queries]
+    store.ann_nprobe = 16
+    assert recall_at_k(exact, [[row for row, _ in store.search(q, 10)] for q in queries], 10) == 1.0
+    store.ann_nprobe = 4
+    assert recall_at_k(exact, [[row for row, _ in store.search(q, 10)] for q in queries], 10) > 0.5
+
+    new_vector = rng.normal(size=16).tolist()
+    store.add(_docs("fresh"), [new_vector])
+    assert store.query(new_vector, top_k=1)[0].doc_id == "fresh"
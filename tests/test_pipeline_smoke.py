@@ -1,3 +1,5 @@
+import asyncio
+
 import pytest
 
 from rag.embeddings.base import Embeddings
@@ -139,3 +141,84 @@ def test_pipeline_does_not_fallback_when_primary_is_ollama():
 
     with pytest.raises(RuntimeError):
         pipeline.answer("hello")
+
+
+class StreamingRecorderLLM(RecorderLLM):
+    def __init__(self, model: str, chunks, should_fail: bool = False):
+        super().__init__(model, should_fail=should_fail)
+        self.chunks = chunks
+
+    async def astream(self, prompt, system_prompt=None):
+        self.calls += 1
+        if self.should_fail:
+            raise RuntimeError(f"{self.model} failed")
+        for chunk in self.chunks:
+            yield chunk
+
+
+def test_pipeline_aanswer_uses_async_interfaces():
+    settings = Settings(model={"provider": "ollama"})
+    ollama = RecorderLLM("ollama-model")
+    pipeline = RagPipeline(
+        embeddings=DummyEmbeddings(),
+        vectorstore=DummyVectorStore(),
+        llm_cloud=RecorderLLM("cloud-model"),
+        llm_ollama=ollama,
+        settings=settings,
+    )
+
+    resp = asyncio.run(pipeline.aanswer("hello"))
+
+    assert resp.answer == "ok:ollama-model"
+    assert resp.sources
+    assert ollama.calls == 1
+
+
+def test_pipeline_aanswer_stream_falls_back_before_first_chunk():
+    settings = Settings(model={"provider": "cloud"}, rag={"fallback_to_ollama": True})
+    cloud = StreamingRecorderLLM("cloud-model", ["x"], should_fail=True)
+    ollama = StreamingRecorderLLM("ollama-model", ["a", "b"])
+    pipeline = RagPipeline(
+        embeddings=DummyEmbeddings(),
+        vectorstore=DummyVectorStore(),
+        llm_cloud=cloud,
+        llm_ollama=ollama,
+        settings=settings,
+    )
+
+    async def collect():
+        return [chunk async for chunk in pipeline.aanswer_stream("hello")]
+
+    assert asyncio.run(collect()) == ["a", "b"]
+    assert cloud.calls == 1
+    assert ollama.calls == 1
+
+
+class FailingEmbeddings(Embeddings):
+    def embed_texts(self, texts):
+        raise RuntimeError("embedding backend down")
+
+
+def test_stream_retrieval_errors_are_http_errors(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from rag.api import app as app_module
+
+    pipeline = RagPipeline(
+        embeddings=FailingEmbeddings(),
+        vectorstore=DummyVectorStore(),
+        llm_cloud=DummyLLM(),
+        llm_ollama=DummyLLM(),
+        settings=Settings(rag={"hybrid": False}, answer_cache={"enabled": False}),
+    )
+    monkeypatch.setattr(app_module, "_available_models", lambda: [])
+    monkeypatch.setattr(app_module, "get_pipeline_for_model", lambda model: pipeline)
+    client = TestClient(app_module.app)
+
+    resp = client.post(
+        "/v1/chat/completions",
+        json={"stream": True, "messages": [{"role": "user", "content": "hello"}]},
+    )
+
+    assert resp.status_code == 500
+    assert "embedding backend down" in resp.json()["detail"]
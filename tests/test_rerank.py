@@ -0,0 +1,71 @@
+import pytest
+
+from rag.ingest.pipeline import build_chunks
+from rag.models import Document, RetrievalResult
+from rag.rag import BM25Reranker, KeywordOverlapReranker, build_reranker
+from rag.rag import rerank as rerank_module
+from rag.settings import RerankConfig
+from rag.text.terms import TERMS_METADATA_KEY
+
+
+def _result(doc_id, text, score, terms=None):
+    metadata = {"source": f"{doc_id}.md"}
+    if terms is not None:
+        metadata[TERMS_METADATA_KEY] = terms
+    return RetrievalResult(doc_id, text, score, metadata)
+
+
+def test_keyword_reranker_uses_stored_terms():
+    # Stored term sets win over the text, which proves no per-query tokenization happens.
+    results = [
+        _result("a", "backup restore", 0.9, terms="unrelated"),
+        _result("b", "unrelated", 0.1, terms="backup restore"),
+    ]
+
+    ranked = KeywordOverlapReranker().rerank("restore backup", results)
+
+    assert [r.doc_id for r in ranked] == ["b", "a"]
+
+
+def test_keyword_reranker_falls_back_to_text():
+    results = [_result("a", "nothing here", 0.9), _result("b", "restore the backup", 0.1)]
+
+    ranked = KeywordOverlapReranker().rerank("restore backup", results)
+
+    assert [r.doc_id for r in ranked] == ["b", "a"]
+
+
+def test_bm25_reranker_prefers_rare_terms():
+    results = [
+        _result("common", "", 0.9, terms="database upgrade"),
+        _result("rare", "", 0.1, terms="database e4021"),
+        _result("other", "", 0.5, terms="database upgrade notes"),
+    ]
+
+    ranked = BM25Reranker().rerank("database upgrade e4021", results)
+
+    assert ranked[0].doc_id == "rare"
+
+
+def test_build_reranker_methods():
+    assert build_reranker(RerankConfig(method="none")) is None
+    assert isinstance(build_reranker(RerankConfig(method="bm25")), BM25Reranker)
+    assert isinstance(build_reranker(RerankConfig()), KeywordOverlapReranker)
+
+
+@pytest.mark.skipif(
+    rerank_module.CrossEncoder is not None, reason="sentence-transformers installed"
+)
+def test_cross_encoder_requires_optional_dependency():
+    with pytest.raises(ImportError):
+        build_reranker(RerankConfig(method="cross_encoder"))
+
+
+def test_build_chunks_stores_term_sets():
+    doc = Document("guide.md", "Restore the backup before the upgrade.", {"source": "guide.md"})
+
+    chunks = build_chunks([doc], chunk_size=50, overlap=0)
+
+    terms = chunks[0].metadata[TERMS_METADATA_KEY].split()
+    assert {"restore", "backup", "upgrade", "guide"} <= set(terms)
+    assert TERMS_METADATA_KEY not in doc.metadata
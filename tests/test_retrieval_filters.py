@@ -0,0 +1,152 @@
+from fastapi.testclient import TestClient
+
+from rag.embeddings.base import Embeddings
+from rag.llm.base import LLM
+from rag.models import Document, RagResponse
+from rag.rag import AnswerCache, RagPipeline
+from rag.retrieval import BM25Index, RetrievalFilter
+from rag.settings import Settings
+from rag.vectorstore import ChromaVectorStore, NumpyVectorStore
+
+
+class AxisEmbeddings(Embeddings):
+    def embed_texts(self, texts):
+        return [[1.0, 0.0] for _ in texts]
+
+
+class EchoLLM(LLM):
+    model = "echo"
+
+    def generate(self, prompt, system_prompt=None):
+        return "ok"
+
+
+def _chunks():
+    pdf = {"source": "docs/guide.pdf", "format": "pdf"}
+    return [
+        Document("guide.pdf#page=1#chunk=1", "install steps", {**pdf, "page": 1}),
+        Document("guide.pdf#page=9#chunk=1", "install appendix", {**pdf, "page": 9}),
+        Document(
+            "notes.md#chunk=1",
+            "install notes",
+            {"source": "wiki/notes.md", "format": "markdown", "team": "ops"},
+        ),
+    ]
+
+
+def _store(tmp_path):
+    store = NumpyVectorStore(index_dir=str(tmp_path))
+    store.add(_chunks(), [[1.0, 0.0], [0.9, 0.1], [0.8, 0.2]])
+    return store
+
+
+def test_filter_matches_and_translates_to_chroma_where():
+    filters = RetrievalFilter(formats=("pdf",), page_min=2, metadata={"team": "ops"})
+
+    assert filters.matches({"format": "pdf", "page": 3, "team": "ops"})
+    assert not filters.matches({"format": "pdf", "page": 1, "team": "ops"})
+    assert not filters.matches({"format": "pdf", "team": "ops"})
+    assert filters.to_chroma_where() == {
+        "$and": [{"format": {"$in": ["pdf"]}}, {"page": {"$gte": 2}}, {"team": "ops"}]
+    }
+    assert RetrievalFilter().is_empty()
+
+
+def test_numpy_store_pushes_filters_into_the_scan(tmp_path):
+    store = _store(tmp_path)
+
+    by_prefix = store.query([1.0, 0.0], 5, RetrievalFilter(source_prefix="docs/"))
+    by_pages = store.query([1.0, 0.0], 5, RetrievalFilter(formats=("pdf",), page_max=5))
+    by_tag = store.query([1.0, 0.0], 5, RetrievalFilter(metadata={"team": "ops"}))
+
+    assert [r.doc_id for r in by_prefix] == [
+        "guide.pdf#page=1#chunk=1",
+        "guide.pdf#page=9#chunk=1",
+    ]
+    assert [r.doc_id for r in by_pages] == ["guide.pdf#page=1#chunk=1"]
+    assert [r.doc_id for r in by_tag] == ["notes.md#chunk=1"]
+
+    # Cached bitmaps are rebuilt after writes.
+    store.delete(["notes.md#chunk=1"])
+    assert store.query([1.0, 0.0], 5, RetrievalFilter(metadata={"team": "ops"})) == []
+
+
+class RankedCollection:
+    """Chroma collection double returning its chunks in a fixed nearest-first order."""
+
+    def __init__(self, sources):
+        self.sources = sources
+        self.n_results = []
+
+    def count(self):
+        return len(self.sources)
+
+    def query(self, query_embeddings, n_results, where, include):
+        self.n_results.append(n_results)
+        ids = [f"c{i}" for i in range(n_results)]
+        texts = [f"text {i}" for i in range(n_results)]
+        return {
+            "ids": [ids],
+            "distances": [[i / 100 for i in range(n_results)]],
+            "documents": [texts] if "documents" in include else None,
+            "metadatas": [[{"source": s} for s in self.sources[:n_results]]],
+        }
+
+
+def test_chroma_store_widens_the_query_until_the_prefix_has_top_k_matches():
+    # Only the last 3 of 50 chunks are under the prefix, beyond the first 4 x top_k.
+    collection = RankedCollection(["other/a.md"] * 47 + ["docs/b.md"] * 3)
+    store = ChromaVectorStore.__new__(ChromaVectorStore)
+    store.collection = collection
+
+    hits = store.query_ids([1.0, 0.0], 2, RetrievalFilter(source_prefix="docs/"))
+    results = store.query([1.0, 0.0], 5, RetrievalFilter(source_prefix="docs/"))
+
+    assert [doc_id for doc_id, _ in hits] == ["c47", "c48"]
+    assert [r.doc_id for r in results] == ["c47", "c48", "c49"]
+    assert results[0].text == "text 47"
+    assert collection.n_results == [8, 32, 50, 20, 50]
+
+
+def test_pipeline_filters_lexical_hits_and_bypasses_answer_cache(tmp_path):
+    store = _store(tmp_path)
+    lexical = BM25Index.open(str(tmp_path))
+    lexical.add(_chunks())
+    cache = AnswerCache()
+    pipeline = RagPipeline(
+        embeddings=AxisEmbeddings(),
+        vectorstore=store,
+        llm_cloud=EchoLLM(),
+        llm_ollama=EchoLLM(),
+        settings=Settings(model={"provider": "ollama"}),
+        lexical_index=lexical,
+        answer_cache=cache,
+    )
+
+    resp = pipeline.answer("install", RetrievalFilter(source_prefix="wiki/"))
+
+    assert [s.doc_id for s in resp.sources] == ["notes.md#chunk=1"]
+    assert cache.stats()["entries"] == 0
+
+
+def test_query_endpoint_accepts_filters(monkeypatch):
+    from rag.api import app as app_module
+
+    seen = {}
+
+    class RecordingPipeline:
+        async def aanswer(self, question, filters=None):
+            seen["filters"] = filters
+            return RagResponse(answer="ok", sources=[], model="m", used_fallback=False)
+
+    monkeypatch.setattr(app_module, "get_pipeline", RecordingPipeline)
+    client = TestClient(app_module.app)
+
+    body = {
+        "question": "q",
+        "filters": {"formats": ["pdf"], "page_min": 2, "metadata": {"team": "ops"}},
+    }
+    assert client.post("/query", json=body).status_code == 200
+    assert seen["filters"] == RetrievalFilter(
+        formats=("pdf",), page_min=2, metadata={"team": "ops"}
+    )
@@ -0,0 +1,52 @@
+from rag import runtime
+from rag.embeddings import BatchingEmbeddings, CachedEmbeddings
+from rag.settings import Settings
+
+
+def _settings(tmp_path, **overrides):
+    return Settings(
+        paths={"data_dir": str(tmp_path), "index_dir": str(tmp_path / "indices")},
+        vectorstore={"backend": "numpy"},
+        embedding_cache={"path": str(tmp_path / "cache" / "embeddings.sqlite")},
+        **overrides,
+    )
+
+
+def test_pipelines_for_different_models_share_retrieval_backends(tmp_path):
+    runtime.components.clear()
+    base = _settings(tmp_path, model={"provider": "ollama", "name": "llama3"})
+    other = base.model_copy(deep=True)
+    other.model.name = "qwen2.5"
+
+    first = runtime.build_pipeline(base)
+    second = runtime.build_pipeline(other)
+
+    assert first.embeddings is second.embeddings
+    assert first.vectorstore is second.vectorstore
+    assert first.lexical_index is second.lexical_index
+    assert first.llm_ollama.model == "llama3"
+    assert second.llm_ollama.model == "qwen2.5"
+    assert first.answer_cache is not second.answer_cache
+    runtime.components.clear()
+
+
+def test_different_index_settings_get_their_own_store(tmp_path):
+    runtime.components.clear()
+    first = runtime.build_pipeline(_settings(tmp_path / "a"))
+    second = runtime.build_pipeline(_settings(tmp_path / "b"))
+
+    assert first.vectorstore is not second.vectorstore
+    runtime.components.clear()
+
+
+def test_only_the_query_embedder_coalesces_requests(tmp_path):
+    runtime.components.clear()
+    settings = _settings(tmp_path)
+
+    shared = runtime.shared_embeddings(settings)
+    ingest = runtime.build_embeddings(settings, batching=False)
+
+    assert isinstance(shared, CachedEmbeddings) and isinstance(shared.inner, BatchingEmbeddings)
+    assert isinstance(ingest, CachedEmbeddings)
+    assert not isinstance(ingest.inner, BatchingEmbeddings)
+    runtime.components.clear()